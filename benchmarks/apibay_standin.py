@@ -0,0 +1,243 @@
+"""Local stand-in for the apibay.org endpoints, served from recorded fixtures through an httpx transport."""
+import asyncio
+import json
+import random
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from torrent_companion.indexers.base_scrapper import BaseScrapper
+from torrent_companion.indexers.definitions.piratebay.indexer import PirateBayIndexer
+from torrent_companion.indexers.definitions.piratebay.scrapper import PirateBayScrapper
+from torrent_companion.indexers.rate_limiter import RateLimiter
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "apibay_torrents.jsonl"
+
+# Search result fields, as q.php answers them (every value a string)
+SEARCH_FIELDS = (
+    "id", "name", "info_hash", "leechers", "seeders", "num_files",
+    "size", "username", "added", "status", "category", "imdb",
+)
+NO_RESULTS = {
+    "id": "0", "name": "No results returned", "info_hash": "0" * 40, "leechers": "0",
+    "seeders": "0", "num_files": "0", "size": "0", "username": "", "added": "0",
+    "status": "member", "category": "0", "imdb": "",
+}
+NO_FILES = [{"name": ["Filelist not found"], "size": [0]}]
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def load_fixtures(path: Path = FIXTURE_PATH) -> List[dict]:
+    """Load recorded torrents: t.php details plus their f.php file list as [path, size] pairs."""
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def recorded_torrent(
+    id: int,
+    name: str,
+    seeders: int = 10,
+    leechers: int = 2,
+    size: int | None = None,
+    category: int = 207,
+    status: str = "member",
+    username: str = "uploader",
+    added: int = 1_600_000_000,
+    imdb: str = "",
+    info_hash: str | None = None,
+    files: List[list] | None = None,
+) -> dict:
+    """Build a torrent shaped like the recorded fixtures, to serve made up data from a stand-in.
+
+    The info hash defaults to the id in hexadecimal, the file list to a single
+    file named after the torrent and the size to the size of the files.
+    """
+    files = [[f"{name}/{name}.mkv", size or 1_000_000]] if files is None else files
+    return {
+        "id": str(id),
+        "category": category,
+        "status": status,
+        "name": name,
+        "num_files": len(files),
+        "size": sum(file_size for _, file_size in files) if size is None else size,
+        "seeders": seeders,
+        "leechers": leechers,
+        "username": username,
+        "added": added,
+        "descr": "",
+        "imdb": imdb,
+        "language": 1,
+        "textlanguage": 1,
+        "info_hash": f"{id:040X}" if info_hash is None else info_hash,
+        "files": files,
+    }
+
+
+class ApibayStandIn:
+    """Answers q.php (searches, pcnt: and user: queries), t.php and f.php like apibay does.
+
+    Latency is `latency` plus up to `jitter` seconds, and `slow_rate` of the
+    requests take `slow_latency` instead (tail latency). `error_rate` of the
+    requests answer `error_status` and `timeout_rate` of them raise a read
+    timeout. Randomness is seeded so runs are reproducible.
+    """
+
+    def __init__(
+        self,
+        torrents: List[dict] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 1.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        timeout_rate: float = 0.0,
+        page_size: int = 100,
+        seed: int = 0,
+    ):
+        self.torrents = load_fixtures() if torrents is None else torrents
+        self.by_id = {str(torrent["id"]): torrent for torrent in self.torrents}
+        self.by_uploader: Dict[str, List[dict]] = defaultdict(list)
+        for torrent in sorted(self.torrents, key=lambda torrent: torrent["added"], reverse=True):
+            self.by_uploader[torrent["username"]].append(torrent)
+        self._words = {
+            str(torrent["id"]): frozenset(WORD_PATTERN.findall(torrent["name"].lower()))
+            for torrent in self.torrents
+        }
+
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.page_size = page_size
+        self.random = random.Random(seed)
+
+        self.requests: Counter = Counter()  # per endpoint
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport())
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.lstrip("/") or "/"
+        self.requests[endpoint] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            if self.random.random() < self.slow_rate:
+                delay = self.slow_latency
+            if delay:
+                await asyncio.sleep(delay)
+
+            if self.random.random() < self.timeout_rate:
+                raise httpx.ReadTimeout("Injected timeout", request=request)
+            if self.random.random() < self.error_rate:
+                return httpx.Response(self.error_status, text="Injected error")
+            return self.respond(endpoint, request.url.params)
+        finally:
+            self.in_flight -= 1
+
+    def respond(self, endpoint: str, params: httpx.QueryParams) -> httpx.Response:
+        if endpoint == "q.php":
+            query = params.get("q", "")
+            if query.startswith("pcnt:"):
+                return httpx.Response(200, text=str(self.page_count(query.removeprefix("pcnt:"))))
+            if query.startswith("user:"):
+                username, _, page = query.removeprefix("user:").partition(":")
+                return httpx.Response(200, json=self.user_page(username, int(page or 0)))
+            return httpx.Response(200, json=self.search(query, int(params.get("cat", 0))))
+        if endpoint == "t.php":
+            torrent = self.by_id.get(params.get("id", ""))
+            if torrent is None:
+                return httpx.Response(404, text="Not found")
+            return httpx.Response(200, json={key: value for key, value in torrent.items() if key != "files"})
+        if endpoint == "f.php":
+            torrent = self.by_id.get(params.get("id", ""))
+            if torrent is None:
+                return httpx.Response(200, json=NO_FILES)
+            return httpx.Response(
+                200, json=[{"name": [path], "size": [size]} for path, size in torrent["files"]]
+            )
+        if endpoint == "/":
+            return httpx.Response(200, text="apibay stand-in")
+        return httpx.Response(404, text="Not found")
+
+    def search(self, query: str, category: int = 0) -> List[dict]:
+        """Torrents whose name holds every query word, most seeded first (at most 100, like apibay)."""
+        words = set(WORD_PATTERN.findall(query.lower()))
+        results = [
+            torrent
+            for torrent in self.torrents
+            if words <= self._words[str(torrent["id"])] and self._in_category(torrent, category)
+        ]
+        results.sort(key=lambda torrent: torrent["seeders"], reverse=True)
+        return [self.search_row(torrent) for torrent in results[:100]] or [NO_RESULTS]
+
+    def user_page(self, username: str, page: int) -> List[dict]:
+        """A page of the torrents of an uploader, newest first.
+
+        Pages past the end answer the last page, which is what the scrapper
+        requests (page `pcnt:`) to find the oldest upload.
+        """
+        torrents = self.by_uploader.get(username, [])
+        start = min(page, self.page_count(username) - 1) * self.page_size
+        return [self.search_row(torrent) for torrent in torrents[start : start + self.page_size]]
+
+    def page_count(self, username: str) -> int:
+        """Number of pages of an uploader, as pcnt: answers it."""
+        return max(1, -(-len(self.by_uploader.get(username, [])) // self.page_size))
+
+    @staticmethod
+    def search_row(torrent: dict) -> dict:
+        return {field: str(torrent[field]) for field in SEARCH_FIELDS}
+
+    @staticmethod
+    def _in_category(torrent: dict, category: int) -> bool:
+        if not category:
+            return True
+        if category % 100 == 0:  # top level category, e.g. 200 for video
+            return torrent["category"] // 100 * 100 == category
+        return torrent["category"] == category
+
+
+Upstream = ApibayStandIn | Callable[[httpx.Request], Awaitable[httpx.Response]]
+
+
+def connect(scrapper: BaseScrapper, upstream: Upstream | None) -> None:
+    """Send the requests of a scrapper to a stand-in or a request handler.
+
+    The scrapper also gets a rate limiter of its own without a limit, so what is
+    measured is the client rather than the configured host limit.
+    """
+    if isinstance(upstream, ApibayStandIn):
+        scrapper.request_client = upstream.client()
+    elif upstream is not None:
+        scrapper.request_client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    scrapper.rate_limiter = RateLimiter()
+
+
+def make_scrapper(upstream: Upstream | None = None, **options) -> PirateBayScrapper:
+    """Build a PirateBayScrapper answered by a stand-in or a request handler."""
+    scrapper = PirateBayScrapper(**options)
+    connect(scrapper, upstream)
+    return scrapper
+
+
+def make_indexer(upstream: Upstream | None = None, name: str | None = None, **options) -> PirateBayIndexer:
+    """Build a PirateBayIndexer whose scrapper is answered by a stand-in or a request handler."""
+    indexer = PirateBayIndexer(**options)
+    if name is not None:
+        indexer.name = name
+    connect(indexer.scrapper, upstream)
+    return indexer
@@ -0,0 +1,72 @@
+"""Rows/sec of the per-row DBHandler.insert path against the batched upsert_many path."""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from torrent_companion.database import Database
+from torrent_companion.database.handler import DBHandler
+
+
+def make_rows(count: int, offset: int = 0) -> list[dict]:
+    now = datetime.now().isoformat()
+    return [
+        {
+            "uploader_id": 1,
+            "content_type": "movie",
+            "keywords": "matrix",
+            "title": f"The.Matrix.{i}.1999.1080p.BluRay.x264-GROUP",
+            "info_hash": f"{i:040X}",
+            "size": 1_850_000_000 + i,
+            "quality": "1080p",
+            "added_date": now,
+            "magnet_url": f"magnet:?xt=urn:btih:{i:040X}",
+            "scrapped_at": now,
+        }
+        for i in range(offset, offset + count)
+    ]
+
+
+def bench_per_row(handler: DBHandler, rows: list[dict]) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        handler.insert("torrents", row)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def bench_batched(handler: DBHandler, rows: list[dict]) -> float:
+    start = time.perf_counter()
+    handler.upsert_many("torrents", rows)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def run(rows: int = 5_000, journal_mode: str | None = None, synchronous: str | None = None) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, bench in (("per_row", bench_per_row), ("upsert_many", bench_batched)):
+            handler = DBHandler(
+                os.path.join(directory, f"{name}.db"), journal_mode=journal_mode, synchronous=synchronous
+            )
+            Database(handler)
+            results[f"{name}_rows_per_sec"] = bench(handler, make_rows(rows))
+            handler.conn.close()
+            handler.conn = None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--journal-mode", default=None)
+    parser.add_argument("--synchronous", default=None)
+    args = parser.parse_args()
+
+    results = run(args.rows, args.journal_mode, args.synchronous)
+    for name, value in results.items():
+        print(f"{name}: {value:,.0f}")
+    print(f"speedup: {results['upsert_many_rows_per_sec'] / results['per_row_rows_per_sec']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
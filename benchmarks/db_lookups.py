@@ -0,0 +1,110 @@
+"""Latency of the database read API and pruning on a large seeded database (a million torrents by default)."""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from torrent_companion.database import PRUNE_CHUNK_SIZE, Database
+from torrent_companion.database.handler import DBHandler
+
+TITLES = ("Matrix", "Dune", "Inception", "Breaking Bad", "The Office", "Severance", "Andor", "Alien")
+
+
+def seed(database: Database, rows: int, uploaders: int, chunk: int = 50_000) -> float:
+    """Fill the database with synthetic torrents, a tenth of them stale, returning the seconds taken."""
+    start = time.perf_counter()
+    ids = database.uploader_ids(f"uploader{number}" for number in range(uploaders))
+    uploader_ids = list(ids.values())
+    now = datetime.now()
+    fresh, stale = now.isoformat(), (now - timedelta(days=60)).isoformat()
+
+    for offset in range(0, rows, chunk):
+        batch = []
+        for number in range(offset, min(rows, offset + chunk)):
+            episode = number % 3 != 0
+            title = TITLES[number % len(TITLES)]
+            batch.append(
+                {
+                    "uploader_id": uploader_ids[number % len(uploader_ids)],
+                    "content_type": "episode" if episode else "movie",
+                    "keywords": title.lower(),
+                    "title": f"{title}.{number}.1080p.WEB.x264",
+                    "info_hash": f"{number:040X}",
+                    "size": 1_000_000 + number,
+                    "season_number": number % 20 + 1 if episode else None,
+                    "episode_number": number % 24 + 1 if episode else None,
+                    "added_date": (now - timedelta(minutes=number)).isoformat(),
+                    "magnet_url": f"magnet:?xt=urn:btih:{number:040X}",
+                    "scrapped_at": stale if number % 10 == 0 else fresh,
+                }
+            )
+        database.handler.insert_many("torrents", batch)
+    return time.perf_counter() - start
+
+
+def timed(function, samples: list) -> float:
+    """Median milliseconds of a lookup over the samples."""
+    durations = []
+    for sample in samples:
+        start = time.perf_counter()
+        function(*sample)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1e3
+
+
+def run(rows: int = 1_000_000, uploaders: int = 5_000, lookups: int = 200, seed_value: int = 0) -> dict:
+    randomizer = random.Random(seed_value)
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(
+            DBHandler(os.path.join(directory, "db.sqlite"), journal_mode="WAL", synchronous="NORMAL")
+        )
+        results = {"rows": rows, "seed_seconds": seed(database, rows, uploaders)}
+
+        hashes = [(f"{randomizer.randrange(rows):040X}",) for _ in range(lookups)]
+        names = [(f"uploader{randomizer.randrange(uploaders)}", 50) for _ in range(lookups)]
+        numbers = [number for number in randomizer.sample(range(rows), lookups * 2) if number % 3][:lookups]
+        episodes = [(number % 20 + 1, number % 24 + 1) for number in numbers]  # stored ones
+        searches = [(f"{randomizer.choice(TITLES)} {randomizer.randrange(rows)}",) for _ in range(lookups)]
+
+        results["torrent_ms"] = timed(database.torrent, hashes)
+        results["torrents_by_uploader_ms"] = timed(database.torrents_by_uploader, names)
+        results["torrents_by_episode_ms"] = timed(database.torrents_by_episode, episodes)
+        results["torrents_by_season_ms"] = timed(
+            database.torrents_by_episode, [(season,) for season, _ in episodes]
+        )
+        results["uploader_ms"] = timed(database.uploader, [(name,) for name, _ in names])
+        results["search_torrents_ms"] = timed(database.search_torrents, searches)
+
+        # One chunk at a time like the async writer, which applies other writes in between
+        chunk_seconds, pruned = [], 0
+        while True:
+            start = time.perf_counter()
+            deleted = database.prune(timedelta(days=30), max_chunks=1)
+            chunk_seconds.append(time.perf_counter() - start)
+            pruned += deleted
+            if deleted < PRUNE_CHUNK_SIZE:
+                break
+        results["pruned_rows"] = pruned
+        results["prune_seconds"] = sum(chunk_seconds)
+        results["prune_longest_chunk_ms"] = max(chunk_seconds) * 1e3
+        database.handler.conn.close()
+        database.handler.conn = None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--uploaders", type=int, default=5_000)
+    parser.add_argument("--lookups", type=int, default=200, help="lookups timed per read method")
+    args = parser.parse_args()
+
+    for name, value in run(args.rows, args.uploaders, args.lookups).items():
+        print(f"{name}: {value:,.3f}" if isinstance(value, float) else f"{name}: {value:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Cost of decoding apibay rows: per-item model construction against the decoder's batch validation."""
+import argparse
+import time
+from datetime import datetime
+
+from torrent_companion.indexers.definitions.piratebay.decoder import ApibayDecoder, format_timestamp
+from torrent_companion.indexers.definitions.piratebay.models import PBTorrentData
+
+MAGNET_URL = "magnet:?xt=urn:btih:{hash}"
+
+
+def make_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": str(7349687 + i),
+            "name": f"The Matrix ({1999 + i % 20}) 1080p BrRip x264 - 1.85GB - YIFY",
+            "info_hash": f"{i:040X}",
+            "leechers": str(i % 50),
+            "seeders": str(i % 900),
+            "size": str(1_850_000_000 + i),
+            "username": "YIFY",
+            "added": str(1_330_000_000 + i * 3600),
+            "status": "vip",
+            "category": "207",
+            "imdb": "tt0133093",
+        }
+        for i in range(count)
+    ]
+
+
+def decode_per_item(rows: list[dict], keywords: str) -> list[PBTorrentData]:
+    """The construction the scrapper used before the decoder: one validated model per row."""
+    return [
+        PBTorrentData(
+            id=str(item["id"]),
+            name=item["name"],
+            info_hash=item["info_hash"],
+            leechers=item["leechers"],
+            seeders=item["seeders"],
+            size=item["size"],
+            uploader=item["username"],
+            added_date=datetime.fromtimestamp(int(item["added"])).isoformat(),
+            status=item.get("status", "unknown"),
+            category=int(item.get("category", 0)),
+            imdb=item.get("imdb", ""),
+            content_type="movie",
+            keywords=keywords,
+            magnet_link=MAGNET_URL.format(hash=item["info_hash"]),
+        )
+        for item in rows
+    ]
+
+
+def timed(function, rows: list[dict], iterations: int) -> float:
+    """Microseconds per row."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function(rows, "matrix")
+    return (time.perf_counter() - start) / (iterations * len(rows)) * 1e6
+
+
+def run(rows: int = 300, iterations: int = 200) -> dict:
+    payload = make_rows(rows)
+    validated = ApibayDecoder(MAGNET_URL)
+
+    results = {"per_item_us_per_row": timed(decode_per_item, payload, iterations)}
+    format_timestamp.cache_clear()
+    results["batch_validated_us_per_row"] = timed(validated.decode, payload, iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=300, help="rows per payload (apibay pages hold up to 100)")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, value in run(args.rows, args.iterations).items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Names/sec of the release-name analyzer over a corpus of real release names."""
+import argparse
+import time
+from pathlib import Path
+
+from torrent_companion.analysis.release_analyzer import ReleaseNameAnalyzer, parse_release_name
+
+CORPUS_PATH = Path(__file__).parent / "fixtures" / "release_names.txt"
+
+
+def load_corpus() -> list[str]:
+    return [line for line in CORPUS_PATH.read_text().splitlines() if line.strip()]
+
+
+def run(repeat: int = 200) -> dict:
+    names = load_corpus() * repeat
+
+    start = time.perf_counter()
+    for name in names:
+        parse_release_name(name)
+    uncached = len(names) / (time.perf_counter() - start)
+
+    analyzer = ReleaseNameAnalyzer()
+    start = time.perf_counter()
+    for name in names:
+        analyzer.analyze(name)
+    memoized = len(names) / (time.perf_counter() - start)
+
+    return {
+        "names": len(names),
+        "uncached_names_per_sec": uncached,
+        "memoized_names_per_sec": memoized,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="times the corpus is parsed")
+    args = parser.parse_args()
+
+    for name, value in run(args.repeat).items():
+        print(f"{name}: {value:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
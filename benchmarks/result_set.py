@@ -0,0 +1,89 @@
+"""Memory and speed of a compact result set against the lists of models it replaces, on a large uploader crawl."""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.decode import MAGNET_URL, make_rows
+from torrent_companion.indexers.definitions.piratebay.decoder import ApibayDecoder
+
+UPLOADERS = ("YIFY", "eztv", "ettv", "Anonymous", "TvTeam")
+STATUSES = ("vip", "trusted", "member")
+
+
+def load_rows(count: int) -> list[dict]:
+    """Rows as they come out of a response body: every string a separate object."""
+    rows = make_rows(count)
+    for index, row in enumerate(rows):
+        row["username"] = UPLOADERS[index % len(UPLOADERS)]
+        row["status"] = STATUSES[index % len(STATUSES)]
+    return json.loads(json.dumps(rows))
+
+
+def allocated(build) -> tuple[object, int]:
+    """Build a value, returning it with the bytes still allocated for it."""
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def timed(function, iterations: int) -> float:
+    """Milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e3
+
+
+def run(rows: int = 20_000, iterations: int = 20) -> dict:
+    payload = load_rows(rows)
+    decoder = ApibayDecoder(MAGNET_URL)  # the validated decoding the scrapper uses
+
+    models, models_bytes = allocated(lambda: decoder.decode(payload, "user:YIFY"))
+    columns, columns_bytes = allocated(lambda: decoder.decode_columns(payload, "user:YIFY"))
+
+    operations = {
+        "filter": (
+            lambda: [torrent for torrent in models if torrent.seeders > 100],
+            lambda: columns.where_ge("seeders", 101),
+        ),
+        "sort": (
+            lambda: sorted(models, key=lambda torrent: torrent.seeders, reverse=True)[:10],
+            lambda: columns.top("seeders", 10),
+        ),
+        "aggregate": (
+            lambda: (
+                sum(torrent.seeders for torrent in models),
+                max(torrent.added_date for torrent in models),
+            ),
+            lambda: (columns.sum("seeders"), columns.max("added")),
+        ),
+    }
+
+    results = {
+        "models_bytes_per_row": models_bytes / rows,
+        "columns_bytes_per_row": columns_bytes / rows,
+        "models_decode_ms": timed(lambda: decoder.decode(payload, "user:YIFY"), iterations),
+        "columns_decode_ms": timed(lambda: decoder.decode_columns(payload, "user:YIFY"), iterations),
+    }
+    for name, (on_models, on_columns) in operations.items():
+        results[f"models_{name}_ms"] = timed(on_models, iterations)
+        results[f"columns_{name}_ms"] = timed(on_columns, iterations)
+    results["to_models_ms"] = timed(lambda: decoder.to_models(columns.top("seeders", 100)), iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, value in run(args.rows, args.iterations).items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time to first result of the streaming /search endpoint against its total latency, over stand-in indexers."""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlencode
+
+from benchmarks.apibay_standin import ApibayStandIn, make_indexer
+from torrent_companion.app import app
+from torrent_companion.indexers.aggregator import SearchAggregator
+
+
+def make_aggregator(latencies: list[float]) -> SearchAggregator:
+    indexers = [
+        make_indexer(ApibayStandIn(latency=latency, jitter=latency / 4, seed=number), name=f"standin-{number}")
+        for number, latency in enumerate(latencies)
+    ]
+    return SearchAggregator(indexers, deadline=max(latencies) * 4)
+
+
+async def timed_request(query: str) -> tuple[float, float]:
+    """Send GET /search straight to the ASGI app, timing the first body chunk and the end of the response."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/search",
+        "raw_path": b"/search",
+        "query_string": urlencode({"q": query}).encode(),
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    received = False
+    never = asyncio.Event()
+    first_chunk = None
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await never.wait()  # the client never disconnects
+
+    async def send(message):
+        nonlocal first_chunk
+        if message["type"] == "http.response.body" and message.get("body") and first_chunk is None:
+            first_chunk = time.perf_counter() - start
+
+    await app(scope, receive, send)
+    return first_chunk, time.perf_counter() - start
+
+
+async def bench(latencies: list[float], queries: list[str]) -> dict:
+    app.state.aggregator = make_aggregator(latencies)
+    first_results, totals = [], []
+    for query in queries:
+        first_result, total = await timed_request(query)
+        first_results.append(first_result)
+        totals.append(total)
+
+    return {
+        "stream_first_result_seconds": statistics.median(first_results),
+        "stream_total_seconds": statistics.median(totals),
+        "fastest_indexer_latency": min(latencies),
+        "slowest_indexer_latency": max(latencies),
+    }
+
+
+def run(latencies: list[float] | None = None, queries: list[str] | None = None) -> dict:
+    latencies = latencies or [0.05, 0.2, 0.6]
+    queries = queries or ["matrix", "inception", "dune", "interstellar", "oppenheimer"]
+    return asyncio.run(bench(latencies, queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--latencies", type=float, nargs="+", default=[0.05, 0.2, 0.6], help="latency of each stand-in indexer"
+    )
+    args = parser.parse_args()
+
+    for name, value in run(args.latencies).items():
+        print(f"{name}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
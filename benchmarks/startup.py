@@ -0,0 +1,97 @@
+"""Cold start cost: importing the app, discovering indexer definitions and loading one on first use."""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from torrent_companion.indexers.registry import DEFINITIONS_PATH, METADATA_FILENAME
+
+# Run in a fresh interpreter each time, so nothing is imported yet
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+{setup}
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": len(sys.modules)}}))
+"""
+
+SCENARIOS = {
+    "import_app": "import torrent_companion.app",
+    "discover": (
+        "from torrent_companion.indexers.registry import IndexerRegistry\n"
+        "IndexerRegistry(sys.argv[1])"
+    ),
+    "first_use": (
+        "from torrent_companion.indexers.registry import IndexerRegistry\n"
+        "IndexerRegistry(sys.argv[1]).get('The Pirate Bay')"
+    ),
+    "eager_import": (
+        "from torrent_companion.indexers.definitions.piratebay.indexer import PirateBayIndexer\n"
+        "PirateBayIndexer()"
+    ),
+}
+
+
+def measure(setup: str, repeat: int, *args: str) -> dict:
+    """Median seconds and modules loaded of a setup in fresh interpreters."""
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", CHILD.format(setup=setup), *args],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.splitlines()[-1]
+        )
+        for _ in range(repeat)
+    ]
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "modules": runs[-1]["modules"],
+    }
+
+
+def make_definitions(root: Path, count: int) -> Path:
+    """Metadata-only copies of the Pirate Bay definition, standing in for a growing definitions folder."""
+    metadata = (DEFINITIONS_PATH / "piratebay" / METADATA_FILENAME).read_text()
+    for number in range(count):
+        package = root / f"copy{number}"
+        package.mkdir()
+        (package / METADATA_FILENAME).write_text(
+            metadata.replace('"The Pirate Bay"', f'"Copy {number}"')
+        )
+    return root
+
+
+def run(repeat: int = 5, definitions: tuple = (0, 100)) -> dict:
+    results = {}
+    for name, setup in SCENARIOS.items():
+        measured = measure(setup, repeat, str(DEFINITIONS_PATH))
+        results[f"{name}_seconds"] = measured["seconds"]
+        results[f"{name}_modules"] = measured["modules"]
+
+    for count in definitions:
+        with tempfile.TemporaryDirectory() as root:
+            path = make_definitions(Path(root), count)
+            results[f"discover_{count}_copies_seconds"] = measure(
+                SCENARIOS["discover"], repeat, str(path)
+            )["seconds"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument(
+        "--definitions", type=int, nargs="+", default=[0, 100], help="metadata-only definitions to discover"
+    )
+    args = parser.parse_args()
+
+    for name, value in run(args.repeat, tuple(args.definitions)).items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Offline benchmark suite against the apibay stand-in, emitting JSON results comparable across commits."""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks import db_ingest, db_lookups, decode, result_set, search_stream, startup, tail_latency
+from benchmarks.apibay_standin import ApibayStandIn, make_scrapper
+from torrent_companion.indexers.cache import ResultCache
+
+
+def search_queries(standin: ApibayStandIn) -> list[str]:
+    """One query per distinct title in the fixtures (its first two words)."""
+    queries = (" ".join(torrent["name"].replace(".", " ").split()[:2]) for torrent in standin.torrents)
+    return list(dict.fromkeys(queries))
+
+
+async def bench_search(latency: float, concurrency: int, repeat: int) -> dict:
+    """Searches/sec with the search cache disabled (every search hits the stand-in) and enabled."""
+    results = {}
+    for name, cache in (("uncached", ResultCache(max_bytes=0)), ("cached", ResultCache())):
+        standin = ApibayStandIn(latency=latency)
+        scrapper = make_scrapper(standin, search_cache=cache, max_concurrency=concurrency)
+        queries = search_queries(standin)
+
+        # One round per repeat, so identical searches are not coalesced in flight
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await asyncio.gather(*(scrapper.search(query) for query in queries))
+        elapsed = time.perf_counter() - start
+
+        results[f"search_{name}_per_sec"] = len(queries) * repeat / elapsed
+        results[f"search_{name}_upstream_requests"] = standin.requests["q.php"]
+    return results
+
+
+async def bench_uploader_profiles(latency: float, concurrency: int, page_size: int) -> dict:
+    """Wall-clock time to profile every uploader of the fixtures."""
+    standin = ApibayStandIn(latency=latency, page_size=page_size)
+    scrapper = make_scrapper(standin, max_concurrency=concurrency)
+
+    start = time.perf_counter()
+    profiles = await scrapper.get_uploader_profiles(standin.by_uploader, read_pages=5)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "uploader_profiles": sum(profile is not None for profile in profiles.values()),
+        "uploader_profiles_seconds": elapsed,
+        "uploader_profiles_requests": sum(standin.requests.values()),
+    }
+
+
+def run(
+    latency: float = 0.02,
+    concurrency: int = 8,
+    repeat: int = 3,
+    page_size: int = 20,
+    decode_iterations: int = 50,
+    ingest_rows: int = 5_000,
+    lookup_rows: int = 1_000_000,
+) -> dict:
+    results = {}
+    results.update(asyncio.run(bench_search(latency, concurrency, repeat)))
+    results.update(asyncio.run(bench_uploader_profiles(latency, concurrency, page_size)))
+    results.update(search_stream.run())
+    for name, value in decode.run(iterations=decode_iterations).items():
+        results[f"decode_{name}"] = value
+    for name, value in db_ingest.run(rows=ingest_rows).items():
+        results[f"db_ingest_{name}"] = value
+    for name, value in db_lookups.run(rows=lookup_rows).items():
+        results[f"db_lookups_{name}"] = value
+    for name, value in result_set.run().items():
+        results[f"result_set_{name}"] = value
+    for name, value in startup.run().items():
+        results[f"startup_{name}"] = value
+    for name, value in tail_latency.run().items():
+        results[f"tail_latency_{name}"] = value
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Print every metric next to its baseline value and the ratio between them."""
+    for name, value in results.items():
+        previous = baseline.get(name)
+        if isinstance(previous, (int, float)) and previous:
+            print(f"{name}: {previous:,.2f} -> {value:,.2f} ({value / previous:.2f}x)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in latency per request, in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="scrapper concurrency cap")
+    parser.add_argument("--repeat", type=int, default=3, help="times each search query is sent")
+    parser.add_argument("--page-size", type=int, default=20, help="uploader page size of the stand-in")
+    parser.add_argument("--decode-iterations", type=int, default=50)
+    parser.add_argument("--ingest-rows", type=int, default=5_000)
+    parser.add_argument("--lookup-rows", type=int, default=1_000_000, help="torrents seeded for the lookups")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "parameters": {
+            key: value for key, value in vars(args).items() if key not in ("output", "compare")
+        },
+        "results": run(
+            args.latency,
+            args.concurrency,
+            args.repeat,
+            args.page_size,
+            args.decode_iterations,
+            args.ingest_rows,
+            args.lookup_rows,
+        ),
+    }
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(report["results"], json.load(file)["results"])
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
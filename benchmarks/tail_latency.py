@@ -0,0 +1,137 @@
+"""Tail latency and error rate of detail requests against a stand-in with slow and failing requests,
+without and with hedging and retries."""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+from benchmarks.apibay_standin import ApibayStandIn, make_scrapper
+from torrent_companion.indexers.deadline import DeadlineExceededError, deadline
+from torrent_companion.indexers.health import CircuitOpenError
+from torrent_companion.indexers.retry import RETRY_STATUSES, RetryPolicy
+
+POLICIES = {
+    "baseline": RetryPolicy(hedge_percentile=None, max_attempts=1),
+    "hedged": RetryPolicy(),
+}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))]
+
+
+async def bench(
+    policy: RetryPolicy,
+    requests: int,
+    concurrency: int,
+    latency: float,
+    slow_rate: float,
+    slow_latency: float,
+    error_rate: float,
+    timeout_rate: float,
+    request_deadline: float,
+) -> dict:
+    standin = ApibayStandIn(
+        latency=latency,
+        jitter=latency / 2,
+        slow_rate=slow_rate,
+        slow_latency=slow_latency,
+        error_rate=error_rate,
+        timeout_rate=timeout_rate,
+    )
+    scrapper = make_scrapper(standin, retry_policy=policy, max_concurrency=concurrency)
+    # The circuit breaker would shed requests once errors pile up; measure the requests themselves
+    scrapper.health_tracker.error_threshold = 1.1
+
+    ids = [str(torrent["id"]) for torrent in standin.torrents]
+    pick = random.Random(0)
+    # Seed the latency window the hedge delay is read from
+    await asyncio.gather(
+        *(scrapper.fetch(scrapper.build_url(scrapper.torrent_info, id=id)) for id in ids[:50]),
+        return_exceptions=True,
+    )
+    standin.requests.clear()
+
+    latencies: list[float] = []
+    errors = 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(number: int) -> None:
+        nonlocal errors
+        # A distinct URL per request, so single flight does not coalesce them
+        url = scrapper.build_url(scrapper.torrent_info, id=pick.choice(ids)) + f"&n={number}"
+        async with slots:
+            start = time.perf_counter()
+            try:
+                with deadline(request_deadline):
+                    response = await scrapper.fetch(url)
+                failed = response.status_code in RETRY_STATUSES
+            except (httpx.HTTPError, CircuitOpenError, DeadlineExceededError):
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    await asyncio.gather(*(one(number) for number in range(requests)))
+    await scrapper.request_client.aclose()
+
+    return {
+        "p50_seconds": statistics.median(latencies),
+        "p95_seconds": percentile(latencies, 95),
+        "p99_seconds": percentile(latencies, 99),
+        "max_seconds": max(latencies),
+        "error_rate": errors / requests,
+        "upstream_requests_per_call": sum(standin.requests.values()) / requests,
+        "hedges": scrapper.hedges,
+        "retries": scrapper.retries,
+    }
+
+
+def run(
+    requests: int = 500,
+    concurrency: int = 16,
+    latency: float = 0.02,
+    slow_rate: float = 0.05,
+    slow_latency: float = 1.0,
+    error_rate: float = 0.02,
+    timeout_rate: float = 0.01,
+    request_deadline: float = 3.0,
+) -> dict:
+    results = {}
+    for name, policy in POLICIES.items():
+        measured = asyncio.run(
+            bench(
+                policy, requests, concurrency, latency, slow_rate, slow_latency,
+                error_rate, timeout_rate, request_deadline,
+            )
+        )
+        for metric, value in measured.items():
+            results[f"{name}_{metric}"] = value
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in latency per request, in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="share of requests taking --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of requests answering 503")
+    parser.add_argument("--timeout-rate", type=float, default=0.01, help="share of requests timing out")
+    parser.add_argument("--deadline", type=float, default=3.0, help="deadline of every call, in seconds")
+    args = parser.parse_args()
+
+    results = run(
+        args.requests, args.concurrency, args.latency, args.slow_rate, args.slow_latency,
+        args.error_rate, args.timeout_rate, args.deadline,
+    )
+    for name, value in results.items():
+        print(f"{name}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from torrent_companion.analysis.common_types import Resolution, ReleaseSource, VideoCodec
+from torrent_companion.analysis.release_analyzer import ReleaseNameAnalyzer
+from torrent_companion.indexers.definitions.piratebay.models import (
+    PBTorrentData,
+    PBTorrentSearchResponse,
+)
+
+
+def test_analyze_movie_release():
+    info = ReleaseNameAnalyzer().analyze("The Matrix (1999) 1080p BrRip x264 - 1.85GB - YIFY")
+
+    assert info.title == "The Matrix"
+    assert info.year == 1999
+    assert info.resolution == Resolution.FHD
+    assert info.source == ReleaseSource.BLURAY
+    assert info.codec == VideoCodec.H264
+    assert info.group == "YIFY"
+    assert not info.is_episode
+
+
+def test_analyze_episode_releases():
+    analyzer = ReleaseNameAnalyzer()
+
+    episode = analyzer.analyze("The.Office.US.S03E01-E02.1080p.WEB-DL.DDP5.1.H.264-NTb")
+    assert (episode.season, episode.episode, episode.last_episode) == (3, 1, 2)
+    assert episode.audio == "DD+ 5.1"
+    assert episode.group == "NTb"
+
+    pack = analyzer.analyze("Game of Thrones Season 8 Complete 1080p WEB-DL x265 HEVC-MeGusta")
+    assert pack.is_season_pack
+    assert pack.season == 8
+
+    anime = analyzer.analyze("[SubsPlease] Jujutsu Kaisen - 24 (1080p) [ABCD1234].mkv")
+    assert anime.title == "Jujutsu Kaisen"
+    assert anime.episode == 24
+    assert anime.group == "SubsPlease"
+
+
+def test_analyze_is_memoized():
+    analyzer = ReleaseNameAnalyzer()
+
+    first = analyzer.analyze("Dark.S03E08.GERMAN.1080p.NF.WEBRip.DDP5.1.x264-NTb")
+    second = analyzer.analyze("Dark.S03E08.GERMAN.1080p.NF.WEBRip.DDP5.1.x264-NTb")
+
+    assert first is second
+    assert analyzer.cache_info().hits == 1
+
+
+def test_analyze_many_fills_search_response():
+    def torrent(name):
+        return PBTorrentData(
+            id="1",
+            name=name,
+            uploader="someone",
+            size=1,
+            content_type="movie",
+            keywords="dark",
+            leechers=0,
+            seeders=0,
+            info_hash="HASH",
+            magnet_link="magnet:?xt=urn:btih:HASH",
+            added_date="2020-01-01T00:00:00",
+            category=205,
+            status="member",
+            imdb="",
+        )
+
+    response = PBTorrentSearchResponse(
+        success=True,
+        query="dark",
+        results=[torrent("Dark.S03E08.GERMAN.1080p.NF.WEBRip.DDP5.1.x264-NTb"), torrent("Dark (2005) DVDRip")],
+        total_results=2,
+    )
+
+    ReleaseNameAnalyzer().analyze_many(response)
+
+    episode, movie = response.results
+    assert (episode.quality, episode.language) == ("1080p", "German")
+    assert (episode.content_type, episode.season_number, episode.episode_number) == ("episode", 3, 8)
+    assert (movie.quality, movie.content_type, movie.season_number) == ("Unknown", "movie", None)
@@ -0,0 +1,48 @@
+import pytest
+from fastapi.testclient import TestClient
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.app import app
+from torrent_companion.metrics import RESPONSES, STAGE_SECONDS, MetricsRegistry, metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("indexer",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "apibay.org")
+    histogram.observe(0.5, "apibay.org")
+    histogram.observe(5, "apibay.org")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{indexer="apibay.org",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{indexer="apibay.org",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{indexer="apibay.org",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{indexer="apibay.org"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_search_stages_are_recorded_and_exposed(make_scrapper):
+    network = STAGE_SECONDS.count("apibay.org", "network")
+    decode = STAGE_SECONDS.count("apibay.org", "decode")
+    ok = RESPONSES.value("apibay.org", "/q.php", "200")
+
+    await make_scrapper(ApibayStandIn()).search("matrix")
+
+    assert STAGE_SECONDS.count("apibay.org", "network") == network + 1
+    assert STAGE_SECONDS.count("apibay.org", "decode") == decode + 1
+    assert RESPONSES.value("apibay.org", "/q.php", "200") == ok + 1
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'indexer_stage_seconds_count{indexer="apibay.org",stage="json"}' in response.text
+
+
+@pytest.mark.asyncio
+async def test_disabled_metrics_record_nothing(monkeypatch, make_scrapper):
+    monkeypatch.setattr(metrics, "enabled", False)
+    network = STAGE_SECONDS.count("apibay.org", "network")
+
+    await make_scrapper(ApibayStandIn()).search("inception")
+
+    assert STAGE_SECONDS.count("apibay.org", "network") == network
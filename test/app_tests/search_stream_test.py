@@ -0,0 +1,74 @@
+import json
+
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.app import app, app_lifespan
+from torrent_companion.indexers.aggregator import SearchAggregator
+
+
+@pytest.fixture
+def client(monkeypatch, make_indexer):
+    fast = make_indexer(ApibayStandIn(latency=0.01), name="fast")
+    slow = make_indexer(ApibayStandIn(latency=0.3), name="slow")
+    aggregator = SearchAggregator([fast, slow])
+    monkeypatch.setattr(app.state, "aggregator", aggregator, raising=False)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_ndjson_search_streams_each_indexer_as_it_answers(client):
+    response = await client.get("/search", params={"q": "matrix"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [(event["event"], event.get("indexer")) for event in events] == [
+        ("results", "fast"),
+        ("analysis", "fast"),
+        ("results", "slow"),  # same torrents, nothing new to analyze
+        ("done", None),
+    ]
+
+    first, done = events[0], events[-1]
+    assert first["results"] and first["elapsed"] < 0.2 < done["elapsed"]
+    assert events[2]["results"] == []
+    assert done["total_results"] == len(first["results"])
+    assert done["indexers"] == {"fast": "ok", "slow": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_sse_search_with_a_deadline(client):
+    response = await client.get(
+        "/search",
+        params={"q": "matrix", "deadline": 0.1, "analyze": False},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = [message for message in response.text.split("\n\n") if message]
+    assert [message.splitlines()[0] for message in messages] == [
+        "event: results",
+        "event: indexer",
+        "event: done",
+    ]
+    done = json.loads(messages[-1].splitlines()[1].removeprefix("data: "))
+    assert done["partial"] is True
+    assert done["indexers"] == {"fast": "ok", "slow": "timeout"}
+
+
+@pytest.mark.asyncio
+async def test_app_searches_are_stored_in_the_database(tmp_path, monkeypatch, connect):
+    monkeypatch.setenv("DB_FILEPATH", str(tmp_path / "db.sqlite"))
+    monkeypatch.setenv("WARMUP_INTERVAL_MINUTES", "60")
+
+    async with app_lifespan(app):
+        indexer = app.state.registry.get("The Pirate Bay")
+        assert indexer.scrapper.database is app.state.database
+        connect(indexer.scrapper, ApibayStandIn())
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        response = await client.get("/search", params={"q": "matrix", "analyze": False})
+        assert json.loads(response.text.splitlines()[-1])["total_results"]
+
+        await app.state.database.flush()
+        assert await app.state.database.search_torrents("matrix")
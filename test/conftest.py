@@ -0,0 +1,55 @@
+import pytest
+from benchmarks import apibay_standin
+from torrent_companion.indexers.common_models import BaseTorrentData
+
+
+@pytest.fixture
+def connect():
+    """Point an existing scrapper at a stand-in or a request handler."""
+    return apibay_standin.connect
+
+
+@pytest.fixture
+def make_scrapper():
+    """Build a PirateBayScrapper answered by a stand-in or a request handler."""
+    return apibay_standin.make_scrapper
+
+
+@pytest.fixture
+def make_indexer():
+    """Build a PirateBayIndexer whose scrapper is answered by a stand-in or a request handler."""
+    return apibay_standin.make_indexer
+
+
+@pytest.fixture
+def make_torrent():
+    """Build a torrent model to store, a movie unless a season is given."""
+
+    def make(
+        name: str,
+        info_hash: str,
+        uploader: str = "YIFY",
+        keywords: str = "matrix",
+        content_type: str | None = None,
+        quality: str = "Unknown",
+        season: int | None = None,
+        episode: int | None = None,
+        added_date: str = "2020-01-01T00:00:00",
+    ) -> BaseTorrentData:
+        return BaseTorrentData(
+            name=name,
+            uploader=uploader,
+            size=100,
+            content_type=content_type or ("movie" if season is None else "episode"),
+            keywords=keywords,
+            quality=quality,
+            leechers=1,
+            seeders=10,
+            info_hash=info_hash,
+            magnet_link=f"magnet:?xt=urn:btih:{info_hash}",
+            added_date=added_date,
+            season_number=season,
+            episode_number=episode,
+        )
+
+    return make
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from torrent_companion.database.async_database import AsyncDatabase, DatabaseWriteError
+
+
+@pytest.mark.asyncio
+async def test_queued_writes_are_coalesced_and_readable_after_flush(tmp_path, make_torrent):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"), readers=2)
+
+    await asyncio.gather(
+        *(database.save_torrents([make_torrent(f"The Matrix {i}", f"{i:040X}")]) for i in range(50))
+    )
+    await database.flush()
+
+    rows = await database.search_torrents("matrix", limit=100)
+    metrics = database.metrics()
+    assert len(rows) == 50
+    assert metrics["rows_written"] == 50
+    assert metrics["batches"] < 50
+    assert metrics["queue_depth"] == 0
+    assert metrics["errors"] == 0
+
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure(tmp_path):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"), max_queue=1)
+
+    await asyncio.gather(
+        *(database.upsert_many("uploaders", [{"name": f"user{i}"}], ("id",)) for i in range(20))
+    )
+    await database.close()
+
+    count = await database.read(lambda db: db.handler.query("SELECT COUNT(*) AS n FROM uploaders"))
+    assert count[0]["n"] == 20
+    assert database.metrics()["enqueued"] == 21  # 20 writes and the closing flush
+
+
+@pytest.mark.asyncio
+async def test_failed_write_only_loses_itself(tmp_path, make_torrent):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"))
+
+    await database.insert_many("uploaders", [{"name": "first"}])
+    await database.insert_many("uploaders", [{"name": "first"}])  # breaks the unique uploader name
+    await database.insert_many("uploaders", [{"name": "second"}])
+    await database.save_torrents([make_torrent("The Matrix", "A" * 40)])
+    with pytest.raises(DatabaseWriteError):
+        await database.flush()
+
+    names = await database.read(lambda db: db.handler.query("SELECT name FROM uploaders ORDER BY name"))
+    assert [row["name"] for row in names] == ["YIFY", "first", "second"]
+    assert await database.torrent("A" * 40) is not None
+    assert database.metrics()["errors"] == 1
+
+    await database.flush()  # failures are only reported once
+    await database.close()
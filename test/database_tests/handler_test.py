@@ -0,0 +1,45 @@
+from torrent_companion.database import Database
+from torrent_companion.database.handler import DBHandler
+
+
+def torrent_row(info_hash: str, seeders_title: str = "The Matrix"):
+    return {
+        "uploader_id": 1,
+        "content_type": "movie",
+        "keywords": "matrix",
+        "title": seeders_title,
+        "info_hash": info_hash,
+        "size": 100,
+        "added_date": "2025-01-01T00:00:00",
+        "magnet_url": f"magnet:?xt=urn:btih:{info_hash}",
+        "scrapped_at": "2025-01-01T00:00:00",
+    }
+
+
+def test_insert_many_writes_all_rows(tmp_path):
+    handler = DBHandler(str(tmp_path / "db.sqlite"))
+    Database(handler)
+
+    written = handler.insert_many("torrents", [torrent_row(f"HASH{i}") for i in range(50)])
+
+    assert written == 50
+    assert handler.conn.execute("SELECT COUNT(*) FROM torrents").fetchone()[0] == 50
+
+
+def test_upsert_many_updates_on_info_hash_conflict(tmp_path):
+    handler = DBHandler(str(tmp_path / "db.sqlite"))
+    Database(handler)
+
+    handler.upsert_many("torrents", [torrent_row("HASH1"), torrent_row("HASH2")])
+    handler.upsert_many("torrents", [torrent_row("HASH1", "The Matrix Reloaded")])
+
+    rows = handler.conn.execute("SELECT info_hash, title FROM torrents ORDER BY info_hash").fetchall()
+    assert rows == [("HASH1", "The Matrix Reloaded"), ("HASH2", "The Matrix")]
+    assert len(handler._statements) == 1
+
+
+def test_wal_pragma(tmp_path):
+    handler = DBHandler(str(tmp_path / "db.sqlite"), journal_mode="WAL", synchronous="NORMAL")
+
+    assert handler.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert handler.conn.execute("PRAGMA synchronous").fetchone()[0] == 1
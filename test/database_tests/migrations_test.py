@@ -0,0 +1,113 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from torrent_companion.database import TORRENTS_BY_EPISODE, TORRENTS_BY_UPLOADER, Database
+from torrent_companion.database.async_database import AsyncDatabase
+from torrent_companion.database.handler import DBHandler
+from torrent_companion.database.migrations import SCHEMA_VERSION
+
+
+def query_plan(database: Database, sql: str, params) -> str:
+    rows = database.handler.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return " ".join(row[-1] for row in rows)
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    legacy = sqlite3.connect(path)
+    legacy.executescript(
+        """
+        CREATE TABLE uploaders (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL);
+        CREATE TABLE torrents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, uploader_id INTEGER NOT NULL,
+            content_type TEXT NOT NULL, keywords TEXT NOT NULL, title TEXT NOT NULL,
+            info_hash TEXT NOT NULL UNIQUE, size INTEGER NOT NULL, episode_number INTEGER,
+            season_number INTEGER, added_date TEXT NOT NULL, magnet_url TEXT NOT NULL,
+            scrapped_at TEXT NOT NULL
+        );
+        INSERT INTO uploaders (name) VALUES ('YIFY'), ('eztv'), ('YIFY');
+        INSERT INTO torrents (uploader_id, content_type, keywords, title, info_hash, size,
+            added_date, magnet_url, scrapped_at)
+        VALUES (3, 'movie', 'matrix', 'The Matrix', 'A', 1, '2020', 'magnet:A', '2020');
+        """
+    )
+    legacy.close()
+
+    database = Database(DBHandler(path))
+
+    assert database.handler.user_version == SCHEMA_VERSION
+    assert [row["name"] for row in database.handler.select("uploaders", order_by="id")] == ["YIFY", "eztv"]
+    assert database.torrent("A")["uploader"] == "YIFY"
+    assert "payload" in database.handler.table_columns("torrents")
+    assert database.search_torrents("matrix")[0]["info_hash"] == "A"
+
+    # Migrating again is a no-op
+    assert Database(DBHandler(path)).handler.user_version == SCHEMA_VERSION
+
+
+def test_newer_schema_is_refused(tmp_path):
+    handler = DBHandler(str(tmp_path / "db.sqlite"))
+    handler.user_version = SCHEMA_VERSION + 1
+    with pytest.raises(RuntimeError):
+        Database(handler)
+
+
+def test_lookups_use_the_indexes(tmp_path, make_torrent):
+    database = Database(DBHandler(str(tmp_path / "db.sqlite")))
+    database.save_torrents(
+        [
+            make_torrent("Show S01E01", "1", uploader="eztv", season=1, episode=1, added_date="2020-01-01"),
+            make_torrent("Show S01E02", "2", uploader="eztv", season=1, episode=2, added_date="2020-01-02"),
+            make_torrent("Show S02E01", "3", uploader="ettv", season=2, episode=1, added_date="2020-01-03"),
+            make_torrent("The Matrix", "4"),
+        ]
+    )
+
+    assert [row["info_hash"] for row in database.torrents_by_uploader("eztv")] == ["2", "1"]
+    assert [row["info_hash"] for row in database.torrents_by_episode(1)] == ["1", "2"]
+    assert [row["info_hash"] for row in database.torrents_by_episode(1, 2)] == ["2"]
+    assert database.torrent("4")["uploader"] == "YIFY"
+    assert database.torrent("5") is None
+    assert database.uploader("ettv")["name"] == "ettv"
+
+    assert "torrents_uploader_id" in query_plan(database, TORRENTS_BY_UPLOADER, ("eztv", 10))
+    assert "uploaders_name" in query_plan(database, TORRENTS_BY_UPLOADER, ("eztv", 10))
+    assert "torrents_episode" in query_plan(database, TORRENTS_BY_EPISODE, ("episode", 1, 2, 10))
+
+
+@pytest.mark.asyncio
+async def test_stale_rows_are_pruned(tmp_path, make_torrent):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"), readers=1)
+    old = (datetime.now() - timedelta(days=40)).isoformat()
+    await database.save_torrents([make_torrent("The Matrix", "1")], scrapped_at=old)
+    await database.save_torrents([make_torrent("The Matrix Reloaded", "2")])
+    await database.prune(timedelta(days=30))
+    await database.flush()
+
+    assert [row["info_hash"] for row in await database.search_torrents("matrix")] == ["2"]
+    assert database.metrics()["pruned"] == 1
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_pruning_goes_in_chunks_between_other_writes(tmp_path, make_torrent):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"), readers=1, prune_chunk_size=2)
+    old = (datetime.now() - timedelta(days=40)).isoformat()
+    await database.save_torrents(
+        [make_torrent(f"The Matrix {number}", f"{number:X}") for number in range(1, 6)], scrapped_at=old
+    )
+    await database.flush()
+
+    await database.prune(timedelta(days=30))
+    await database.save_torrents([make_torrent("The Matrix Reloaded", "A")])
+    await database.flush()  # waits for every chunk
+
+    assert [row["info_hash"] for row in await database.search_torrents("matrix")] == ["A"]
+    assert database.metrics()["pruned"] == 5
+    await database.close()
+
+    sync = Database(DBHandler(str(tmp_path / "db.sqlite")))
+    sync.save_torrents([make_torrent(f"Dune {number}", f"B{number}") for number in range(5)], scrapped_at=old)
+    assert sync.prune(timedelta(days=30), chunk_size=2, max_chunks=1) == 2
+    assert sync.prune(timedelta(days=30), chunk_size=2) == 3
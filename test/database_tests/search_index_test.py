@@ -0,0 +1,73 @@
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn, recorded_torrent
+from torrent_companion.database import Database
+from torrent_companion.database.async_database import AsyncDatabase
+from torrent_companion.database.handler import DBHandler
+from torrent_companion.indexers.definitions.piratebay.types import PirateBayCategory
+
+
+@pytest.fixture
+def database(tmp_path):
+    return Database(DBHandler(str(tmp_path / "db.sqlite")))
+
+
+def test_search_ranks_title_matches_first(database, make_torrent):
+    database.save_torrents(
+        [
+            make_torrent("Some Other Movie 2003", "A", keywords="matrix reloaded"),
+            make_torrent("The.Matrix.Reloaded.2003.1080p.BluRay", "B", keywords="sci-fi", quality="1080p"),
+            make_torrent("Breaking.Bad.S05E14.720p", "C", keywords="breaking bad", content_type="episode", season=5, episode=14),
+        ]
+    )
+
+    assert [row["info_hash"] for row in database.search_torrents("matrix reloaded")] == ["B", "A"]
+    assert [row["info_hash"] for row in database.search_torrents("matrix", quality="1080p")] == ["B"]
+    assert database.search_torrents("breaking bad", season_number=5, episode_number=13) == []
+    assert database.search_torrents("breaking bad", content_type="episode")[0]["uploader"] == "YIFY"
+    assert database.search_torrents('"; DROP TABLE torrents; --') == []
+
+
+def test_index_follows_upserts(database, make_torrent):
+    database.save_torrents([make_torrent("The Matrix", "A")])
+    database.save_torrents([make_torrent("Inception", "A", keywords="dream")])
+
+    assert database.search_torrents("matrix") == []
+    assert database.search_torrents("inception")[0]["info_hash"] == "A"
+
+
+@pytest.mark.asyncio
+async def test_scrapper_answers_from_local_index_first(tmp_path, make_scrapper):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"))
+    standin = ApibayStandIn(
+        [recorded_torrent(i, f"The.Matrix.{i}.1080p", username="YIFY", status="vip") for i in range(1, 4)]
+    )
+
+    first = await make_scrapper(standin, database=database, local_min_results=3).search("matrix")
+    await database.flush()
+    # A fresh memory cache, same database
+    second = await make_scrapper(standin, database=database, local_min_results=3).search("matrix")
+
+    assert standin.requests["q.php"] == 1
+    assert sorted(torrent.id for torrent in second.results) == sorted(torrent.id for torrent in first.results)
+    assert second.results[0].status == "vip"
+
+    # The stored rows are all HD movies, too few for another category
+    scrapper = make_scrapper(standin, database=database, local_min_results=3)
+    assert len((await scrapper.search("matrix", PirateBayCategory.HD_MOVIES)).results) == 3
+    assert standin.requests["q.php"] == 1
+    await scrapper.search("matrix", PirateBayCategory.HD_TV_SHOWS)
+    assert standin.requests["q.php"] == 2
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_no_results_placeholder_is_not_stored(tmp_path, make_scrapper):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"))
+
+    response = await make_scrapper(ApibayStandIn(), database=database).search("zzzznotatitle")
+    await database.flush()
+
+    assert response.success and response.results == []
+    assert await database.torrent("0" * 40) is None
+    assert await database.search_torrents("results returned") == []
+    await database.close()
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.database.async_database import AsyncDatabase
+
+
+@pytest.mark.asyncio
+async def test_profiles_are_stored_and_refreshed_incrementally(tmp_path, make_scrapper):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"))
+    standin = ApibayStandIn(page_size=20)
+
+    first = await make_scrapper(standin, database=database).get_uploader_profile("YIFY")
+    await database.flush()
+    crawl_requests = sum(standin.requests.values())
+    assert crawl_requests == 7  # pcnt, five pages and the last page
+    assert first.total_uploads == 100
+
+    # Fresh: answered from the database
+    assert (await make_scrapper(standin, database=database).get_uploader_profile("YIFY")) == first
+    assert sum(standin.requests.values()) == crawl_requests
+
+    # Stale: one page is enough to pick up the new upload
+    newest = max(standin.by_uploader["YIFY"], key=lambda torrent: torrent["added"])
+    upload = {**newest, "id": "99999999", "added": newest["added"] + 3600, "seeders": 42, "leechers": 4}
+    standin.torrents.append(upload)
+    standin.by_id[upload["id"]] = upload
+    standin.by_uploader["YIFY"].insert(0, upload)
+
+    stale = make_scrapper(standin, database=database, profile_max_age=timedelta(0))
+    refreshed = await stale.get_uploader_profile("YIFY")
+    await database.flush()
+
+    assert sum(standin.requests.values()) == crawl_requests + 1
+    assert refreshed.total_uploads == first.total_uploads + 1
+    assert refreshed.total_seeders == first.total_seeders + 42
+    assert refreshed.recent_activity > first.recent_activity
+    assert refreshed.oldest_activity == first.oldest_activity
+
+    stored = (await database.uploader_profiles(["YIFY"]))["YIFY"]
+    assert stored["total_uploads"] == refreshed.total_uploads
+    await database.close()
@@ -0,0 +1,44 @@
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn, recorded_torrent
+from torrent_companion.indexers.aggregator import SearchAggregator
+from torrent_companion.indexers.common_types import IndexerGenre, IndexerHealth
+
+
+def make_standin(torrents, latency=0.0):
+    """A stand-in listing (id, info hash, seeders, category) releases of the same movie."""
+    return ApibayStandIn(
+        [
+            recorded_torrent(
+                id, f"The.Matrix.1999.1080p.BluRay.x264-{id}", seeders, category=category, info_hash=info_hash
+            )
+            for id, info_hash, seeders, category in torrents
+        ],
+        latency=latency,
+    )
+
+
+@pytest.mark.asyncio
+async def test_aggregator_merges_and_dedupes_by_info_hash(make_indexer):
+    first = make_indexer(make_standin([(1, "AAAA", 10, 207), (2, "BBBB", 50, 207)]), name="first")
+    second = make_indexer(make_standin([(3, "aaaa", 30, 207), (4, "CCCC", 5, 205)]), name="second")
+
+    response = await SearchAggregator([first, second]).search("matrix", genre=IndexerGenre.MOVIES)
+
+    assert response.success is True
+    assert response.partial is False
+    assert [torrent.id for torrent in response.results] == ["2", "3"]
+    assert response.indexers == {"first": "ok", "second": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_aggregator_returns_partial_results_at_deadline(make_indexer):
+    fast = make_indexer(make_standin([(1, "AAAA", 10, 207)]), name="fast")
+    slow = make_indexer(make_standin([(2, "BBBB", 50, 207)], latency=1), name="slow")
+    dead = make_indexer(make_standin([(3, "CCCC", 50, 207)]), name="dead")
+    dead.health = IndexerHealth.UNHEALTHY
+
+    response = await SearchAggregator([fast, slow, dead], deadline=0.1).search("matrix")
+
+    assert response.partial is True
+    assert [torrent.id for torrent in response.results] == ["1"]
+    assert response.indexers == {"fast": "ok", "slow": "timeout", "dead": "skipped"}
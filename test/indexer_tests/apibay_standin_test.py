@@ -0,0 +1,37 @@
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.indexers.definitions.piratebay.types import PirateBayCategory
+
+
+@pytest.mark.asyncio
+async def test_scrapper_against_the_standin(make_scrapper):
+    standin = ApibayStandIn(page_size=20)
+    scrapper = make_scrapper(standin)
+
+    response = await scrapper.search("matrix", PirateBayCategory.HD_MOVIES)
+    assert response.success
+    assert response.results and all("Matrix" in torrent.name for torrent in response.results)
+    assert [torrent.seeders for torrent in response.results] == sorted(
+        (torrent.seeders for torrent in response.results), reverse=True
+    )
+
+    first = response.results[0]
+    info = await scrapper.get_torrent_info(first.id)
+    assert info.info_hash == first.info_hash
+    assert await scrapper.get_file_list(first.id)
+    assert await scrapper.get_file_list("1") == ()
+
+    profile = await scrapper.get_uploader_profile("YIFY")
+    assert profile.total_pages == 5
+    assert profile.oldest_activity < profile.recent_activity
+
+
+@pytest.mark.asyncio
+async def test_standin_injects_errors_and_timeouts(make_scrapper):
+    scrapper = make_scrapper(ApibayStandIn(error_rate=1.0))
+    assert not (await scrapper.search("matrix")).success
+
+    scrapper = make_scrapper(ApibayStandIn(timeout_rate=1.0))
+    with pytest.raises(httpx.ReadTimeout):
+        await scrapper.get_torrent_info("1")
@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn, recorded_torrent
+from torrent_companion.indexers.cache import ResultCache
+from torrent_companion.indexers.definitions.piratebay.types import PirateBayCategory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_ttl_and_stale_window():
+    clock = FakeClock()
+    cache = ResultCache(ttl=10, stale_ttl=5, clock=clock)
+    cache.set("key", "value", size=5)
+
+    assert cache.get("key") == ("value", True)
+    clock.now = 12
+    assert cache.get("key") == ("value", False)
+    clock.now = 16
+    assert cache.get("key") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_lru_eviction_by_count_and_bytes():
+    cache = ResultCache(max_entries=2, max_bytes=100)
+    cache.set("a", 1, size=10)
+    cache.set("b", 2, size=10)
+    cache.get("a")
+    cache.set("c", 3, size=10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    cache.set("d", 4, size=95)
+    assert len(cache) == 1
+    assert cache.total_bytes == 95
+    assert cache.stats()["evictions"] == 3
+
+
+def search_handler(calls):
+    """Answers every search with a single torrent, whose id counts the searches."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["q"])
+        torrent = recorded_torrent(len(calls), "The Matrix (1999) 1080p BrRip x264 - 1.85GB - YIFY")
+        return httpx.Response(200, json=[ApibayStandIn.search_row(torrent)])
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_search_served_from_cache_with_normalized_key(make_scrapper):
+    calls = []
+    cache = ResultCache(ttl=10, stale_ttl=60, clock=FakeClock())
+    scrapper = make_scrapper(search_handler(calls), search_cache=cache)
+
+    first = await scrapper.search("The Matrix", category=PirateBayCategory.HD_MOVIES)
+    second = await scrapper.search("  the   MATRIX ", category=PirateBayCategory.HD_MOVIES)
+
+    assert len(calls) == 1
+    assert second.results == first.results
+    assert second.query == "  the   MATRIX "
+    assert scrapper.search_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_search_refreshed_in_background(make_scrapper):
+    clock = FakeClock()
+    calls = []
+    cache = ResultCache(ttl=10, stale_ttl=60, clock=clock)
+    scrapper = make_scrapper(search_handler(calls), search_cache=cache)
+
+    await scrapper.search("matrix")
+    clock.now = 20
+    stale = await scrapper.search("matrix")
+
+    assert stale.results[0].id == "1"
+    await asyncio.gather(*scrapper._background_tasks)
+    assert len(calls) == 2
+
+    fresh = await scrapper.search("matrix")
+    assert fresh.results[0].id == "2"
+    assert len(calls) == 2
@@ -0,0 +1,69 @@
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.indexers.common_types import CircuitState, IndexerHealth
+from torrent_companion.indexers.health import CircuitOpenError, HealthTracker
+from torrent_companion.indexers.retry import RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_single_failure_does_not_open_circuit():
+    tracker = HealthTracker("test", clock=FakeClock())
+    tracker.record(0.1, ok=False)
+
+    assert tracker.state == CircuitState.CLOSED
+    assert tracker.health == IndexerHealth.HEALTHY
+
+
+def test_circuit_opens_probes_with_backoff_and_closes():
+    clock = FakeClock()
+    tracker = HealthTracker("test", min_requests=4, base_backoff=10, clock=clock)
+    for ok in (True, False, False, False):
+        tracker.record(0.1, ok=ok)
+
+    assert tracker.state == CircuitState.OPEN
+    assert tracker.health == IndexerHealth.UNHEALTHY
+    assert not tracker.allow_request()
+
+    clock.now = 10
+    assert tracker.allow_request()  # the probe
+    assert not tracker.allow_request()  # only one probe at a time
+    tracker.record(0.1, ok=False)
+    assert tracker.retry_at == 30  # backoff doubled
+
+    clock.now = 30
+    assert tracker.allow_request()
+    tracker.record(0.1, ok=True)
+    assert tracker.state == CircuitState.CLOSED
+    assert tracker.health == IndexerHealth.HEALTHY
+
+
+def test_latency_percentiles():
+    tracker = HealthTracker("test", clock=FakeClock())
+    for latency in range(1, 101):
+        tracker.record(latency / 100, ok=True)
+
+    assert tracker.latency_percentile(50) == pytest.approx(0.5, abs=0.02)
+    assert tracker.latency_percentile(95) == pytest.approx(0.95, abs=0.02)
+
+
+@pytest.mark.asyncio
+async def test_real_traffic_drives_indexer_health(make_indexer):
+    indexer = make_indexer(ApibayStandIn(error_rate=1.0))
+    indexer.scrapper.retry_policy = RetryPolicy(max_attempts=1)  # one call, one outcome
+    assert indexer.health == IndexerHealth.UNKNOWN
+
+    for _ in range(5):
+        await indexer.scrapper.get_torrent_info("1")
+
+    assert indexer.health == IndexerHealth.UNHEALTHY
+    assert indexer.health_status()["circuit"] == "OPEN"
+    assert indexer.health_status()["p50"] is not None
+    with pytest.raises(CircuitOpenError):
+        await indexer.scrapper.search("matrix")
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from dataclasses import replace
+
+import httpx
+import pytest
+from torrent_companion.indexers.common_types import CircuitState
+from torrent_companion.indexers.deadline import DeadlineExceededError, SharedDeadline, deadline, remaining
+from torrent_companion.indexers.retry import RetryBudget, RetryPolicy
+
+URL = "https://apibay.org/t.php?id=1"
+FAST_BACKOFF = RetryPolicy(base_backoff=0.001)
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged(make_scrapper):
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(1.0 if len(requests) == 1 else 0.01)
+        return httpx.Response(200, text=str(len(requests)))
+
+    scrapper = make_scrapper(handler, retry_policy=FAST_BACKOFF)
+    assert scrapper.hedge_delay() is None  # not before enough latencies were observed
+    for _ in range(20):
+        scrapper.health_tracker.record(0.01, ok=True)
+
+    start = time.perf_counter()
+    response = await scrapper.fetch(URL)
+
+    assert time.perf_counter() - start < 0.5
+    assert response.text == "2"  # the hedge answered first, the slow attempt was cancelled
+    assert scrapper.hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_host_is_retried(make_scrapper):
+    statuses = iter([503, 502, 200])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses))
+
+    scrapper = make_scrapper(handler, retry_policy=FAST_BACKOFF)
+    response = await scrapper.fetch(URL)
+
+    assert response.status_code == 200
+    assert scrapper.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded_by_the_budget(make_scrapper):
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503)
+
+    scrapper = make_scrapper(handler, retry_policy=replace(FAST_BACKOFF, retry_ratio=0, min_retries=1))
+    assert (await scrapper.fetch(URL)).status_code == 503
+    assert (await scrapper.fetch(URL)).status_code == 503
+
+    assert len(requests) == 3  # a single retry, then the budget ran out
+    assert scrapper.retry_budget.denied == 2
+
+
+def test_retry_budget_earns_tokens_per_request():
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_bounded_by_the_deadline(make_scrapper):
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(1.0)
+        return httpx.Response(200)
+
+    scrapper = make_scrapper(handler, retry_policy=FAST_BACKOFF)
+    assert remaining() is None
+
+    start = time.perf_counter()
+    with deadline(0.05):
+        with deadline(1.0):  # nested deadlines only shorten the enclosing one
+            assert remaining() <= 0.05
+        with pytest.raises(httpx.TimeoutException):
+            await scrapper.fetch(URL)
+    assert time.perf_counter() - start < 0.5
+    assert len(requests) == 1  # no time was left to retry
+
+    with deadline(0), pytest.raises(DeadlineExceededError):
+        await scrapper.fetch(URL)
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_attempts_time_out_at_the_callers_deadline(make_scrapper):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1.0)
+        return httpx.Response(200)
+
+    scrapper = make_scrapper(handler, retry_policy=FAST_BACKOFF)
+    assert scrapper.attempt_timeout(SharedDeadline(None)) is None  # no policy timeout, no deadline
+
+    with deadline(0.05), pytest.raises(httpx.TimeoutException):
+        await scrapper.fetch(URL)
+    await asyncio.sleep(0.01)
+
+    # The attempt itself timed out, so the slow host counts against the circuit
+    assert scrapper.health_tracker.observed
+    assert scrapper.single_flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_does_not_hold_the_circuit_probe(make_scrapper):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200)
+
+    scrapper = make_scrapper(handler, retry_policy=FAST_BACKOFF)
+    scrapper.health_tracker.trip()
+    scrapper.health_tracker.retry_at = 0  # the probe is due, the next request half-opens the circuit
+
+    with deadline(0), pytest.raises(DeadlineExceededError):
+        await scrapper.fetch(URL)
+
+    assert (await scrapper.fetch(URL)).status_code == 200  # the next request still probes
+    assert scrapper.health_tracker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_callers_sharing_a_request_keep_their_own_deadline(make_scrapper):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(200)
+
+    scrapper = make_scrapper(handler, retry_policy=FAST_BACKOFF)
+
+    async def bounded():
+        with deadline(0.05):
+            return await scrapper.fetch(URL)
+
+    hurried, patient = await asyncio.gather(bounded(), scrapper.fetch(URL), return_exceptions=True)
+
+    assert isinstance(hurried, httpx.TimeoutException)
+    assert patient.status_code == 200
+    assert scrapper.single_flight.coalesced == 1
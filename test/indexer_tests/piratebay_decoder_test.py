@@ -0,0 +1,41 @@
+from torrent_companion.indexers.definitions.piratebay.decoder import ApibayDecoder
+from torrent_companion.indexers.definitions.piratebay.models import PBTorrentData
+
+ROWS = [
+    {
+        "id": 7349687,
+        "name": "The Matrix (1999) 1080p BrRip x264 - 1.85GB - YIFY",
+        "info_hash": "D7A46713EAEE18C746B3254B7D1492A50FD9D6CE",
+        "leechers": "46",
+        "seeders": "1053",
+        "size": "1986024713",
+        "username": "YIFY",
+        "added": "1330003812",
+        "status": "vip",
+        "category": "207",
+        "imdb": "tt0133093",
+    },
+    {
+        "id": "100",
+        "name": "Some.Show.S01E01.720p.HDTV.x264",
+        "info_hash": "AAAA",
+        "leechers": "0",
+        "seeders": "3",
+        "size": "1000",
+        "username": "someone",
+        "added": "1600000000",
+        "category": "205",
+        "imdb": None,
+    },
+]
+
+
+def test_decoding_converts_the_apibay_strings():
+    movie, episode = ApibayDecoder("magnet:?xt=urn:btih:{hash}").decode(ROWS, keywords="matrix")
+
+    assert isinstance(movie, PBTorrentData)
+    assert movie.id == "7349687"
+    assert movie.seeders == 1053
+    assert movie.magnet_link == "magnet:?xt=urn:btih:D7A46713EAEE18C746B3254B7D1492A50FD9D6CE"
+    assert (movie.content_type, episode.content_type) == ("movie", "episode")
+    assert (episode.status, episode.imdb) == ("unknown", "")
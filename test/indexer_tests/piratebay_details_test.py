@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.indexers.common_models import FileList, TorrentFile
+
+
+@pytest.mark.asyncio
+async def test_details_and_file_lists_stream_concurrently_and_are_cached(make_scrapper):
+    standin = ApibayStandIn(latency=0.01, jitter=0.02)
+    scrapper = make_scrapper(standin, max_concurrency=4)
+    ids = [torrent["id"] for torrent in standin.torrents[:12]]
+
+    infos = {torrent_id: info async for torrent_id, info in scrapper.get_torrent_infos(ids)}
+    files = {torrent_id: files async for torrent_id, files in scrapper.get_file_lists(ids + ["1"])}
+
+    assert set(infos) == set(ids)
+    assert all(infos[torrent_id].id == torrent_id for torrent_id in ids)
+    assert all(isinstance(files[torrent_id], FileList) and files[torrent_id] for torrent_id in ids)
+    assert files["1"] == ()
+    assert standin.peak_in_flight == 4
+
+    requests = sum(standin.requests.values())
+    async for _ in scrapper.get_torrent_infos(ids):
+        pass
+    assert sum(standin.requests.values()) == requests
+
+
+@pytest.mark.asyncio
+async def test_stopping_the_stream_cancels_pending_loads(make_scrapper):
+    standin = ApibayStandIn(latency=0.05)
+    scrapper = make_scrapper(standin, max_concurrency=2)
+    ids = [torrent["id"] for torrent in standin.torrents[:10]]
+
+    stream = scrapper.get_file_lists(ids)
+    async for _ in stream:
+        break
+    await stream.aclose()
+    await asyncio.sleep(0.1)
+
+    assert sum(standin.requests.values()) <= 3
+
+
+def test_file_list_scans():
+    files = FileList(
+        [
+            TorrentFile("Show.S01.1080p/Show.S01.1080p.E01.mkv", 900),
+            TorrentFile("Show.S01.1080p/Show.S01E02-E03.mkv", 1800),
+            TorrentFile("Show.S01.1080p/Sample/sample.mkv", 10),
+            TorrentFile("Show.S01.1080p/Extras/Making.Of.mkv", 300),
+            TorrentFile("Show.S01.1080p/Subs/English.srt", 1),
+        ]
+    )
+
+    assert files.episodes() == {1: {1, 2, 3}}
+    assert files.main_video().size == 1800
+    assert files.samples() == [files[2]]
+    assert len(files.extras()) == 3
+    assert not files.has_suspicious_files()
+    assert files.total_size == 3011
@@ -0,0 +1,97 @@
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn, recorded_torrent
+
+GB = 1024**3
+
+
+def make_item(id, name, seeders, size=2 * GB, **fields):
+    torrent = recorded_torrent(
+        id, name, seeders, leechers=5, size=size, added=1_330_000_000, imdb="tt0133093", **fields
+    )
+    return ApibayStandIn.search_row(torrent)
+
+
+SEARCH_RESULTS = [
+    make_item(1, "The Matrix (1999) 1080p BrRip x264 - 1.85GB - YIFY", 900, status="vip", username="YIFY"),
+    make_item(2, "The.Matrix.1999.1080p.BluRay.x264-SPARKS", 800, size=8 * GB, status="trusted"),
+    make_item(3, "The Matrix 1999 HDCAM x264-ETRG", 2000, size=700 * 1024**2),
+    make_item(4, "The.Matrix.Resurrections.2021.720p.WEBRip.x264-RARBG", 300, size=1 * GB),
+    make_item(5, "The.Matrix.1999.2160p.UHD.BluRay.x265-DEPTH", 150, size=30 * GB, category=211),
+    make_item(6, "Matrix.S01E01.720p.HDTV.x264-KILLERS", 500, size=1 * GB),
+    make_item(7, "The Matrix OST FLAC", 400, category=101),
+    make_item(8, "The.Matrix.1999.480p.DVDRip.XviD", 0, size=1 * GB, category=201),
+]
+
+
+def ranking_handler(requests):
+    """Answers the searches with SEARCH_RESULTS, an executable for the files of torrent 1."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path == "/f.php":
+            id = request.url.params["id"]
+            if id == "1":
+                return httpx.Response(200, json=[{"name": ["Matrix.mkv.exe"], "size": [2 * GB]}])
+            return httpx.Response(200, json=[{"name": ["The.Matrix.mkv"], "size": [2 * GB]}])
+        query = request.url.params["q"]
+        if query.startswith("pcnt:"):
+            return httpx.Response(200, text="1")
+        if query.startswith("user:"):
+            username = query.split(":")[1]
+            return httpx.Response(200, json=[make_item(100, "Some.Movie.2020.1080p", 50, username=username)])
+        return httpx.Response(200, json=SEARCH_RESULTS)
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_best_movie_torrents_cheap_ranking(make_indexer):
+    requests = []
+    indexer = make_indexer(ranking_handler(requests))
+
+    ranked = await indexer.get_best_movie_torrents("the matrix", k=3)
+
+    assert [candidate.torrent.id for candidate in ranked] == ["1", "2", "5"]
+    assert ranked[0].score >= ranked[1].score >= ranked[2].score
+    assert requests == ["/q.php"]
+
+
+@pytest.mark.asyncio
+async def test_best_movie_torrent_expensive_stages_only_for_shortlist(make_indexer):
+    requests = []
+    indexer = make_indexer(ranking_handler(requests))
+
+    best = await indexer.get_best_movie_torrents(
+        "the matrix", k=1, analyze_files=True, analyze_uploader=True, shortlist_size=3
+    )
+
+    # the vip release ships an executable, so the trusted BluRay wins
+    assert best[0].torrent.id == "2"
+    assert best[0].breakdown["files"] == 1.0
+    assert requests.count("/f.php") == 3
+    assert requests[0] == "/q.php"
+
+
+@pytest.mark.asyncio
+async def test_best_movie_torrent_returns_single_candidate(make_indexer):
+    indexer = make_indexer(ranking_handler([]))
+
+    best = await indexer.get_best_movie_torrent("the matrix")
+
+    assert best is not None
+    assert best.torrent.id == "1"
+    assert best.release.group == "YIFY"
+    assert best.torrent.quality == "1080p"
+
+
+@pytest.mark.asyncio
+async def test_best_movie_torrent_leaves_cached_results_untouched(make_indexer):
+    requests = []
+    indexer = make_indexer(ranking_handler(requests))
+
+    await indexer.get_best_movie_torrent("the matrix")
+    cached = await indexer.scrapper.search("the matrix")
+
+    assert requests == ["/q.php"]  # the second search was answered from the cache
+    assert {torrent.quality for torrent in cached.results} == {"Unknown"}
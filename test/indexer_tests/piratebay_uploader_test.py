@@ -0,0 +1,60 @@
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn, recorded_torrent
+
+
+def make_standin(usernames, pages: int = 5) -> ApibayStandIn:
+    """Uploaders with `pages` pages of three torrents each."""
+    torrents = [
+        recorded_torrent(
+            number * 100 + id, f"Some.Movie.{id}.1080p.x264", username=username, added=1_600_000_000 - id
+        )
+        for number, username in enumerate(usernames, 1)
+        for id in range(1, pages * 3 + 1)
+    ]
+    return ApibayStandIn(torrents, latency=0.02, page_size=3)
+
+
+@pytest.mark.asyncio
+async def test_uploader_profile_pages_fetched_concurrently(make_scrapper):
+    standin = make_standin(["YIFY"])
+    scrapper = make_scrapper(standin, max_concurrency=8)
+
+    profile = await scrapper.get_uploader_profile("YIFY", read_pages=5)
+
+    assert profile is not None
+    assert profile.name == "YIFY"
+    assert profile.total_pages == 5
+    assert profile.total_seeders == 10 * 3 * 5
+    # pcnt + 5 pages + oldest page, the last six sent together
+    assert sum(standin.requests.values()) == 7
+    assert standin.peak_in_flight == 6
+
+
+@pytest.mark.asyncio
+async def test_uploader_profiles_share_concurrency_cap(make_scrapper):
+    standin = make_standin(["YIFY", "RARBG"])
+    scrapper = make_scrapper(standin, max_concurrency=3)
+
+    profiles = await scrapper.get_uploader_profiles(["YIFY", "RARBG", "YIFY"], read_pages=2)
+
+    assert list(profiles) == ["YIFY", "RARBG"]
+    assert all(profile is not None for profile in profiles.values())
+    assert sum(standin.requests.values()) == 2 * (1 + 2 + 1)
+    assert standin.peak_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_failed_uploader_profile_is_missing(make_scrapper):
+    standin = make_standin(["YIFY", "RARBG"])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if "RARBG" in str(request.url):
+            return httpx.Response(200, text="<html>Cloudflare</html>")
+        return await standin.handle(request)
+
+    scrapper = make_scrapper(handler)
+    profiles = await scrapper.get_uploader_profiles(["YIFY", "RARBG"], read_pages=2)
+
+    assert profiles["YIFY"] is not None
+    assert profiles["RARBG"] is None
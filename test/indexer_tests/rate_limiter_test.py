@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.indexers.common_types import RequestPriority
+from torrent_companion.indexers.health import CircuitOpenError
+from torrent_companion.indexers.rate_limiter import RateLimitedError, RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority():
+    limiter = RateLimiter(rate=100, burst=1, reserve=0)
+    await limiter.acquire()  # empty the bucket
+    order = []
+
+    async def request(priority):
+        await limiter.acquire(priority)
+        order.append(priority)
+
+    await asyncio.gather(
+        request(RequestPriority.BACKGROUND),
+        request(RequestPriority.DETAIL),
+        request(RequestPriority.INTERACTIVE),
+    )
+    assert order == [RequestPriority.INTERACTIVE, RequestPriority.DETAIL, RequestPriority.BACKGROUND]
+
+
+@pytest.mark.asyncio
+async def test_background_keeps_the_reserve_and_is_shed_first():
+    limiter = RateLimiter(
+        rate=1, burst=2, reserve=1, max_wait={RequestPriority.BACKGROUND: 0.1}
+    )
+
+    await limiter.acquire(RequestPriority.INTERACTIVE)
+    with pytest.raises(RateLimitedError):
+        await limiter.acquire(RequestPriority.BACKGROUND)  # would eat the last reserved token
+    await limiter.acquire(RequestPriority.INTERACTIVE)
+
+    assert limiter.stats()["shed"]["BACKGROUND"] == 1
+    assert limiter.stats()["granted"]["INTERACTIVE"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_lose_a_token():
+    limiter = RateLimiter(rate=50, burst=1, reserve=0)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
+    assert limiter.stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_too_many_requests_pauses_the_host(make_scrapper):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": "120"})
+
+    scrapper = make_scrapper(handler)
+
+    await scrapper.fetch("https://apibay.org/q.php?q=matrix")
+    assert scrapper.rate_limiter.expected_wait(RequestPriority.INTERACTIVE) > 100
+
+    with pytest.raises(RateLimitedError):
+        await scrapper.fetch("https://apibay.org/t.php?id=1", RequestPriority.DETAIL)
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_spends_no_tokens(make_scrapper):
+    scrapper = make_scrapper(ApibayStandIn())
+    scrapper.rate_limiter = RateLimiter(rate=1, burst=2, reserve=0)
+    scrapper.health_tracker.trip()
+
+    with pytest.raises(CircuitOpenError):
+        await scrapper.fetch("https://apibay.org/t.php?id=1")
+    assert scrapper.rate_limiter.stats()["granted"]["INTERACTIVE"] == 0
+    assert scrapper.rate_limiter.tokens == 2
@@ -0,0 +1,85 @@
+import subprocess
+import sys
+
+from torrent_companion.indexers.common_types import IndexerGenre, IndexerType
+from torrent_companion.indexers.registry import IndexerRegistry
+
+FAKE_METADATA = """
+name = "Fake"
+type = "PRIVATE"
+genres = ["ANIME"]
+entry_point = "fake_indexer:FakeIndexer"
+"""
+FAKE_MODULE = """
+loads = 0
+
+
+class FakeIndexer:
+    def __init__(self):
+        global loads
+        loads += 1
+        self.name = "Fake"
+        self.genres = ()
+
+    def close(self):
+        pass
+"""
+
+
+def write_definitions(root):
+    package = root / "fake_definitions"
+    (package / "fake").mkdir(parents=True)
+    (package / "fake" / "indexer.toml").write_text(FAKE_METADATA)
+    (package / "fake" / "fake_indexer.py").write_text(FAKE_MODULE)
+    (package / "broken").mkdir()
+    (package / "broken" / "indexer.toml").write_text('name = "Broken"')
+    return package
+
+
+def test_discovery_reads_metadata_without_importing_definitions():
+    code = (
+        "import sys\n"
+        "from torrent_companion.indexers.registry import IndexerRegistry\n"
+        "registry = IndexerRegistry()\n"
+        "assert 'The Pirate Bay' in registry\n"
+        "assert not [name for name in sys.modules if '.definitions.' in name]\n"
+        "assert 'pydantic' not in sys.modules and 'httpx' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_metadata_matches_the_definition():
+    registry = IndexerRegistry()
+    definition = registry.definitions["The Pirate Bay"]
+    assert registry.loaded == []
+
+    indexer = registry.get("The Pirate Bay")
+    assert registry.get("The Pirate Bay") is indexer
+    assert (definition.name, definition.description, definition.language) == (
+        indexer.name,
+        indexer.description,
+        indexer.language,
+    )
+    assert definition.type == indexer.type == IndexerType.PUBLIC
+    assert definition.genres == indexer.genres
+    registry.close()
+    assert registry.loaded == []
+
+
+def test_definitions_are_loaded_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    package = write_definitions(tmp_path)
+
+    registry = IndexerRegistry(package, package="fake_definitions")
+    assert list(registry.definitions) == ["Fake"]  # the broken definition is skipped
+    assert [definition.name for definition in registry.select(IndexerGenre.ANIME)] == ["Fake"]
+    assert registry.select(IndexerGenre.MOVIES) == []
+    assert "fake_definitions.fake.fake_indexer" not in sys.modules
+
+    assert registry.indexers(IndexerGenre.MOVIES) == []
+    fake = registry.get("Fake")
+    assert registry.indexers(IndexerGenre.ANIME) == [fake]
+    assert sys.modules["fake_definitions.fake.fake_indexer"].loads == 1
+    assert registry.get("Unknown") is None
+
+    assert len(IndexerRegistry(package, package="fake_definitions", enabled=["Other"])) == 0
@@ -0,0 +1,80 @@
+from torrent_companion.indexers.definitions.piratebay.decoder import ApibayDecoder
+from torrent_companion.indexers.definitions.piratebay.models import PBTorrentData
+from torrent_companion.indexers.result_set import TorrentResultSet
+
+MAGNET_URL = "magnet:?xt=urn:btih:{hash}"
+
+
+def make_row(number: int, username: str, seeders: int, category: int = 207) -> dict:
+    # Built from pieces so equal strings are distinct objects, as in a parsed response
+    return {
+        "id": str(number),
+        "name": f"Torrent {number}",
+        "info_hash": f"{number:040X}",
+        "leechers": str(number % 7),
+        "seeders": str(seeders),
+        "size": str(1_000 * number),
+        "username": "".join(username),
+        "added": str(1_600_000_000 + number * 86_400),
+        "status": "".join(["v", "ip"]),
+        "category": str(category),
+        "imdb": "",
+    }
+
+
+ROWS = [
+    make_row(1, "YIFY", 50),
+    make_row(2, "eztv", 900, category=205),
+    make_row(3, "YIFY", 10),
+    make_row(4, "YIFY", 300),
+]
+
+
+def test_columns_convert_back_to_the_decoded_models():
+    decoder = ApibayDecoder(MAGNET_URL)
+    results = decoder.decode_columns(ROWS, "user:YIFY")
+
+    assert len(results) == 4
+    assert decoder.to_models(results) == decoder.decode(ROWS, "user:YIFY")
+    assert results["uploader"][0] is results["uploader"][2]
+    assert results["status"][0] is results["status"][1]
+
+
+def test_filter_sort_and_aggregate():
+    results = ApibayDecoder(MAGNET_URL).decode_columns(ROWS, "")
+
+    assert results.sum("seeders") == 1260
+    assert results.max("added") == 1_600_000_000 + 4 * 86_400
+    assert results.min("seeders") == 10
+    assert results.counts("uploader") == {"YIFY": 3, "eztv": 1}
+
+    yify = results.where("uploader", lambda uploader: uploader == "YIFY")
+    assert list(yify["id"]) == ["1", "3", "4"]
+    assert list(yify.sort_by("seeders")["seeders"]) == [10, 50, 300]
+    assert list(results.top("seeders", 2)["id"]) == ["2", "4"]
+    assert len(results.where("seeders", lambda seeders: seeders > 1_000)) == 0
+    assert list(results.where("content_type", lambda kind: kind == "episode")["id"]) == ["2"]
+
+
+def test_round_trip_from_models():
+    models = ApibayDecoder(MAGNET_URL).decode(ROWS, "matrix")
+    results = TorrentResultSet.from_models(models, "matrix")
+
+    assert results.to_models(PBTorrentData) == models
+
+    merged = TorrentResultSet.from_models(models[:1], "matrix")
+    merged.extend(results.take([3]))
+    assert list(merged["id"]) == ["1", "4"]
+    assert list(merged.magnet_links())[1] == models[3].magnet_link
+
+
+def test_comparisons_select_rows_and_gather_columns_on_read():
+    results = ApibayDecoder(MAGNET_URL).decode_columns(ROWS, "")
+
+    popular = results.where_ge("seeders", 50)
+    assert list(popular["id"]) == ["1", "2", "4"]
+    assert dict(popular.columns) == {"id": popular["id"]}  # only the column read was gathered
+    assert list(results.where_le("seeders", 50)["id"]) == ["1", "3"]
+    assert list(results.where_eq("uploader", "YIFY").where_ge("seeders", 50)["seeders"]) == [50, 300]
+    assert len(results.where_eq("uploader", "nobody")) == 0
+    assert popular.to_models(PBTorrentData) == [results.to_models(PBTorrentData)[index] for index in (0, 1, 3)]
@@ -0,0 +1,99 @@
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn, recorded_torrent
+
+GB = 1024**3
+
+
+def season_torrent(id, name, seeders, files):
+    return recorded_torrent(
+        id, name, seeders, leechers=5, category=208, status="trusted", added=1_700_000_000 + id, files=files
+    )
+
+
+def episode_files(folder, episodes, size=GB):
+    return [[f"{folder}/Show.S01E{episode:02d}.1080p.WEB.x264.mkv", size] for episode in episodes]
+
+
+TORRENTS = [
+    # The pack's name claims the season, its files hold episodes 1-20 and a sample
+    season_torrent(
+        1,
+        "Some.Show.S01.1080p.WEB.x264-GROUP",
+        500,
+        episode_files("Some.Show.S01", range(1, 21)) + [["Some.Show.S01/sample.mkv", 10_000]],
+    ),
+    season_torrent(2, "Some Show Season 1 Complete 720p HDTV x264", 40, episode_files("S1", range(1, 25))),
+    season_torrent(3, "Some.Show.S01E21-E22.1080p.WEB.x264-GROUP", 300, episode_files("x", (21, 22))),
+    season_torrent(4, "Some.Show.S01E23.1080p.WEB.x264-GROUP", 200, episode_files("x", (23,))),
+    season_torrent(5, "Some.Show.S01E05.480p.HDTV.XviD", 10, episode_files("x", (5,))),
+    season_torrent(6, "Some.Show.S02E01.1080p.WEB.x264-GROUP", 900, episode_files("x", (1,))),
+    season_torrent(7, "Some.Show.S01.1080p.WEB.x264-FAKE", 800, [["Some.Show.S01.exe", 1_000]]),
+    season_torrent(8, "Some.Show.S01E24.1080p.WEB.x264-DEAD", 0, episode_files("x", (24,))),
+]
+
+
+@pytest.mark.asyncio
+async def test_season_is_resolved_with_a_handful_of_requests(make_indexer):
+    standin = ApibayStandIn(TORRENTS)
+    indexer = make_indexer(standin)
+
+    resolution = await indexer.resolve_season("Some Show", 1, episodes=range(1, 25))
+
+    # Three searches and the file lists of the packs, instead of a search per episode
+    assert standin.requests["q.php"] == 3
+    assert standin.requests["f.php"] == 3
+    assert sum(standin.requests.values()) <= 6
+
+    assert resolution.coverage["0000000000000000000000000000000000000001"] == list(range(1, 21))
+    assert resolution.coverage["0000000000000000000000000000000000000002"] == list(range(1, 25))
+    assert resolution.coverage["0000000000000000000000000000000000000003"] == [21, 22]
+    assert "0000000000000000000000000000000000000007" not in resolution.coverage  # suspicious files
+    assert "0000000000000000000000000000000000000006" not in resolution.coverage  # other season
+
+    sources = {episode: source.torrent.id for episode, source in resolution.episodes.items()}
+    assert all(sources[episode] == "1" for episode in range(1, 21))
+    assert (sources[21], sources[22], sources[23]) == ("3", "3", "4")
+    assert sources[24] == "2"  # only the complete 720p pack has it
+    assert resolution.missing == []
+    assert [source.torrent.id for source in resolution.sources()] == ["1", "3", "4", "2"]
+    indexer.close()
+
+
+@pytest.mark.asyncio
+async def test_episodes_default_to_the_covered_ones(make_indexer):
+    standin = ApibayStandIn([torrent for torrent in TORRENTS if torrent["id"] in ("3", "4")])
+    indexer = make_indexer(standin)
+
+    resolution = await indexer.resolve_season("Some Show", 1)
+
+    assert list(resolution.episodes) == [21, 22, 23]
+    assert standin.requests["f.php"] == 0
+
+    resolution = await indexer.resolve_season("Some Show", 1, episodes=[22, 24])
+    assert resolution.missing == [24]
+    assert standin.requests["q.php"] == 3  # the searches were cached
+    indexer.close()
+
+
+@pytest.mark.asyncio
+async def test_packs_are_listed_when_every_file_list_fails(make_indexer):
+    standin = ApibayStandIn([torrent for torrent in TORRENTS if torrent["id"] in ("1", "2")])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("f.php"):
+            return httpx.Response(404)
+        return await standin.handle(request)
+
+    indexer = make_indexer(handler)
+    resolution = await indexer.resolve_season("Some Show", 1)
+
+    assert resolution.episodes == {}
+    assert resolution.coverage == {}
+    assert [candidate.torrent.id for candidate in resolution.candidates] == ["1", "2"]
+
+    # Asked for episodes, the packs are assumed to hold them all, as their names claim
+    resolution = await indexer.resolve_season("Some Show", 1, episodes=[1, 2])
+    assert resolution.missing == []
+    assert resolution.episodes[1].torrent.id == "1"
+    indexer.close()
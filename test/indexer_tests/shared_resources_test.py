@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.indexers.client_registry import ClientRegistry, HostConfig, clients
+from torrent_companion.indexers.definitions.piratebay.indexer import PirateBayIndexer
+from torrent_companion.indexers.definitions.piratebay.scrapper import PirateBayScrapper
+from torrent_companion.indexers.scheduler import get_scheduler
+from torrent_companion.lifecycle import lifespan
+
+
+@pytest.mark.asyncio
+async def test_client_registry_shares_one_client_per_host():
+    registry = ClientRegistry()
+    registry.configure("https://apibay.org", HostConfig(max_connections=4))
+
+    client = registry.get("https://apibay.org/q.php?q=matrix")
+    assert registry.get("https://apibay.org/t.php?id=1") is client
+    assert registry.get("https://example.org") is not client
+
+    await registry.aclose()
+    assert client.is_closed
+    assert registry.get("https://apibay.org") is not client
+    await registry.aclose()
+
+
+def test_scrappers_share_the_host_client():
+    assert PirateBayScrapper().request_client is PirateBayScrapper().request_client
+
+
+@pytest.mark.asyncio
+async def test_scrappers_share_the_host_concurrency_cap(make_scrapper):
+    standin = ApibayStandIn(latency=0.02)
+    ids = [torrent["id"] for torrent in standin.torrents[:4]]
+
+    clients.configure("https://apibay.org", HostConfig(max_concurrency=2))
+    try:
+        scrappers = [make_scrapper(standin), make_scrapper(standin)]
+        assert scrappers[0].request_slots is scrappers[1].request_slots
+        assert scrappers[0].max_concurrency == 2
+
+        async def load(scrapper):
+            return [info async for _, info in scrapper.get_torrent_infos(ids)]
+
+        # Each scrapper would send two requests at once on its own
+        await asyncio.gather(*(load(scrapper) for scrapper in scrappers))
+        assert standin.peak_in_flight == 2
+    finally:
+        clients.configure("https://apibay.org", HostConfig())
+
+
+def test_indexers_share_the_scheduler():
+    first = PirateBayIndexer()
+    second = PirateBayIndexer()
+
+    assert first._scheduler is second._scheduler is get_scheduler()
+    assert get_scheduler().get_job(second._job.id).func == second.update_health
+
+    first.close()  # the job now belongs to the second indexer, so it stays
+    assert get_scheduler().get_job(second._job.id) is not None
+    second.close()
+    assert get_scheduler().get_job(f"indexer-health-{second.name}") is None
+
+
+@pytest.mark.asyncio
+async def test_lifespan_starts_and_stops_shared_resources():
+    async with lifespan():
+        assert get_scheduler().running
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn, recorded_torrent
+from torrent_companion.indexers.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_upstream_call(make_scrapper):
+    standin = ApibayStandIn(
+        [recorded_torrent(1, "The Matrix", username="YIFY"), recorded_torrent(2, "The Matrix Reloaded")],
+        latency=0.01,
+    )
+
+    scrapper = make_scrapper(standin)
+    infos = await asyncio.gather(*(scrapper.get_torrent_info("1") for _ in range(20)))
+    await scrapper.get_torrent_info("2")
+
+    assert standin.requests["t.php"] == 2
+    assert {info.name for info in infos} == {"The Matrix"}
+    # One cache load and one request per id; the other 19 callers joined the first load
+    assert scrapper.single_flight.stats() == {"calls": 4, "coalesced": 19, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller(make_scrapper):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        raise httpx.ConnectError("down", request=request)
+
+    scrapper = make_scrapper(handler)
+    results = await asyncio.gather(
+        *(scrapper.fetch("https://apibay.org/t.php?id=1") for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_keeps_the_call_for_the_others():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def work():
+        started.set()
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(single_flight.do("key", work))
+    second = asyncio.create_task(single_flight.do("key", work))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_caller_left():
+    single_flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(single_flight.do("key", work))
+    await asyncio.sleep(0)
+    caller.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert single_flight.stats()["in_flight"] == 0
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from benchmarks.apibay_standin import ApibayStandIn
+from torrent_companion.database.async_database import AsyncDatabase
+from torrent_companion.indexers.aggregator import SearchAggregator
+from torrent_companion.indexers.common_types import IndexerGenre
+from torrent_companion.indexers.query_log import QueryLog
+from torrent_companion.indexers.rate_limiter import RateLimitedError, RateLimiter
+from torrent_companion.indexers.warmup import CacheWarmer
+
+
+@pytest.mark.asyncio
+async def test_query_log_is_persisted_and_loaded(tmp_path):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"), readers=1)
+    query_log = QueryLog(database)
+    for query in ("The Matrix", "the  matrix", "dune", "The Matrix"):
+        query_log.record(query, None, "The Pirate Bay")
+    query_log.record("dune", IndexerGenre.MOVIES.value, "The Pirate Bay")
+    await query_log.flush()
+    query_log.record("dune", None, "The Pirate Bay")
+    await query_log.flush()
+    await database.flush()
+
+    restored = QueryLog(database)
+    assert await restored.load() == 3
+    assert restored.top(2) == [
+        (("the matrix", "", "The Pirate Bay"), 3),
+        (("dune", "", "The Pirate Bay"), 2),
+    ]
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_warmer_refreshes_popular_searches_within_the_budget(make_indexer):
+    standin = ApibayStandIn()
+    indexer = make_indexer(standin)
+    query_log = QueryLog()
+    aggregator = SearchAggregator([indexer], query_log=query_log)
+    for query in ("matrix", "matrix", "dune", "inception"):
+        await aggregator.search(query)
+    indexer.scrapper.search_cache.clear()
+    standin.requests.clear()
+
+    warmer = CacheWarmer([indexer], query_log, top_n=3, budget=5)
+    assert await warmer.warm() == 5
+    # The most searched query first, then the details of its most seeded results
+    assert standin.requests == {"q.php": 2, "t.php": 3}
+    assert indexer.scrapper.search_cache.peek(("matrix", 0)) is not None
+
+    # The next runs carry on down the list, then fresh entries are left alone
+    spent = [await warmer.warm() for _ in range(4)]
+    assert all(requests <= 5 for requests in spent) and spent[-1] == 0
+    warmer.refresh_within = indexer.scrapper.detail_cache.ttl  # everything is about to expire
+    assert await warmer.warm() == 5
+    assert warmer.stats()["requests"] == 10 + sum(spent)
+    indexer.close()
+
+
+@pytest.mark.asyncio
+async def test_fresh_deployment_warms_from_the_persisted_log(tmp_path, make_indexer):
+    database = AsyncDatabase(str(tmp_path / "db.sqlite"), readers=1)
+    await database.log_queries({("matrix", "", "The Pirate Bay"): 7, ("dune", "", "Unknown"): 9})
+    await database.flush()
+
+    standin = ApibayStandIn()
+    indexer = make_indexer(standin)
+    warmer = CacheWarmer([indexer], QueryLog(database), top_n=5, budget=1)
+
+    assert await warmer.warm() == 1
+    assert standin.requests == {"q.php": 1}
+    indexer.close()
+    await database.close()
+
+
+@pytest.mark.asyncio
+async def test_search_does_not_join_a_background_warm_up(make_indexer):
+    standin = ApibayStandIn(latency=0.01)
+    indexer = make_indexer(standin)
+    scrapper = indexer.scrapper
+    # The last token is reserved for foreground requests: the warm-up is shed, the search is not
+    scrapper.rate_limiter = RateLimiter(rate=0.05, burst=2, reserve=1)
+    await scrapper.get_torrent_info(str(standin.torrents[0]["id"]))
+
+    warmed, response = await asyncio.gather(
+        scrapper.warm("matrix", budget=1), scrapper.search("matrix"), return_exceptions=True
+    )
+
+    assert isinstance(warmed, RateLimitedError)
+    assert response.success and response.results
@@ -1,2 +1,18 @@
+from typing import Iterable
+
+from torrent_companion.indexers.common_models import (
+    BaseTorrentData,
+    BaseTorrentSearchResponse,
+)
+
+
 class BaseAnalyzer:
-    pass
\ No newline at end of file
+    def analyze(self, name: str):
+        """Analyze a single torrent name."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def analyze_many(
+        self, results: BaseTorrentSearchResponse | Iterable[BaseTorrentData]
+    ):
+        """Analyze every torrent of a search response (or list of torrents) in place."""
+        raise NotImplementedError("Subclasses should implement this method.")
@@ -0,0 +1,61 @@
+from pydantic import BaseModel, ConfigDict
+
+from torrent_companion.analysis.common_types import Resolution, ReleaseSource, VideoCodec
+from torrent_companion.indexers.common_models import BaseTorrentData
+
+
+class ReleaseInfo(BaseModel):
+    """Attributes parsed from a release name (shared between callers, so frozen)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    title: str
+    year: int | None = None
+    resolution: Resolution | None = None
+    source: ReleaseSource | None = None
+    codec: VideoCodec | None = None
+    audio: str | None = None  # e.g., AAC, DD5.1, TrueHD
+    language: str | None = None  # e.g., English, Multi
+    group: str | None = None  # release group, e.g., YIFY
+    season: int | None = None
+    episode: int | None = None
+    last_episode: int | None = None  # set for multi-episode releases (S01E01-E03)
+
+    @property
+    def is_episode(self) -> bool:
+        return self.season is not None or self.episode is not None
+
+    @property
+    def is_season_pack(self) -> bool:
+        return self.season is not None and self.episode is None
+
+
+class ScoredTorrent(BaseModel):
+    """A torrent candidate together with its ranking score."""
+
+    torrent: BaseTorrentData
+    release: ReleaseInfo | None = None
+    score: float = 0.0
+    breakdown: dict[str, float] = {}  # score of every stage that ran, before weighting
+
+
+class SeasonResolution(BaseModel):
+    """Best source per episode of a season, with the episodes every candidate covers."""
+
+    show: str
+    season: int
+    episodes: dict[int, ScoredTorrent | None] = {}  # None for episodes no candidate covers
+    coverage: dict[str, list[int]] = {}  # info hash -> episodes, the coverage matrix by candidate
+    candidates: list[ScoredTorrent] = []  # best first
+
+    @property
+    def missing(self) -> list[int]:
+        return [episode for episode, source in self.episodes.items() if source is None]
+
+    def sources(self) -> list[ScoredTorrent]:
+        """The distinct torrents to download for the covered episodes, in episode order."""
+        unique = {}
+        for source in self.episodes.values():
+            if source is not None:
+                unique.setdefault(source.torrent.info_hash, source)
+        return list(unique.values())
@@ -0,0 +1,28 @@
+from enum import Enum
+
+
+class Resolution(Enum):
+    UHD = "2160p"
+    FHD = "1080p"
+    HD = "720p"
+    SD = "480p"
+
+
+class ReleaseSource(Enum):
+    REMUX = "Remux"
+    BLURAY = "BluRay"
+    WEB_DL = "WEB-DL"
+    WEBRIP = "WEBRip"
+    HDTV = "HDTV"
+    DVD = "DVD"
+    HDRIP = "HDRip"
+    CAM = "CAM"
+    TELESYNC = "TS"
+
+
+class VideoCodec(Enum):
+    H264 = "x264"
+    H265 = "x265"
+    AV1 = "AV1"
+    VP9 = "VP9"
+    XVID = "XviD"
@@ -0,0 +1,254 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from torrent_companion.analysis.base_analyzer import BaseAnalyzer
+from torrent_companion.analysis.common_models import ReleaseInfo
+from torrent_companion.analysis.common_types import Resolution, ReleaseSource, VideoCodec
+from torrent_companion.indexers.common_models import (
+    BaseTorrentData,
+    BaseTorrentSearchResponse,
+)
+
+# Word boundaries that also split on "_" (`\b` treats it as a word character).
+_L = r"(?<![a-z0-9])"
+_R = r"(?![a-z0-9])"
+
+# One alternation scanned once per name; the outer named group of every
+# branch closes last, so `match.lastgroup` tells which attribute matched.
+TOKEN_PATTERN = re.compile(
+    rf"""
+    (?P<episode>{_L}s(?P<ep_season>\d{{1,2}})[ ._-]?e(?P<ep_first>\d{{1,3}})(?:[ ._-]?-?[ ._-]?e?(?P<ep_last>\d{{1,3}}))?{_R})
+    |(?P<cross_episode>{_L}(?P<cx_season>\d{{1,2}})x(?P<cx_episode>\d{{2,3}}){_R})
+    |(?P<absolute_episode>(?<=\ -\ )(?P<abs_episode>\d{{1,4}})(?:v\d)?(?=$|[ \[(]))
+    |(?P<season>{_L}(?:s(?P<season_short>\d{{1,2}})|season[ ._-]?(?P<season_long>\d{{1,2}})){_R})
+    |(?P<resolution>{_L}(?:2160p|4k|uhd|1080[pi]|720p|576p|480p){_R})
+    |(?P<source>{_L}(?:remux|blu-?ray|bdrip|brrip|bdremux|web-?dl|webrip|web|hdtv|dvdrip|dvd(?:scr|r|5|9)?|hdrip|hdcam|camrip|cam|telesync|hdts|ts){_R})
+    |(?P<codec>{_L}(?:[xh][ .]?264|avc|[xh][ .]?265|hevc|av1|vp9|xvid|divx){_R})
+    |(?P<audio>{_L}(?:aac(?:[ .]?[257]\.[01])?|ac3|e-?ac-?3|ddp?[ .]?[257]\.[01]|dd\+(?:[ .]?[257]\.[01])?|dts(?:-?hd(?:[ .-]?ma)?|-?x)?|truehd|atmos|flac|mp3|opus){_R})
+    |(?P<language>{_L}(?:english|eng|spanish|spa|esp|latino|castellano|french|fre|vostfr|german|ger|italian|ita|russian|rus|hindi|japanese|jpn|korean|kor|multi|dual[ ._-]?audio){_R})
+    |(?P<year>{_L}(?:19|20)\d{{2}}{_R})
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+GROUP_SUFFIX_PATTERN = re.compile(r"-\s*\[?([A-Za-z0-9][\w.]*?)\]?\s*(?:\[[^\]]*\])?\s*$")
+GROUP_PREFIX_PATTERN = re.compile(r"^\[([^\]]+)\]")
+TITLE_CLEANUP_PATTERN = re.compile(r"[\s._()\[\]-]+")
+
+RESOLUTIONS = {
+    "2160p": Resolution.UHD,
+    "4k": Resolution.UHD,
+    "uhd": Resolution.UHD,
+    "1080p": Resolution.FHD,
+    "1080i": Resolution.FHD,
+    "720p": Resolution.HD,
+    "576p": Resolution.SD,
+    "480p": Resolution.SD,
+}
+
+SOURCES = {
+    "remux": ReleaseSource.REMUX,
+    "bdremux": ReleaseSource.REMUX,
+    "bluray": ReleaseSource.BLURAY,
+    "blu-ray": ReleaseSource.BLURAY,
+    "bdrip": ReleaseSource.BLURAY,
+    "brrip": ReleaseSource.BLURAY,
+    "web-dl": ReleaseSource.WEB_DL,
+    "webdl": ReleaseSource.WEB_DL,
+    "web": ReleaseSource.WEB_DL,
+    "webrip": ReleaseSource.WEBRIP,
+    "hdtv": ReleaseSource.HDTV,
+    "dvdrip": ReleaseSource.DVD,
+    "dvd": ReleaseSource.DVD,
+    "dvdr": ReleaseSource.DVD,
+    "dvd5": ReleaseSource.DVD,
+    "dvd9": ReleaseSource.DVD,
+    "dvdscr": ReleaseSource.DVD,
+    "hdrip": ReleaseSource.HDRIP,
+    "hdcam": ReleaseSource.CAM,
+    "camrip": ReleaseSource.CAM,
+    "cam": ReleaseSource.CAM,
+    "telesync": ReleaseSource.TELESYNC,
+    "hdts": ReleaseSource.TELESYNC,
+    "ts": ReleaseSource.TELESYNC,
+}
+
+CODECS = {
+    "264": VideoCodec.H264,
+    "avc": VideoCodec.H264,
+    "265": VideoCodec.H265,
+    "hevc": VideoCodec.H265,
+    "av1": VideoCodec.AV1,
+    "vp9": VideoCodec.VP9,
+    "xvid": VideoCodec.XVID,
+    "divx": VideoCodec.XVID,
+}
+
+AUDIO_PREFIXES = (
+    ("truehd", "TrueHD"),
+    ("atmos", "Atmos"),
+    ("dts", "DTS"),
+    ("ddp", "DD+"),
+    ("dd+", "DD+"),
+    ("eac3", "DD+"),
+    ("e-ac-3", "DD+"),
+    ("e-ac3", "DD+"),
+    ("eac-3", "DD+"),
+    ("dd", "DD"),
+    ("ac3", "DD"),
+    ("aac", "AAC"),
+    ("flac", "FLAC"),
+    ("mp3", "MP3"),
+    ("opus", "Opus"),
+)
+
+LANGUAGES = {
+    "english": "English",
+    "eng": "English",
+    "spanish": "Spanish",
+    "spa": "Spanish",
+    "esp": "Spanish",
+    "latino": "Spanish",
+    "castellano": "Spanish",
+    "french": "French",
+    "fre": "French",
+    "vostfr": "French",
+    "german": "German",
+    "ger": "German",
+    "italian": "Italian",
+    "ita": "Italian",
+    "russian": "Russian",
+    "rus": "Russian",
+    "hindi": "Hindi",
+    "japanese": "Japanese",
+    "jpn": "Japanese",
+    "korean": "Korean",
+    "kor": "Korean",
+    "multi": "Multi",
+}
+
+# Tokens that look like a trailing "-GROUP" but are part of the release attributes.
+NON_GROUP_SUFFIXES = frozenset({"dl", "rip", "hd", "ma", "x", "3"})
+
+
+class ReleaseNameAnalyzer(BaseAnalyzer):
+    """Extract quality, source, codec, audio, language, group and episode data from release names."""
+
+    def __init__(self, cache_size: int = 65536):
+        self._analyze_cached = lru_cache(maxsize=cache_size)(parse_release_name)
+
+    def analyze(self, name: str) -> ReleaseInfo:
+        """Analyze a release name, reusing the result for names seen before."""
+        return self._analyze_cached(name)
+
+    def analyze_many(
+        self, results: BaseTorrentSearchResponse | Iterable[BaseTorrentData]
+    ) -> BaseTorrentSearchResponse | Iterable[BaseTorrentData]:
+        """Fill the quality, language and episode fields of every torrent in place."""
+        torrents = results.results if isinstance(results, BaseTorrentSearchResponse) else results
+        for torrent in torrents:
+            info = self.analyze(torrent.name)
+            if info.resolution is not None:
+                torrent.quality = info.resolution.value
+            if info.language is not None and isinstance(torrent.language, str):
+                torrent.language = info.language
+            if info.is_episode:
+                torrent.content_type = "episode"
+                torrent.season_number = info.season
+                torrent.episode_number = info.episode
+        return results
+
+    def cache_info(self):
+        """Get the hit/miss statistics of the memoized analysis."""
+        return self._analyze_cached.cache_info()
+
+
+def parse_release_name(name: str) -> ReleaseInfo:
+    """Parse a release name in a single scan over its tokens."""
+    fields = {}
+    years = []
+    title_end = len(name)
+
+    for match in TOKEN_PATTERN.finditer(name):
+        kind = match.lastgroup
+        token = match.group(kind).lower()
+
+        if kind == "year":
+            # A year at the very start is part of the title (e.g. "2012 (2009)")
+            if match.start() > 0:
+                years.append(match)
+            continue
+        elif kind == "episode":
+            if "season" in fields:
+                continue
+            fields["season"] = int(match.group("ep_season"))
+            fields["episode"] = int(match.group("ep_first"))
+            if match.group("ep_last"):
+                last_episode = int(match.group("ep_last"))
+                if last_episode > fields["episode"]:
+                    fields["last_episode"] = last_episode
+        elif kind == "cross_episode":
+            if "season" in fields:
+                continue
+            fields["season"] = int(match.group("cx_season"))
+            fields["episode"] = int(match.group("cx_episode"))
+        elif kind == "absolute_episode":
+            # Only trusted in anime style "[Group] Title - 24 (1080p)" names
+            if not name.startswith("[") or "season" in fields or "episode" in fields:
+                continue
+            fields["episode"] = int(match.group("abs_episode"))
+        elif kind == "season":
+            if "season" in fields:
+                continue
+            fields["season"] = int(match.group("season_short") or match.group("season_long"))
+        elif kind == "resolution":
+            fields.setdefault("resolution", RESOLUTIONS[token])
+        elif kind == "source":
+            # "TS" is too ambiguous to mark the title boundary on its own
+            if token == "ts" and "resolution" not in fields:
+                continue
+            source = SOURCES[token]
+            if source is ReleaseSource.REMUX or "source" not in fields:
+                fields["source"] = source
+        elif kind == "codec":
+            fields.setdefault("codec", CODECS.get(token[-3:], CODECS.get(token)))
+        elif kind == "audio":
+            if "audio" not in fields:
+                fields["audio"] = _audio_label(token)
+        elif kind == "language":
+            if "language" not in fields:
+                fields["language"] = "Multi" if token.startswith("dual") else LANGUAGES[token]
+            continue  # language words can be part of titles ("English Vinglish")
+
+        title_end = min(title_end, match.start())
+
+    # The release year is the last one before the attributes; earlier ones
+    # belong to the title (e.g. "Blade Runner 2049 (2017)").
+    years = [match for match in years if match.start() < title_end]
+    if years:
+        fields["year"] = int(years[-1].group())
+        title_end = years[-1].start()
+
+    group_match = GROUP_PREFIX_PATTERN.match(name) or GROUP_SUFFIX_PATTERN.search(name)
+    if (
+        group_match
+        and group_match.group(1).lower() not in NON_GROUP_SUFFIXES
+        and not TOKEN_PATTERN.fullmatch(group_match.group(1))
+    ):
+        fields["group"] = group_match.group(1)
+
+    start = group_match.end() if group_match and group_match.start() == 0 else 0
+    title = TITLE_CLEANUP_PATTERN.sub(" ", name[start:title_end]).strip()
+    return ReleaseInfo(title=title or name, **fields)
+
+
+def _audio_label(token: str) -> str:
+    """Turn a matched audio token into a canonical label (e.g. "ddp5.1" -> "DD+ 5.1")."""
+    for prefix, label in AUDIO_PREFIXES:
+        if token.startswith(prefix):
+            channels = token[len(prefix):].strip(" .-")
+            if channels[:1].isdigit() and "." in channels:
+                return f"{label} {channels}"
+            return label
+    return token.upper()
@@ -0,0 +1,141 @@
+import math
+from typing import Dict, List
+
+from torrent_companion.analysis.common_models import ReleaseInfo, ScoredTorrent
+from torrent_companion.analysis.common_types import Resolution, ReleaseSource
+from torrent_companion.indexers.common_models import (
+    SUSPICIOUS_EXTENSIONS,
+    VIDEO_EXTENSIONS,
+    BaseTorrentData,
+    BaseUploaderProfile,
+    TorrentFile,
+)
+
+GB = 1024**3
+
+# Plausible movie sizes per resolution; anything outside is likely a
+# mislabelled, re-encoded to death or padded release.
+EXPECTED_MOVIE_SIZES = {
+    Resolution.UHD: (8 * GB, 80 * GB),
+    Resolution.FHD: (1.4 * GB, 20 * GB),
+    Resolution.HD: (0.6 * GB, 6 * GB),
+    Resolution.SD: (0.3 * GB, 2.5 * GB),
+}
+
+RESOLUTION_SCORES = {
+    Resolution.UHD: 0.9,
+    Resolution.FHD: 1.0,
+    Resolution.HD: 0.7,
+    Resolution.SD: 0.4,
+}
+
+SOURCE_SCORES = {
+    ReleaseSource.REMUX: 0.95,
+    ReleaseSource.BLURAY: 1.0,
+    ReleaseSource.WEB_DL: 0.9,
+    ReleaseSource.WEBRIP: 0.8,
+    ReleaseSource.HDTV: 0.6,
+    ReleaseSource.DVD: 0.5,
+    ReleaseSource.HDRIP: 0.5,
+    ReleaseSource.CAM: 0.0,
+    ReleaseSource.TELESYNC: 0.0,
+}
+
+STATUS_SCORES = {
+    "vip": 1.0,
+    "trusted": 0.8,
+    "moderator": 0.7,
+    "helper": 0.7,
+    "member": 0.4,
+}
+
+
+DEFAULT_WEIGHTS = {
+    "seeders": 0.35,
+    "size": 0.15,
+    "quality": 0.3,
+    "uploader": 0.2,
+}
+
+
+class TorrentScorer:
+    """Score movie torrent candidates; file and uploader data refine the cheap score when available."""
+
+    def __init__(self, weights: Dict[str, float] | None = None):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+    def score(
+        self,
+        torrent: BaseTorrentData,
+        release: ReleaseInfo | None = None,
+        files: List[TorrentFile] | None = None,
+        profile: BaseUploaderProfile | None = None,
+    ) -> ScoredTorrent:
+        """Score a torrent from the data gathered so far."""
+        breakdown = {
+            "seeders": self.seeders_score(torrent),
+            "size": self.size_score(torrent, release),
+            "quality": self.quality_score(release),
+            "uploader": self.uploader_score(torrent, profile),
+        }
+        score = sum(self.weights[stage] * value for stage, value in breakdown.items())
+
+        if files is not None:
+            breakdown["files"] = self.files_score(files)
+            score *= breakdown["files"]
+
+        return ScoredTorrent(torrent=torrent, release=release, score=score, breakdown=breakdown)
+
+    @staticmethod
+    def seeders_score(torrent: BaseTorrentData) -> float:
+        """Swarm health: seeder volume (log scaled) and seeders/leechers availability."""
+        if torrent.seeders <= 0:
+            return 0.0
+        volume = min(1.0, math.log1p(torrent.seeders) / math.log1p(1000))
+        availability = torrent.seeders / (torrent.seeders + max(torrent.leechers, 0))
+        return 0.7 * volume + 0.3 * availability
+
+    @staticmethod
+    def size_score(torrent: BaseTorrentData, release: ReleaseInfo | None) -> float:
+        """How close the size is to the expected range for the parsed resolution."""
+        if release is None or release.resolution is None:
+            return 0.5
+        low, high = EXPECTED_MOVIE_SIZES[release.resolution]
+        if torrent.size <= 0:
+            return 0.0
+        if torrent.size < low:
+            return torrent.size / low
+        if torrent.size > high:
+            return high / torrent.size
+        return 1.0
+
+    @staticmethod
+    def quality_score(release: ReleaseInfo | None) -> float:
+        """Parsed resolution weighted by the release source (camrips score zero)."""
+        if release is None:
+            return 0.5
+        resolution = RESOLUTION_SCORES.get(release.resolution, 0.3)
+        source = SOURCE_SCORES.get(release.source, 0.7)
+        return resolution * source
+
+    @staticmethod
+    def uploader_score(torrent: BaseTorrentData, profile: BaseUploaderProfile | None) -> float:
+        """Uploader reputation from the indexer status, refined by the uploader profile if fetched."""
+        status = STATUS_SCORES.get(getattr(torrent, "status", None), 0.3)
+        if profile is None:
+            return status
+        seeding = min(1.0, math.log1p(profile.average_seeders_per_upload) / math.log1p(500))
+        return 0.5 * status + 0.5 * seeding
+
+    @staticmethod
+    def files_score(files: List[TorrentFile]) -> float:
+        """Share of the torrent taken by its main video file; executables zero the score."""
+        if not files:
+            return 0.5
+        if any(file.path.lower().endswith(SUSPICIOUS_EXTENSIONS) for file in files):
+            return 0.0
+        total = sum(file.size for file in files) or 1
+        videos = [file.size for file in files if file.path.lower().endswith(VIDEO_EXTENSIONS)]
+        if not videos:
+            return 0.1
+        return max(videos) / total
@@ -0,0 +1,102 @@
+import os
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Literal
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from torrent_companion.analysis.release_analyzer import ReleaseNameAnalyzer
+from torrent_companion.analysis.torrent_scorer import TorrentScorer
+from torrent_companion.database.async_database import AsyncDatabase
+from torrent_companion.indexers.aggregator import SearchAggregator
+from torrent_companion.indexers.common_types import IndexerGenre
+from torrent_companion.indexers.query_log import QueryLog
+from torrent_companion.indexers.registry import IndexerRegistry
+from torrent_companion.indexers.warmup import CacheWarmer
+from torrent_companion.lifecycle import lifespan
+from torrent_companion.metrics import metrics
+from torrent_companion.streaming import ndjson_line, search_events, sse_message
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@asynccontextmanager
+async def app_lifespan(app: FastAPI):
+    """Start the shared resources, the indexer registry searched by the API and the cache warm-up."""
+    # Searches, uploader profiles and the query log are only stored when a database file is configured
+    database = AsyncDatabase() if os.environ.get("DB_FILEPATH") else None
+    if database is not None:
+        database.start_pruning(timedelta(days=int(os.environ.get("DB_MAX_AGE_DAYS", 30))))
+    query_log = QueryLog(database)
+    # Comma separated indexer names, every discovered definition when unset
+    enabled = os.environ.get("INDEXERS")
+    registry = IndexerRegistry(
+        enabled=[name.strip() for name in enabled.split(",")] if enabled else None,
+        database=database,
+    )
+    async with lifespan(app):
+        app.state.database = database
+        app.state.registry = registry
+        app.state.aggregator = SearchAggregator(query_log=query_log, registry=registry)
+        app.state.warmer = CacheWarmer(
+            registry,
+            query_log,
+            top_n=int(os.environ.get("WARMUP_TOP_QUERIES", 20)),
+            budget=int(os.environ.get("WARMUP_REQUEST_BUDGET", 50)),
+            interval=int(os.environ.get("WARMUP_INTERVAL_MINUTES", 5)),
+        )
+        app.state.warmer.start()
+        try:
+            yield
+        finally:
+            app.state.warmer.stop()
+            registry.close()
+            await query_log.flush()
+            if database is not None:
+                database.stop_pruning()
+                await database.close()
+
+
+app = FastAPI(title="Torrent Companion", lifespan=app_lifespan)
+app.state.analyzer = ReleaseNameAnalyzer()
+app.state.scorer = TorrentScorer()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """Metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/search")
+async def search(
+    request: Request,
+    q: str = Query(min_length=1),
+    genre: IndexerGenre | None = None,
+    deadline: float | None = Query(default=None, gt=0),
+    analyze: bool = True,
+    format: Literal["ndjson", "sse"] | None = None,
+) -> StreamingResponse:
+    """Stream search results as each indexer answers, as NDJSON or server-sent events."""
+    if format is None:
+        format = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+
+    events = search_events(
+        request.app.state.aggregator,
+        q,
+        genre,
+        deadline,
+        analyzer=request.app.state.analyzer if analyze else None,
+        scorer=request.app.state.scorer if analyze else None,
+    )
+
+    async def body():
+        async for event, data in events:
+            yield sse_message(event, data) if format == "sse" else ndjson_line(event, data)
+
+    if format == "sse":
+        return StreamingResponse(
+            body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+        )
+    return StreamingResponse(body(), media_type="application/x-ndjson")
@@ -1,16 +1,67 @@
 import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple, TypedDict
 
 from torrent_companion.database.handler import DBHandler
+from torrent_companion.database.migrations import migrate
+from torrent_companion.indexers.common_models import BaseTorrentData, BaseUploaderProfile
 
 logger = logging.getLogger(__name__)
 
+# Torrent rows with their uploader name; constant texts, so sqlite3 reuses the compiled statements
+TORRENT_BY_INFO_HASH = """
+    SELECT t.*, u.name AS uploader FROM torrents t JOIN uploaders u ON u.id = t.uploader_id
+    WHERE t.info_hash = ?
+"""
+TORRENTS_BY_UPLOADER = """
+    SELECT t.*, u.name AS uploader FROM torrents t JOIN uploaders u ON u.id = t.uploader_id
+    WHERE u.name = ? ORDER BY t.added_date DESC LIMIT ?
+"""
+TORRENTS_BY_SEASON = """
+    SELECT t.*, u.name AS uploader FROM torrents t JOIN uploaders u ON u.id = t.uploader_id
+    WHERE t.content_type = ? AND t.season_number = ?
+    ORDER BY t.episode_number LIMIT ?
+"""
+TORRENTS_BY_EPISODE = """
+    SELECT t.*, u.name AS uploader FROM torrents t JOIN uploaders u ON u.id = t.uploader_id
+    WHERE t.content_type = ? AND t.season_number = ? AND t.episode_number = ?
+    LIMIT ?
+"""
+# Stale rows are deleted this many at a time per table, each chunk in its own transaction
+PRUNE_CHUNK_SIZE = 1_000
+PRUNE_CHUNKS = {
+    table: f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {column} < ? LIMIT ?)"
+    for table, column in (("torrents", "scrapped_at"), ("query_log", "last_seen"))
+}
+
+
+class TorrentRow(TypedDict):
+    id: int
+    uploader_id: int
+    uploader: str
+    content_type: str
+    keywords: str
+    title: str
+    info_hash: str
+    size: int
+    source: str
+    quality: str
+    language: str
+    episode_number: int | None
+    season_number: int | None
+    added_date: str
+    magnet_url: str
+    scrapped_at: str
+    payload: str | None
+
 
 class Database:
-    def __init__(self):
-        self.handler = DBHandler()
-        
-        self.setup_tables()
-        
+    def __init__(self, handler: DBHandler | None = None, setup: bool = True):
+        self.handler = handler or DBHandler()
+
+        if setup:
+            migrate(self)
+
     def setup_tables(self):
         self.handler.create_table(
             "uploaders",
@@ -26,10 +77,12 @@ class Database:
                 "average_seeders_per_upload REAL DEFAULT 0",
                 "recent_activity TEXT",
                 "oldest_activity TEXT",
-                "fetched_at TEXT"
+                "fetched_at TEXT",
+                "total_uploads INTEGER DEFAULT 0",  # uploads the totals are summed over
+                "counted_since TEXT",  # oldest of the counted uploads
             ]
         )
-        
+
         self.handler.create_table(
             "torrents",
             [
@@ -48,5 +101,265 @@ class Database:
                 "added_date TEXT NOT NULL",
                 "magnet_url TEXT NOT NULL",
                 "scrapped_at TEXT NOT NULL",
+                "payload TEXT",  # indexer specific model as JSON, to answer searches locally
             ]
-        )
\ No newline at end of file
+        )
+
+        self.handler.create_table(
+            "query_log",
+            [
+                "query TEXT NOT NULL",
+                "category TEXT NOT NULL DEFAULT ''",
+                "indexer TEXT NOT NULL",
+                "count INTEGER DEFAULT 0",
+                "last_seen TEXT",
+                "PRIMARY KEY (query, category, indexer)",
+            ]
+        )
+
+        # Databases created before these columns existed
+        for table_name, column, definition in (
+            ("torrents", "payload", "TEXT"),
+            ("uploaders", "total_uploads", "INTEGER DEFAULT 0"),
+            ("uploaders", "counted_since", "TEXT"),
+        ):
+            if column not in self.handler.table_columns(table_name):
+                self.handler.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {definition}")
+
+    def setup_search_index(self):
+        """Create the FTS5 index over torrent titles and keywords, kept in sync by triggers."""
+        exists = self.handler.query(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'torrents_fts'"
+        )
+        if exists:
+            return
+
+        self.handler.conn.executescript(
+            """
+            CREATE VIRTUAL TABLE torrents_fts USING fts5(
+                title, keywords, content='torrents', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS torrents_fts_insert AFTER INSERT ON torrents BEGIN
+                INSERT INTO torrents_fts(rowid, title, keywords) VALUES (new.id, new.title, new.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS torrents_fts_delete AFTER DELETE ON torrents BEGIN
+                INSERT INTO torrents_fts(torrents_fts, rowid, title, keywords)
+                VALUES ('delete', old.id, old.title, old.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS torrents_fts_update AFTER UPDATE OF title, keywords ON torrents BEGIN
+                INSERT INTO torrents_fts(torrents_fts, rowid, title, keywords)
+                VALUES ('delete', old.id, old.title, old.keywords);
+                INSERT INTO torrents_fts(rowid, title, keywords) VALUES (new.id, new.title, new.keywords);
+            END;
+            INSERT INTO torrents_fts(torrents_fts) VALUES ('rebuild');
+            """
+        )
+
+    def uploader_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """Get the ids of uploaders by name, creating the ones not stored yet."""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        placeholders = ", ".join("?" for _ in names)
+        sql = f"SELECT id, name FROM uploaders WHERE name IN ({placeholders})"
+        ids = {row["name"]: row["id"] for row in self.handler.query(sql, names)}
+
+        missing = [{"name": name} for name in names if name not in ids]
+        if missing:
+            self.handler.upsert_many("uploaders", missing, conflict_columns=("name",))
+            ids.update({row["name"]: row["id"] for row in self.handler.query(sql, names)})
+        return ids
+
+    def uploader(self, name: str) -> dict | None:
+        """Get a stored uploader by name."""
+        rows = self.handler.select("uploaders", {"name": name}, limit=1)
+        return rows[0] if rows else None
+
+    def torrent(self, info_hash: str) -> TorrentRow | None:
+        """Get a stored torrent by info hash."""
+        return self.handler.query_one(TORRENT_BY_INFO_HASH, (info_hash,))
+
+    def torrents_by_uploader(self, name: str, limit: int = 100) -> List[TorrentRow]:
+        """The stored torrents of an uploader, most recently added first."""
+        return self.handler.query(TORRENTS_BY_UPLOADER, (name, limit))
+
+    def torrents_by_episode(
+        self,
+        season_number: int,
+        episode_number: int | None = None,
+        content_type: str = "episode",
+        limit: int = 100,
+    ) -> List[TorrentRow]:
+        """The stored torrents of a season, or of one of its episodes."""
+        # One statement per shape, so both can seek the whole (type, season, episode) index
+        if episode_number is None:
+            return self.handler.query(TORRENTS_BY_SEASON, (content_type, season_number, limit))
+        return self.handler.query(
+            TORRENTS_BY_EPISODE, (content_type, season_number, episode_number, limit)
+        )
+
+    def prune(
+        self, max_age: timedelta, chunk_size: int = PRUNE_CHUNK_SIZE, max_chunks: int | None = None
+    ) -> int:
+        """Delete torrents scraped and queries last seen over max_age ago, returning the rows deleted.
+
+        Rows go in chunks of chunk_size per table, each committed on its own so
+        other writes never queue behind one long transaction. At most
+        max_chunks chunks are deleted (every stale row when None); fewer than
+        chunk_size rows deleted means nothing stale is left.
+        """
+        cutoff = (datetime.now() - max_age).isoformat()
+        deleted = chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            chunk = 0
+            for statement in PRUNE_CHUNKS.values():
+                with self.handler.conn:
+                    chunk += self.handler.conn.execute(statement, (cutoff, chunk_size)).rowcount
+            deleted += chunk
+            chunks += 1
+            if chunk < chunk_size:
+                break
+        logger.debug(f"Pruned {deleted} rows older than {cutoff}")
+        return deleted
+
+    def uploader_profiles(self, names: Iterable[str]) -> Dict[str, dict]:
+        """Get the stored profiles of uploaders by name (uploaders never profiled are left out)."""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        placeholders = ", ".join("?" for _ in names)
+        rows = self.handler.query(
+            f"SELECT * FROM uploaders WHERE name IN ({placeholders}) AND fetched_at IS NOT NULL",
+            names,
+        )
+        return {row["name"]: row for row in rows}
+
+    def save_uploader_profiles(self, profiles: Iterable[BaseUploaderProfile]) -> int:
+        """Store uploader profiles, replacing the previous profile of each uploader."""
+        profiles = list(profiles)
+        ids = self.uploader_ids(profile.name for profile in profiles)
+        columns = set(self.handler.table_columns("uploaders"))
+
+        return self.handler.upsert_many(
+            "uploaders",
+            (
+                {
+                    "id": ids[profile.name],
+                    **{key: value for key, value in profile.model_dump().items() if key in columns},
+                }
+                for profile in profiles
+            ),
+            conflict_columns=("id",),
+        )
+
+    def save_torrents(self, torrents: Iterable[BaseTorrentData], scrapped_at: str | None = None) -> int:
+        """Upsert scraped torrents (keyed on info_hash) so they can be searched locally."""
+        torrents = list(torrents)
+        scrapped_at = scrapped_at or datetime.now().isoformat()
+        uploader_ids = self.uploader_ids(torrent.uploader for torrent in torrents)
+
+        return self.handler.upsert_many(
+            "torrents",
+            (
+                {
+                    "uploader_id": uploader_ids[torrent.uploader],
+                    "content_type": torrent.content_type,
+                    "keywords": torrent.keywords,
+                    "title": torrent.name,
+                    "info_hash": torrent.info_hash,
+                    "size": torrent.size,
+                    "source": torrent.source,
+                    "quality": torrent.quality,
+                    "language": torrent.language if isinstance(torrent.language, str) else "Unknown",
+                    "episode_number": torrent.episode_number,
+                    "season_number": torrent.season_number,
+                    "added_date": torrent.added_date,
+                    "magnet_url": torrent.magnet_link,
+                    "scrapped_at": scrapped_at,
+                    "payload": torrent.model_dump_json(),
+                }
+                for torrent in torrents
+            ),
+        )
+
+    def log_queries(
+        self, counts: Dict[Tuple[str, str, str], int], seen_at: str | None = None
+    ) -> int:
+        """Add searches to the query log, as counts per (query, category, indexer)."""
+        seen_at = seen_at or datetime.now().isoformat()
+        with self.handler.conn:
+            self.handler.conn.executemany(
+                """
+                INSERT INTO query_log (query, category, indexer, count, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (query, category, indexer) DO UPDATE SET
+                    count = count + excluded.count, last_seen = excluded.last_seen
+                """,
+                [(*key, count, seen_at) for key, count in counts.items()],
+            )
+        return len(counts)
+
+    def popular_queries(self, limit: int = 100, since: timedelta | None = None) -> List[dict]:
+        """The most searched entries of the query log, optionally only those seen since a while ago."""
+        filters, params = "", []
+        if since is not None:
+            filters = "WHERE last_seen >= ?"
+            params.append((datetime.now() - since).isoformat())
+        params.append(limit)
+        return self.handler.query(
+            f"SELECT * FROM query_log {filters} ORDER BY count DESC, last_seen DESC LIMIT ?", params
+        )
+
+    def search_torrents(
+        self,
+        query: str,
+        source: str | None = None,
+        content_type: str | None = None,
+        season_number: int | None = None,
+        episode_number: int | None = None,
+        quality: str | None = None,
+        max_age: timedelta | None = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """Full text search over stored torrents, best BM25 match (title weighted over keywords) first."""
+        match = fts_match_expression(query)
+        if not match:
+            return []
+
+        filters = ["torrents_fts MATCH ?"]
+        params: list = [match]
+        for column, value in (
+            ("t.source", source),
+            ("t.content_type", content_type),
+            ("t.season_number", season_number),
+            ("t.episode_number", episode_number),
+            ("t.quality", quality),
+        ):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        if max_age is not None:
+            filters.append("t.scrapped_at >= ?")
+            params.append((datetime.now() - max_age).isoformat())
+        params.append(limit)
+
+        return self.handler.query(
+            f"""
+            SELECT t.*, u.name AS uploader, bm25(torrents_fts, 10.0, 1.0) AS rank
+            FROM torrents_fts
+            JOIN torrents t ON t.id = torrents_fts.rowid
+            JOIN uploaders u ON u.id = t.uploader_id
+            WHERE {" AND ".join(filters)}
+            ORDER BY rank
+            LIMIT ?
+            """,
+            params,
+        )
+
+
+def fts_match_expression(query: str) -> str:
+    """Turn a free text query into an FTS5 expression matching every word (quoted, so no syntax leaks)."""
+    words = "".join(char if char.isalnum() else " " for char in query).split()
+    return " ".join(f'"{word}"' for word in words)
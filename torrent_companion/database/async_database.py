@@ -0,0 +1,314 @@
+import asyncio
+import logging
+import queue
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Tuple, TypeVar
+
+from torrent_companion.database import PRUNE_CHUNK_SIZE, Database, TorrentRow
+from torrent_companion.database.handler import DBHandler
+from torrent_companion.indexers.common_models import BaseTorrentData, BaseUploaderProfile
+from torrent_companion.indexers.scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+# Merged writes are applied kind by kind in this order, each in its own transaction
+WRITE_ORDER = ("save_torrents", "save_uploader_profiles", "log_queries", "upsert_many", "insert_many", "prune")
+
+
+class DatabaseWriteError(Exception):
+    """Raised by flush() when writes queued since the previous flush failed."""
+
+
+class AsyncDatabase:
+    """Asyncio facade over the database.
+
+    Writes are queued and drained by a single writer thread that coalesces
+    everything pending into batched transactions; reads run on a small pool
+    of read-only connections in worker threads. Neither blocks the event loop.
+    A failed write only loses itself, and is reported by the next flush().
+    """
+
+    def __init__(
+        self,
+        filepath: str | None = None,
+        readers: int = 4,
+        max_queue: int = 10_000,
+        max_batch: int = 500,
+        prune_chunk_size: int = PRUNE_CHUNK_SIZE,
+    ):
+        self.writer = Database(DBHandler(filepath, journal_mode="WAL", synchronous="NORMAL"))
+        self.filepath = self.writer.handler.filepath
+        self.max_batch = max_batch  # queued writes merged into one batch at most
+        self.prune_chunk_size = prune_chunk_size  # stale rows deleted per table between other writes
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._readers: queue.Queue = queue.Queue()
+        for _ in range(readers):
+            self._readers.put(Database(DBHandler(self.filepath, read_only=True), setup=False))
+
+        self.enqueued = 0
+        self.blocked_puts = 0  # writes that had to wait for room in the queue
+        self.batches = 0
+        self.rows_written = 0
+        self.last_batch_size = 0
+        self.errors = 0
+        self.pruned = 0
+        # Only touched by the writer thread: failures since the last flush, and writes to apply
+        # again with the next batch (the rest of a prune, and the flushes waiting for it)
+        self._failures: List[Exception] = []
+        self._deferred: List[tuple] = []
+        self._prune_age: timedelta | None = None
+        self._prune_job = None
+
+        self._thread = threading.Thread(target=self._drain, name="db-writer", daemon=True)
+        self._thread.start()
+
+    async def save_torrents(self, torrents: Iterable[BaseTorrentData], scrapped_at: str | None = None) -> None:
+        """Queue scraped torrents to be upserted."""
+        await self._put(("save_torrents", scrapped_at, list(torrents)))
+
+    async def save_uploader_profiles(self, profiles: Iterable[BaseUploaderProfile]) -> None:
+        """Queue uploader profiles to be stored."""
+        await self._put(("save_uploader_profiles", None, list(profiles)))
+
+    async def log_queries(self, counts: Dict[Tuple[str, str, str], int]) -> None:
+        """Queue searches to be added to the query log."""
+        await self._put(("log_queries", None, dict(counts)))
+
+    async def upsert_many(
+        self, table_name: str, rows: Iterable[dict], conflict_columns: Tuple[str, ...] = ("info_hash",)
+    ) -> None:
+        """Queue rows to be upserted into a table."""
+        await self._put(("upsert_many", (table_name, tuple(conflict_columns)), list(rows)))
+
+    async def insert_many(self, table_name: str, rows: Iterable[dict]) -> None:
+        """Queue rows to be inserted into a table."""
+        await self._put(("insert_many", table_name, list(rows)))
+
+    async def prune(self, max_age: timedelta) -> None:
+        """Queue the deletion of the rows older than max_age (see Database.prune).
+
+        The writer deletes one chunk per batch, so writes queued meanwhile are
+        applied between chunks; flushes queued after the prune wait for all of it.
+        """
+        await self._put(("prune", None, max_age))
+
+    def start_pruning(self, max_age: timedelta, interval: int = 60) -> None:
+        """Prune stale rows every interval minutes on the shared scheduler."""
+        scheduler = get_scheduler()
+        if scheduler.get_job("database-pruning") is not None:
+            scheduler.remove_job("database-pruning")
+        self._prune_job = scheduler.add_job(
+            self.prune,
+            args=(max_age,),
+            name="database_pruning",
+            trigger="interval",
+            minutes=interval,
+            id="database-pruning",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+    def stop_pruning(self) -> None:
+        """Remove the pruning job from the shared scheduler."""
+        job, self._prune_job = self._prune_job, None
+        if job is not None and get_scheduler().get_job(job.id) is not None:
+            get_scheduler().remove_job(job.id)
+
+    async def flush(self) -> None:
+        """Wait until every write queued before this call has been committed.
+
+        Raises DatabaseWriteError when any write queued since the previous
+        flush failed; the other writes are committed all the same.
+        """
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        await self._put(("flush", None, (loop, done)))
+        await done
+
+    async def read(self, function: Callable[[Database], T]) -> T:
+        """Run a read on a pooled read-only connection in a worker thread."""
+        return await asyncio.to_thread(self._read, function)
+
+    async def search_torrents(self, query: str, **filters: Any) -> List[dict]:
+        """Full text search over stored torrents (see Database.search_torrents)."""
+        return await self.read(lambda database: database.search_torrents(query, **filters))
+
+    async def uploader_profiles(self, names: Iterable[str]) -> Dict[str, dict]:
+        """Stored uploader profiles by name (see Database.uploader_profiles)."""
+        names = list(names)
+        return await self.read(lambda database: database.uploader_profiles(names))
+
+    async def torrent(self, info_hash: str) -> TorrentRow | None:
+        """A stored torrent by info hash (see Database.torrent)."""
+        return await self.read(lambda database: database.torrent(info_hash))
+
+    async def torrents_by_uploader(self, name: str, limit: int = 100) -> List[TorrentRow]:
+        """The stored torrents of an uploader (see Database.torrents_by_uploader)."""
+        return await self.read(lambda database: database.torrents_by_uploader(name, limit))
+
+    async def torrents_by_episode(
+        self, season_number: int, episode_number: int | None = None, **filters: Any
+    ) -> List[TorrentRow]:
+        """The stored torrents of a season or episode (see Database.torrents_by_episode)."""
+        return await self.read(
+            lambda database: database.torrents_by_episode(season_number, episode_number, **filters)
+        )
+
+    async def popular_queries(self, limit: int = 100, since: timedelta | None = None) -> List[dict]:
+        """The most searched entries of the query log (see Database.popular_queries)."""
+        return await self.read(lambda database: database.popular_queries(limit, since))
+
+    def metrics(self) -> Dict[str, int]:
+        """Queue depth and write counters, to watch backpressure."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "blocked_puts": self.blocked_puts,
+            "batches": self.batches,
+            "rows_written": self.rows_written,
+            "last_batch_size": self.last_batch_size,
+            "errors": self.errors,
+            "pruned": self.pruned,
+        }
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        try:
+            await self.flush()
+        finally:
+            await asyncio.to_thread(self._queue.put, _STOP)
+            await asyncio.to_thread(self._thread.join)
+
+    async def _put(self, item: tuple) -> None:
+        self.enqueued += 1
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Backpressure: the caller waits (off the event loop) for the writer to catch up
+            self.blocked_puts += 1
+            await asyncio.to_thread(self._queue.put, item)
+
+    def _read(self, function: Callable[[Database], T]) -> T:
+        database = self._readers.get()
+        try:
+            return function(database)
+        finally:
+            self._readers.put(database)
+
+    def _drain(self) -> None:
+        """Writer thread: take everything queued (up to max_batch) and write it as one batch per kind."""
+        while True:
+            batch, self._deferred = self._deferred, []
+            if not batch:
+                batch.append(self._queue.get())
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in batch)
+            self._write_batch([item for item in batch if item is not _STOP])
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[tuple]) -> None:
+        groups: Dict[Tuple[str, Any], List[Any]] = defaultdict(list)  # (kind, key) -> queued payloads
+        flushes = []
+        for kind, key, payload in batch:
+            if kind == "flush":
+                flushes.append(payload)
+            else:
+                groups[kind, key].append(payload)
+
+        self._prune_age = None
+        written = 0
+        for (kind, key), payloads in sorted(groups.items(), key=lambda group: WRITE_ORDER.index(group[0][0])):
+            try:
+                written += self._write(kind, key, payloads)
+            except Exception as e:
+                if len(payloads) == 1:
+                    self._failed(kind, e)
+                    continue
+                # One bad write must not lose the others merged with it: write them one by one
+                for payload in payloads:
+                    try:
+                        written += self._write(kind, key, [payload])
+                    except Exception as e:
+                        self._failed(kind, e)
+
+        if written:
+            self.batches += 1
+            self.rows_written += written
+            self.last_batch_size = written
+
+        if self._prune_age is not None:
+            # Stale rows are left: let the writes queued meanwhile through before the next chunk
+            self._deferred.append(("prune", None, self._prune_age))
+            self._deferred.extend(("flush", None, flush) for flush in flushes)
+            flushes = []
+
+        if flushes:
+            failures, self._failures = self._failures, []
+            error = None
+            if failures:
+                error = DatabaseWriteError(f"{len(failures)} database writes failed: {failures[0]!r}")
+                error.__cause__ = failures[0]
+            for loop, done in flushes:
+                loop.call_soon_threadsafe(_resolve, done, error)
+
+    def _write(self, kind: str, key: Any, payloads: List[Any]) -> int:
+        """Write the merged payloads queued for one kind (and key) of write, returning the rows written."""
+        if kind == "save_torrents":
+            return self.writer.save_torrents(
+                [torrent for torrents in payloads for torrent in torrents], scrapped_at=key
+            )
+        if kind == "save_uploader_profiles":
+            # The latest profile of an uploader wins
+            profiles = {profile.name: profile for profiles in payloads for profile in profiles}
+            return self.writer.save_uploader_profiles(profiles.values())
+        if kind == "log_queries":
+            queries: Counter = Counter()
+            for counts in payloads:
+                queries.update(counts)
+            return self.writer.log_queries(queries)
+        if kind == "upsert_many":
+            table_name, conflict_columns = key
+            return self.writer.handler.upsert_many(
+                table_name, [row for rows in payloads for row in rows], conflict_columns
+            )
+        if kind == "insert_many":
+            return self.writer.handler.insert_many(key, [row for rows in payloads for row in rows])
+        if kind == "prune":
+            max_age = max(payloads)
+            deleted = self.writer.prune(max_age, self.prune_chunk_size, max_chunks=1)
+            self.pruned += deleted
+            if deleted >= self.prune_chunk_size:
+                self._prune_age = max_age
+            return 0
+        raise ValueError(f"Unknown write {kind}")
+
+    def _failed(self, kind: str, error: Exception) -> None:
+        self.errors += 1
+        self._failures.append(error)
+        logger.error(f"Failed to write {kind} to the database: {error!r}")
+
+
+def _resolve(future: asyncio.Future, error: Exception | None = None) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
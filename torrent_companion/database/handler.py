@@ -1,27 +1,175 @@
 import os
 import sqlite3
-from typing import List
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from torrent_companion.metrics import DB_ROWS, DB_SECONDS, metrics
+
 
 class DBHandler:
-    def __init__(self):
-        self.filepath = os.environ.get("DB_FILEPATH", "/var/torrent_companion/database.db")
-        self.conn = sqlite3.connect(self.filepath, check_same_thread=False, timeout=10)
+    def __init__(
+        self,
+        filepath: str | None = None,
+        journal_mode: str | None = None,
+        synchronous: str | None = None,
+        read_only: bool = False,
+    ):
+        self.filepath = filepath or os.environ.get("DB_FILEPATH", "/var/torrent_companion/database.db")
+        self.read_only = read_only
+        self.conn = sqlite3.connect(
+            f"file:{self.filepath}?mode=ro" if read_only else self.filepath,
+            check_same_thread=False,
+            timeout=10,
+            cached_statements=256,
+            uri=read_only,
+        )
+
+        # SQL text per (table, columns, conflict target); sqlite3 keeps the
+        # compiled statement for each distinct text in its own cache.
+        self._statements: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...] | None], str] = {}
+        # SELECT text per (table, filter columns, order, limited), reused the same way
+        self._selects: Dict[Tuple[str, Tuple[str, ...], str | None, bool], str] = {}
+
+        self.set_pragmas(
+            journal_mode=journal_mode or os.environ.get("DB_JOURNAL_MODE"),
+            synchronous=synchronous or os.environ.get("DB_SYNCHRONOUS"),
+        )
 
     def __del__(self):
         if self.conn:
             self.conn.close()
-    
+
+    def set_pragmas(self, journal_mode: str | None = None, synchronous: str | None = None):
+        """Set the journal mode (e.g. WAL) and synchronous level (e.g. NORMAL) of the connection."""
+        if journal_mode:
+            self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        if synchronous:
+            self.conn.execute(f"PRAGMA synchronous={synchronous}")
+
     def create_table(self, table_name: str, columns: List[str]):
         """Create a table if it does not exist."""
         cursor = self.conn.cursor()
         columns_str = ", ".join(columns)
         cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns_str})")
         self.conn.commit()
-    
+
+    def execute(self, sql: str, params: Sequence = ()):
+        """Execute a single statement and commit it."""
+        with self.conn:
+            return self.conn.execute(sql, params)
+
+    def query(self, sql: str, params: Sequence = ()) -> List[dict]:
+        """Run a read query and return its rows as dicts."""
+        start = time.perf_counter() if metrics.enabled else 0.0
+        cursor = self.conn.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        if metrics.enabled:
+            DB_SECONDS.observe(time.perf_counter() - start, "query", "")
+            DB_ROWS.inc(len(rows), "query", "")
+        return rows
+
+    def query_one(self, sql: str, params: Sequence = ()) -> dict | None:
+        """Run a read query and return its first row as a dict, or None."""
+        rows = self.query(sql, params)
+        return rows[0] if rows else None
+
+    def select(
+        self,
+        table_name: str,
+        filters: Dict[str, Any] | None = None,
+        order_by: str | None = None,
+        limit: int | None = None,
+    ) -> List[dict]:
+        """Select the rows of a table equal to every filter value, through a cached statement."""
+        filters = filters or {}
+        key = (table_name, tuple(filters), order_by, limit is not None)
+        sql = self._selects.get(key)
+        if sql is None:
+            sql = f"SELECT * FROM {table_name}"
+            if filters:
+                sql += " WHERE " + " AND ".join(f"{column} = ?" for column in filters)
+            if order_by:
+                sql += f" ORDER BY {order_by}"
+            if limit is not None:
+                sql += " LIMIT ?"
+            self._selects[key] = sql
+
+        params = list(filters.values())
+        if limit is not None:
+            params.append(limit)
+        return self.query(sql, params)
+
+    @property
+    def user_version(self) -> int:
+        """Schema version stored in the database file (PRAGMA user_version)."""
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @user_version.setter
+    def user_version(self, version: int) -> None:
+        with self.conn:
+            self.conn.execute(f"PRAGMA user_version = {int(version)}")
+
+    def table_columns(self, table_name: str) -> List[str]:
+        """Get the column names of a table."""
+        return [row[1] for row in self.conn.execute(f"PRAGMA table_info({table_name})")]
+
     def insert(self, table_name: str, data: dict):
         """Insert data into a table."""
         cursor = self.conn.cursor()
         columns = ", ".join(data.keys())
         placeholders = ", ".join("?" for _ in data)
         cursor.execute(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})", tuple(data.values()))
-        self.conn.commit()
\ No newline at end of file
+        self.conn.commit()
+
+    def insert_many(self, table_name: str, rows: Iterable[dict]) -> int:
+        """Insert many rows into a table in a single transaction."""
+        return self._write_many(table_name, rows, conflict_columns=None)
+
+    def upsert_many(
+        self, table_name: str, rows: Iterable[dict], conflict_columns: Sequence[str] = ("info_hash",)
+    ) -> int:
+        """Insert many rows in a single transaction, updating rows that hit a unique conflict."""
+        return self._write_many(table_name, rows, conflict_columns=tuple(conflict_columns))
+
+    def _statement(
+        self, table_name: str, columns: Tuple[str, ...], conflict_columns: Tuple[str, ...] | None
+    ) -> str:
+        """Get the cached write statement for a column set."""
+        key = (table_name, columns, conflict_columns)
+        statement = self._statements.get(key)
+        if statement is None:
+            placeholders = ", ".join("?" for _ in columns)
+            statement = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+            if conflict_columns:
+                updates = [column for column in columns if column not in conflict_columns]
+                action = (
+                    "DO UPDATE SET " + ", ".join(f"{column} = excluded.{column}" for column in updates)
+                    if updates
+                    else "DO NOTHING"
+                )
+                statement += f" ON CONFLICT ({', '.join(conflict_columns)}) {action}"
+            self._statements[key] = statement
+        return statement
+
+    def _write_many(
+        self, table_name: str, rows: Iterable[dict], conflict_columns: Tuple[str, ...] | None
+    ) -> int:
+        """Group rows by column set and write each group with executemany in one transaction."""
+        start = time.perf_counter() if metrics.enabled else 0.0
+        groups: Dict[Tuple[str, ...], List[tuple]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
+
+        written = 0
+        with self.conn:
+            for columns, values in groups.items():
+                self.conn.executemany(self._statement(table_name, columns, conflict_columns), values)
+                written += len(values)
+
+        if metrics.enabled:
+            operation = "insert" if conflict_columns is None else "upsert"
+            DB_SECONDS.observe(time.perf_counter() - start, operation, table_name)
+            DB_ROWS.inc(written, operation, table_name)
+        return written
@@ -0,0 +1,65 @@
+import logging
+from typing import TYPE_CHECKING, Callable, List
+
+if TYPE_CHECKING:
+    from torrent_companion.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+def create_baseline(database: "Database") -> None:
+    """Tables and full text index; also upgrades databases created before versioning."""
+    database.setup_tables()
+    database.setup_search_index()
+
+
+def add_lookup_indexes(database: "Database") -> None:
+    """Unique uploader names and indexes matching the lookups of the read API and pruning."""
+    conn = database.handler.conn
+    with conn:
+        # Uploaders could be stored twice before names were unique: keep the first row of each
+        conn.execute(
+            """
+            UPDATE torrents SET uploader_id = (
+                SELECT MIN(u.id) FROM uploaders u
+                WHERE u.name = (SELECT name FROM uploaders WHERE id = torrents.uploader_id)
+            )
+            WHERE uploader_id NOT IN (SELECT MIN(id) FROM uploaders GROUP BY name)
+            """
+        )
+        conn.execute(
+            "DELETE FROM uploaders WHERE id NOT IN (SELECT MIN(id) FROM uploaders GROUP BY name)"
+        )
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS uploaders_name ON uploaders (name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS torrents_uploader_id ON torrents (uploader_id)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS torrents_episode "
+            "ON torrents (content_type, season_number, episode_number)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS torrents_scrapped_at ON torrents (scrapped_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS query_log_last_seen ON query_log (last_seen)")
+
+
+# Schema version N is reached by applying MIGRATIONS[N - 1]; only append to this list
+MIGRATIONS: List[Callable[["Database"], None]] = [
+    create_baseline,
+    add_lookup_indexes,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(database: "Database") -> int:
+    """Apply the migrations newer than the stored schema version, returning the version reached."""
+    handler = database.handler
+    version = handler.user_version
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than this release ({SCHEMA_VERSION})"
+        )
+
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        logger.info(f"Migrating database to schema version {number} ({migration.__name__})")
+        migration(database)
+        handler.user_version = number
+    return SCHEMA_VERSION
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Iterable, List, Tuple
+
+from .base_indexer import BaseIndexer
+from .common_models import AggregatedSearchResponse, BaseTorrentData, BaseTorrentSearchResponse
+from .common_types import IndexerGenre, IndexerHealth
+from .deadline import deadline as request_deadline
+from .query_log import QueryLog
+from .registry import IndexerRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class SearchAggregator:
+    """Fan a search out to every matching indexer and merge what answers before the deadline."""
+
+    def __init__(
+        self,
+        indexers: Iterable[BaseIndexer] = (),
+        deadline: float = 5.0,
+        query_log: QueryLog | None = None,
+        registry: IndexerRegistry | None = None,
+    ):
+        self.indexers: List[BaseIndexer] = list(indexers)
+        self.deadline = deadline  # in seconds
+        self.query_log = query_log  # searches per indexer, to warm the popular ones
+        self.registry = registry  # definitions loaded the first time a search needs them
+
+    def register(self, indexer: BaseIndexer) -> None:
+        """Add an indexer to the fan-out."""
+        self.indexers.append(indexer)
+
+    def candidates(self, genre: IndexerGenre | None = None) -> List[BaseIndexer]:
+        """The indexers serving a genre, loading registry definitions on first use."""
+        indexers = list(self.indexers)
+        if self.registry is not None:
+            indexers.extend(self.registry.indexers(genre))
+        return [indexer for indexer in indexers if genre is None or genre in indexer.genres]
+
+    async def responses(
+        self, query: str, genre: IndexerGenre | None = None, deadline: float | None = None
+    ) -> AsyncIterator[Tuple[BaseIndexer, str, BaseTorrentSearchResponse | None]]:
+        """Search every healthy indexer of the genre at once, yielding (indexer, status, response) as they answer.
+
+        Indexers still searching at the deadline are cancelled and yielded as timeouts; their
+        requests are bounded by the deadline too, so none is sent that could not answer in time.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        tasks: Dict[asyncio.Task, BaseIndexer] = {}
+
+        for indexer in self.candidates(genre):
+            if indexer.health == IndexerHealth.UNHEALTHY:
+                yield indexer, "skipped", None
+                continue
+            with request_deadline(deadline):  # copied into the task with its context
+                tasks[asyncio.create_task(indexer.search(query, genre))] = indexer
+            if self.query_log is not None:
+                self.query_log.record(query, genre.value if genre else None, indexer.name)
+
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + deadline
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, give_up_at - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+
+                for task in done:
+                    indexer = tasks[task]
+                    if task.exception() is not None:
+                        logger.error(f"{indexer.name} indexer search failed: {task.exception()!r}")
+                        yield indexer, "failed", None
+                        continue
+                    response = task.result()
+                    yield indexer, "ok" if response.success else "failed", response
+
+            for task in pending:
+                logger.warning(f"{tasks[task].name} indexer missed the {deadline}s search deadline")
+                yield tasks[task], "timeout", None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def search(
+        self, query: str, genre: IndexerGenre | None = None, deadline: float | None = None
+    ) -> AggregatedSearchResponse:
+        """Search every healthy indexer of the genre at once, returning partial results on timeout."""
+        statuses: Dict[str, str] = {}
+        merged: Dict[str, BaseTorrentData] = {}
+
+        async for indexer, status, response in self.responses(query, genre, deadline):
+            statuses[indexer.name] = status
+            if response is not None:
+                merge_results(merged, response.results)
+
+        results = sorted(merged.values(), key=lambda torrent: torrent.seeders, reverse=True)
+        return AggregatedSearchResponse(
+            success=any(status == "ok" for status in statuses.values()),
+            query=query,
+            results=results,
+            total_results=len(results),
+            partial="timeout" in statuses.values(),
+            indexers=statuses,
+        )
+
+
+def merge_results(
+    merged: Dict[str, BaseTorrentData], torrents: Iterable[BaseTorrentData]
+) -> List[BaseTorrentData]:
+    """Merge torrents into results keyed by info hash, returning the ones that were added or replaced.
+
+    The same release is often listed by several indexers; the listing with the
+    healthiest swarm is kept.
+    """
+    changed = []
+    for torrent in torrents:
+        key = torrent.info_hash.upper()
+        known = merged.get(key)
+        if known is None or torrent.seeders > known.seeders:
+            merged[key] = torrent
+            changed.append(torrent)
+    return changed
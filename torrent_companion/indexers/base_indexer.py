@@ -1,11 +1,13 @@
 import time
 import logging
-from typing import Tuple
+from typing import Dict, Tuple
 from datetime import datetime
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-
 from .base_scrapper import BaseScrapper
+from .common_models import BaseTorrentSearchResponse
 from .common_types import IndexerGenre, IndexerType, IndexerHealth
+from .health import CircuitOpenError
+from .rate_limiter import RateLimitedError
+from .scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +31,12 @@ class BaseIndexer:
 
         self.scrapper = scrapper
         self.last_updated = None
-        self.health = IndexerHealth.UNKNOWN
 
-        self._scheduler = AsyncIOScheduler()
+        self._scheduler = get_scheduler()
+        # replace_existing only applies once the scheduler runs, so drop the
+        # job of a previous instance with the same name ourselves
+        if self._scheduler.get_job(f"indexer-health-{self.name}") is not None:
+            self._scheduler.remove_job(f"indexer-health-{self.name}")
         self._job = self._scheduler.add_job(
             self.update_health,
             name="health_check",
@@ -45,18 +50,74 @@ class BaseIndexer:
         )
 
     def __del__(self):
-        if hasattr(self, "_job") and self._job:
-            self._job.remove()
+        self.close()
         logger.debug(f"Indexer {self.name} deleted")
 
+    def close(self) -> None:
+        """Remove the jobs of this indexer from the shared scheduler."""
+        job = getattr(self, "_job", None)
+        self._job = None
+        if job is None:
+            return
+
+        # Another instance with the same name may have replaced our job since
+        current = self._scheduler.get_job(job.id)
+        if current is not None and current.func == self.update_health:
+            self._scheduler.remove_job(job.id)
+
+    @property
+    def health(self) -> IndexerHealth:
+        """Health derived from the circuit breaker fed by real traffic."""
+        return self.scrapper.health_tracker.health
+
+    @health.setter
+    def health(self, health: IndexerHealth) -> None:
+        # Manual override: force the circuit open or closed
+        if health == IndexerHealth.UNHEALTHY:
+            self.scrapper.health_tracker.trip()
+        elif health == IndexerHealth.HEALTHY:
+            self.scrapper.health_tracker.reset()
+
+    def health_status(self) -> Dict[str, object]:
+        """Health, circuit state, error rate and p50/p95 latency of recent requests."""
+        return self.scrapper.health_tracker.snapshot()
+
     async def update_health(self) -> None:
-        """Update the health status of the indexer by testing the connection."""
+        """Probe the indexer; the outcome feeds the circuit breaker like any other request."""
         logger.debug(f"Checking health of {self.name} indexer")
-        if not await self.scrapper.aync_test_connection():
+        try:
+            passed = await self.scrapper.aync_test_connection()
+        except CircuitOpenError:
+            logger.debug(f"{self.name} indexer circuit is open, probe not due yet")
+            return
+        except RateLimitedError:
+            logger.debug(f"{self.name} indexer healthcheck shed by the rate limiter")
+            return
+        except Exception as e:
+            logger.warning(f"{self.name} indexer healthcheck errored: {e!r}")
+            passed = False
+
+        if not passed:
             logger.warning(f"{self.name} indexer failed the healthcheck")
-            self.health = IndexerHealth.UNHEALTHY
-            self.last_updated = time.time()
         else:
             logger.info(f"{self.name} indexer passed the healthcheck")
-            self.health = IndexerHealth.HEALTHY
-            self.last_updated = time.time()
+        self.last_updated = time.time()
+
+    async def search(
+        self, query: str, genre: IndexerGenre | None = None
+    ) -> BaseTorrentSearchResponse:
+        """Search the indexer, optionally restricted to one of its genres."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def warm(
+        self,
+        query: str,
+        genre: IndexerGenre | None = None,
+        budget: int = 1,
+        refresh_within: float = 0,
+    ) -> int:
+        """Refresh the cached results of a search ahead of expiry, with at most budget upstream requests.
+
+        Returns the requests spent; indexers without caches have nothing to warm.
+        """
+        return 0
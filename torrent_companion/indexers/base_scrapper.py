@@ -1,7 +1,48 @@
-from typing import Tuple
+import asyncio
+import logging
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import urlsplit
 
 import httpx
-from .common_types import ScrapperType
+from pydantic import BaseModel
+
+from torrent_companion.metrics import (
+    EXTRA_ATTEMPTS,
+    RESPONSE_BYTES,
+    RESPONSES,
+    STAGE_SECONDS,
+    metrics,
+)
+
+from .cache import ResultCache
+from .client_registry import clients
+from .common_types import CircuitState, RequestPriority, ScrapperType
+from .deadline import DeadlineExceededError, SharedDeadline, detached, expiry, remaining
+from .health import CircuitOpenError, HealthTracker
+from .rate_limiter import RateLimiter
+from .retry import RETRY_STATUSES, RetryBudget, RetryPolicy, backoff
+from .single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from torrent_companion.database.async_database import AsyncDatabase
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
 
 
 class BaseScrapper:
@@ -10,18 +51,383 @@ class BaseScrapper:
         base_url: str,
         is_authenticated: bool,
         scrapper_type: Tuple[ScrapperType],
+        max_concurrency: int | None = None,
+        search_cache: ResultCache | None = None,
+        database: "AsyncDatabase | None" = None,
+        retry_policy: RetryPolicy | None = None,
     ):
         self.base_url = base_url
+        self.host = urlsplit(base_url).netloc  # labels the metrics of the indexer
         self.scrapper_type = scrapper_type
 
+        # Requests in flight are capped per host, across every scrapper talking to it,
+        # unless the scrapper is given a cap of its own
+        self._max_concurrency = max_concurrency
+        self._request_slots = None if max_concurrency is None else asyncio.Semaphore(max_concurrency)
+        self._request_client: httpx.AsyncClient | None = None
+        self._rate_limiter: RateLimiter | None = None
+
+        # Fed by every real request, drives the circuit breaker of the indexer
+        self.health_tracker = HealthTracker(base_url)
+
+        # Slow requests are hedged and failed ones retried, within a budget shared by the scrapper
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.retry_budget = RetryBudget(self.retry_policy.retry_ratio, self.retry_policy.min_retries)
+        self.hedges = 0
+        self.retries = 0
+
+        # Identical concurrent requests (same URL) share one upstream request, sent
+        # until the latest deadline of the callers waiting for it
+        self.single_flight = SingleFlight()
+        self._shared_deadlines: Dict[Hashable, SharedDeadline] = {}
+
+        self.search_cache = ResultCache() if search_cache is None else search_cache
+        self.database = database  # local store scraped results are saved to and searched first
+        self._refreshing: Set[Hashable] = set()
+        self._background_tasks: Set[asyncio.Task] = set()
+
         if is_authenticated:
             self.authenticate()
 
+    @property
+    def request_client(self) -> httpx.AsyncClient:
+        """The HTTP client of the indexer host, shared process-wide unless overridden."""
+        if self._request_client is not None:
+            return self._request_client
+        return clients.get(self.base_url)
+
+    @request_client.setter
+    def request_client(self, client: httpx.AsyncClient | None) -> None:
+        self._request_client = client
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """The token bucket of the indexer host, shared process-wide unless overridden."""
+        if self._rate_limiter is not None:
+            return self._rate_limiter
+        return clients.limiter(self.base_url)
+
+    @rate_limiter.setter
+    def rate_limiter(self, limiter: RateLimiter | None) -> None:
+        self._rate_limiter = limiter
+
+    @property
+    def max_concurrency(self) -> int:
+        """Requests the indexer may have in flight at once."""
+        if self._max_concurrency is not None:
+            return self._max_concurrency
+        return clients.config(self.base_url).max_concurrency
+
+    @property
+    def request_slots(self) -> asyncio.Semaphore:
+        """The semaphore capping requests in flight to the indexer host, shared process-wide unless overridden."""
+        if self._request_slots is not None:
+            return self._request_slots
+        return clients.slots(self.base_url)
+
     @staticmethod
     def build_url(template: str, **kwargs) -> str:
         """Build a URL from a template and keyword arguments."""
         return template.format(**kwargs)
 
+    async def fetch(
+        self, url: str, priority: RequestPriority = RequestPriority.INTERACTIVE
+    ) -> httpx.Response:
+        """Send a GET request to the indexer, joining an identical request already in flight.
+
+        The shared request is bounded by the latest deadline of its callers;
+        each caller waits for it within its own, and the last one giving up
+        cancels it.
+        Only callers of the same priority share a request, so a foreground
+        caller never inherits the queueing (or shedding) of a background one.
+        """
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceededError(f"Deadline passed before requesting {url}")
+
+        key = (url, priority)
+        shared = self._shared_deadlines.get(key)
+        if shared is None or key not in self.single_flight:
+            shared = self._shared_deadlines[key] = SharedDeadline(expiry())
+        else:
+            shared.extend(expiry())
+
+        scope = asyncio.timeout(left)
+        try:
+            async with scope:
+                return await self.single_flight.do(key, lambda: self._shared_fetch(key, shared))
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            raise httpx.TimeoutException(f"No response from {url} within the {left:.2f}s deadline") from None
+
+    async def _shared_fetch(self, key: Tuple[str, RequestPriority], deadline: SharedDeadline) -> httpx.Response:
+        try:
+            with detached():  # the task copied the context of whichever caller started it
+                return await self._fetch(*key, deadline)
+        finally:
+            if self._shared_deadlines.get(key) is deadline:
+                del self._shared_deadlines[key]
+
+    async def _fetch(self, url: str, priority: RequestPriority, deadline: SharedDeadline) -> httpx.Response:
+        """Send a GET request, retrying unavailable hosts with jittered backoff within the retry budget."""
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            try:
+                response = await self._hedged(url, priority, deadline)
+            except httpx.TransportError as e:
+                if not await self._retry(attempt, f"{e!r}", deadline):
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or not await self._retry(
+                    attempt, f"status {response.status_code}", deadline
+                ):
+                    return response
+            attempt += 1
+
+    async def _retry(self, attempt: int, reason: str, deadline: SharedDeadline) -> bool:
+        """Wait before another attempt, False when out of attempts, deadline or budget."""
+        # A host failing enough to open the circuit gets no extra traffic
+        if attempt >= self.retry_policy.max_attempts or self.health_tracker.state != CircuitState.CLOSED:
+            return False
+        delay = backoff(self.retry_policy, attempt)
+        left = deadline.remaining()
+        if left is not None and left <= delay:
+            return False
+        if not self.retry_budget.withdraw():
+            logger.info(f"Retry budget of {self.base_url} exhausted, not retrying {reason}")
+            return False
+
+        self.retries += 1
+        if metrics.enabled:
+            EXTRA_ATTEMPTS.inc(1, self.host, "retry")
+        await asyncio.sleep(delay)
+        return True
+
+    def hedge_delay(self) -> float | None:
+        """Seconds after which a second attempt is sent, None until enough latencies were observed."""
+        policy = self.retry_policy
+        if policy.hedge_percentile is None or self.health_tracker.state != CircuitState.CLOSED:
+            return None
+        if self.health_tracker.sample_count() < policy.hedge_min_samples:
+            return None
+        latency = self.health_tracker.latency_percentile(policy.hedge_percentile)
+        return max(policy.hedge_min_delay, latency)
+
+    async def _hedged(self, url: str, priority: RequestPriority, deadline: SharedDeadline) -> httpx.Response:
+        """Send a GET request, and a second one when the first is slower than the hedge percentile.
+
+        The first usable response wins and the other attempt is cancelled.
+        """
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._attempt(url, priority, deadline))
+        attempts = {primary}
+        try:
+            if delay is not None:
+                left = deadline.remaining()
+                if left is None or delay < left:
+                    done, _ = await asyncio.wait(attempts, timeout=delay)
+                    if not done and self.retry_budget.withdraw():
+                        self.hedges += 1
+                        if metrics.enabled:
+                            EXTRA_ATTEMPTS.inc(1, self.host, "hedge")
+                        attempts.add(asyncio.ensure_future(self._attempt(url, priority, deadline)))
+
+            outcome = None
+            while attempts:
+                done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code not in RETRY_STATUSES:
+                        return task.result()
+                    # Only used once every attempt failed, the primary one preferred
+                    if outcome is None or task is primary:
+                        outcome = task
+            return outcome.result()
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    async def _attempt(self, url: str, priority: RequestPriority, deadline: SharedDeadline) -> httpx.Response:
+        """Send a single GET request, bounded by the host rate limit, concurrency cap and deadline."""
+        # The circuit is checked first, so a request it refuses spends no rate limit token
+        if not self.health_tracker.allow_request():
+            raise CircuitOpenError(f"Circuit for {self.base_url} is open")
+
+        # From here on every exit records an outcome or abandons the request, so a
+        # half-open circuit never waits forever on a probe that was not sent
+        rate_limiter = self.rate_limiter
+        try:
+            await rate_limiter.acquire(priority)
+            async with self.request_slots:
+                timeout = self.attempt_timeout(deadline)
+                start = time.perf_counter()
+                async with asyncio.timeout(timeout):
+                    response = await self.request_client.get(url)
+        except TimeoutError:
+            self.health_tracker.record(time.perf_counter() - start, ok=False)
+            raise httpx.TimeoutException(f"No response from {url} within {timeout:.2f}s") from None
+        except httpx.HTTPError:
+            self.health_tracker.record(time.perf_counter() - start, ok=False)
+            raise
+        except BaseException:
+            self.health_tracker.abandon()
+            raise
+
+        if response.status_code == 429:
+            rate_limiter.pause(self.retry_after(response))
+
+        elapsed = time.perf_counter() - start
+        ok = response.status_code < 500 and response.status_code != 429
+        self.health_tracker.record(elapsed, ok=ok)
+
+        if metrics.enabled:
+            endpoint = urlsplit(url).path or "/"
+            STAGE_SECONDS.observe(elapsed, self.host, "network")
+            RESPONSES.inc(1, self.host, endpoint, str(response.status_code))
+            RESPONSE_BYTES.observe(len(response.content), self.host, endpoint)
+        return response
+
+    def attempt_timeout(self, deadline: SharedDeadline) -> float | None:
+        """Seconds an attempt may take: the policy timeout capped by what is left of the deadline."""
+        timeout = self.retry_policy.timeout
+        left = deadline.remaining()
+        if left is None:
+            return timeout
+        if left <= 0:
+            raise DeadlineExceededError(f"Deadline passed before requesting {self.base_url}")
+        return left if timeout is None else min(timeout, left)
+
+    def parse_json(self, response: httpx.Response) -> Any:
+        """Parse a JSON response body, timed as the json stage."""
+        if not metrics.enabled:
+            return response.json()
+
+        start = time.perf_counter()
+        data = response.json()
+        STAGE_SECONDS.observe(time.perf_counter() - start, self.host, "json")
+        return data
+
+    @staticmethod
+    def retry_after(response: httpx.Response, default: float = 1.0) -> float:
+        """Seconds to wait according to the Retry-After header of a response."""
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", default)))
+        except ValueError:  # HTTP date form, not worth parsing
+            return default
+
+    async def stream_completed(
+        self,
+        keys: Iterable[K],
+        loader: Callable[[K], Awaitable[T]],
+        limit: int | None = None,
+    ) -> AsyncIterator[Tuple[K, T | None]]:
+        """Load every key concurrently, yielding (key, value) pairs as they complete.
+
+        At most `limit` loads (the concurrency cap by default) are scheduled at
+        once; a failed load yields None. Loads still pending when the consumer
+        stops iterating are cancelled.
+        """
+        limit = limit or self.max_concurrency
+        remaining = iter(dict.fromkeys(keys))
+        pending: Dict[asyncio.Future, K] = {}
+        try:
+            while True:
+                for key in remaining:
+                    pending[asyncio.ensure_future(loader(key))] = key
+                    if len(pending) >= limit:
+                        break
+                if not pending:
+                    return
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key = pending.pop(task)
+                    try:
+                        value = task.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to load {key} from {self.base_url}: {e!r}")
+                        value = None
+                    yield key, value
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        """Approximate the memory footprint of a cached value in bytes."""
+        if isinstance(value, BaseModel):
+            return len(value.model_dump_json())
+        return len(str(value))
+
+    async def cached_call(
+        self,
+        cache: ResultCache,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] = lambda value: value is not None,
+    ) -> T:
+        """Serve a value from the cache, refreshing expired entries in the background."""
+        cached = cache.get(key)
+        if cached is not None:
+            value, is_fresh = cached
+            if not is_fresh and key not in self._refreshing:
+                self._refreshing.add(key)
+                with detached():  # the refresh outlives the search that found the entry stale
+                    task = asyncio.create_task(self._refresh(cache, key, loader, cacheable))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            return value
+
+        return await self.refresh_call(cache, key, loader, cacheable)
+
+    async def refresh_call(
+        self,
+        cache: ResultCache,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] = lambda value: value is not None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+    ) -> T:
+        """Load a value bypassing the cache and store it, e.g. to refresh an entry before it expires.
+
+        `priority` is the one the loader requests at; loads only coalesce with
+        loads of the same priority.
+        """
+        # Concurrent loads for the same key load (and decode) once
+        return await self.single_flight.do(
+            (id(cache), key, priority), lambda: self._load(cache, key, loader, cacheable)
+        )
+
+    async def _load(
+        self,
+        cache: ResultCache,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool],
+    ) -> T:
+        value = await loader()
+        if cacheable(value):
+            cache.set(key, value, self.estimate_size(value))
+        return value
+
+    async def _refresh(
+        self,
+        cache: ResultCache,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool],
+    ) -> None:
+        """Reload a stale cache entry."""
+        try:
+            value = await loader()
+            if cacheable(value):
+                cache.set(key, value, self.estimate_size(value))
+        except Exception:
+            logger.exception(f"Failed to refresh cached entry {key} for {self.base_url}")
+        finally:
+            self._refreshing.discard(key)
+
     def authenticate(self) -> None:
         """Authenticate with the indexer if required."""
         raise NotImplementedError("Subclasses should implement this method.")
@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    fresh_until: float
+    stale_until: float
+
+
+class ResultCache:
+    """Bounded in-memory LRU cache with per-entry TTL and a stale-while-revalidate window."""
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        stale_ttl: float = 600,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl  # how long an expired entry can still be served while refreshing
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[Any, bool] | None:
+        """Get a cached value and whether it is still fresh, or None on a miss."""
+        entry = self._entries.get(key)
+        now = self.clock()
+
+        if entry is None or now >= entry.stale_until:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if now < entry.fresh_until:
+            self.hits += 1
+            return entry.value, True
+
+        self.stale_hits += 1
+        return entry.value, False
+
+    def set(self, key: Hashable, value: Any, size: int) -> None:
+        """Store a value, evicting least recently used entries past the count or byte bounds."""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+
+        now = self.clock()
+        self._entries[key] = CacheEntry(
+            value=value,
+            size=size,
+            fresh_until=now + self.ttl,
+            stale_until=now + self.ttl + self.stale_ttl,
+        )
+        self.total_bytes += size
+
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def peek(self, key: Hashable) -> Any | None:
+        """Get a cached value (fresh or stale) without counting a hit or refreshing its recency."""
+        entry = self._entries.get(key)
+        if entry is None or self.clock() >= entry.stale_until:
+            return None
+        return entry.value
+
+    def expires_in(self, key: Hashable) -> float | None:
+        """Seconds until an entry goes stale (negative once it is), or None when it is not cached."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.fresh_until - self.clock()
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry from the cache."""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry from the cache."""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit/miss/eviction counters and the current size of the cache."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
@@ -0,0 +1,116 @@
+import asyncio
+import importlib.util
+import logging
+from dataclasses import dataclass
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class HostConfig:
+    """Connection pool, concurrency and rate limit settings for a single host."""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0  # in seconds
+    timeout: float = 10.0  # in seconds
+    connect_timeout: float = 5.0  # in seconds
+    http2: bool = False  # requires the optional "h2" package
+    rate_limit: float | None = None  # requests per second, None for no limit
+    burst: int = 1  # requests allowed at once before the rate limit kicks in
+    max_concurrency: int = 8  # requests in flight at once, across every scrapper of the host
+
+
+class ClientRegistry:
+    """Process-wide registry handing out one pooled httpx.AsyncClient, one rate limiter
+    and one concurrency cap per host."""
+
+    def __init__(self, default_config: HostConfig | None = None):
+        self.default_config = default_config or HostConfig()
+        self._configs: Dict[str, HostConfig] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._slots: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Get the scheme and host part of a URL, used as the registry key."""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def configure(self, url: str, config: HostConfig) -> None:
+        """Set the settings of a host; takes effect the next time its client, limiter and slots are created."""
+        host = self.host_of(url)
+        self._configs[host] = config
+        self._limiters.pop(host, None)
+        self._slots.pop(host, None)
+
+    def config(self, url: str) -> HostConfig:
+        """Get the settings of the host of a URL."""
+        return self._configs.get(self.host_of(url), self.default_config)
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """Get the shared client for the host of a URL, creating it on first use."""
+        host = self.host_of(url)
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = self._clients[host] = self._create_client(host)
+        return client
+
+    def limiter(self, url: str) -> RateLimiter:
+        """Get the rate limiter shared by every request to the host of a URL."""
+        host = self.host_of(url)
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            config = self._configs.get(host, self.default_config)
+            limiter = self._limiters[host] = RateLimiter(config.rate_limit, config.burst)
+        return limiter
+
+    def slots(self, url: str) -> asyncio.Semaphore:
+        """Get the semaphore capping the requests in flight to the host of a URL.
+
+        A semaphore belongs to the event loop it first waited in, so a new one is
+        made when the host is used from another loop.
+        """
+        host = self.host_of(url)
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(host)
+        if slots is None or slots[0] is not loop:
+            config = self._configs.get(host, self.default_config)
+            slots = self._slots[host] = (loop, asyncio.Semaphore(config.max_concurrency))
+        return slots[1]
+
+    def _create_client(self, host: str) -> httpx.AsyncClient:
+        config = self._configs.get(host, self.default_config)
+        http2 = config.http2 and HTTP2_AVAILABLE
+        if config.http2 and not HTTP2_AVAILABLE:
+            logger.warning(f"HTTP/2 requested for {host} but the h2 package is not installed")
+
+        logger.debug(f"Creating HTTP client for {host} (http2={http2})")
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+        )
+
+    async def aclose(self) -> None:
+        """Close every client and release their connections."""
+        clients, self._clients = self._clients, {}
+        for host, client in clients.items():
+            logger.debug(f"Closing HTTP client for {host}")
+            await client.aclose()
+
+
+clients = ClientRegistry()
@@ -1,6 +1,87 @@
-from typing import Literal
+import re
+from typing import Dict, List, Literal, NamedTuple, Set
 from pydantic import BaseModel
 
+VIDEO_EXTENSIONS = (".mkv", ".mp4", ".avi", ".m4v", ".mov", ".wmv", ".ts", ".m2ts")
+SUSPICIOUS_EXTENSIONS = (".exe", ".scr", ".bat", ".cmd", ".msi", ".lnk", ".vbs", ".js")
+
+SAMPLE_PATTERN = re.compile(r"(?<![a-z0-9])sample(?![a-z0-9])")
+EXTRAS_PATTERN = re.compile(
+    r"(?<![a-z0-9])(?:extras?|featurettes?|bonus|behind[ ._-]the[ ._-]scenes)(?![a-z0-9])"
+)
+# S01E02 / S01E02-E03 / 1x02 in a file name
+EPISODE_PATTERN = re.compile(
+    r"(?<![a-z0-9])s(\d{1,2})[ ._-]?e(\d{1,3})(?:-?e(\d{1,3}))?"
+    r"|(?<![a-z0-9])(\d{1,2})x(\d{2,3})(?![a-z0-9])"
+)
+# E02 / Episode 2 in a file name, the season coming from the path (S01, Season 1)
+EPISODE_ONLY_PATTERN = re.compile(r"(?<![a-z0-9])(?:e|ep|episode)[ ._-]?(\d{1,3})(?![a-z0-9])")
+SEASON_PATTERN = re.compile(r"(?<![a-z0-9])(?:s|season[ ._-]?)(\d{1,2})(?![0-9])")
+
+
+class TorrentFile(NamedTuple):
+    """A single file inside a torrent."""
+
+    path: str
+    size: int  # in bytes
+
+
+class FileList(tuple):
+    """The files of a torrent as TorrentFile tuples, with the scans the analysis needs."""
+
+    __slots__ = ()
+
+    @property
+    def total_size(self) -> int:
+        return sum(file.size for file in self)
+
+    def videos(self) -> List[TorrentFile]:
+        """Video files, samples and extras excluded."""
+        return [
+            file
+            for file in self
+            if file.path.lower().endswith(VIDEO_EXTENSIONS) and not self._is_extra(file.path.lower())
+        ]
+
+    def main_video(self) -> TorrentFile | None:
+        return max(self.videos(), key=lambda file: file.size, default=None)
+
+    def samples(self) -> List[TorrentFile]:
+        return [file for file in self if SAMPLE_PATTERN.search(file.path.lower())]
+
+    def extras(self) -> List[TorrentFile]:
+        """Everything but the main videos: samples, extras, subtitles, nfo files..."""
+        videos = set(self.videos())
+        return [file for file in self if file not in videos]
+
+    def has_suspicious_files(self) -> bool:
+        return any(file.path.lower().endswith(SUSPICIOUS_EXTENSIONS) for file in self)
+
+    def episodes(self) -> Dict[int, Set[int]]:
+        """Episodes covered by the video files, by season (S01E02, S01E02-E03 and 1x02 forms)."""
+        coverage: Dict[int, Set[int]] = {}
+        for file in self.videos():
+            path = file.path.lower()
+            match = EPISODE_PATTERN.search(path.rsplit("/", 1)[-1])
+            if match is None:
+                episode = EPISODE_ONLY_PATTERN.search(path.rsplit("/", 1)[-1])
+                season = SEASON_PATTERN.search(path)
+                if episode and season:
+                    coverage.setdefault(int(season.group(1)), set()).add(int(episode.group(1)))
+                continue
+            if match.group(1):
+                season, first = int(match.group(1)), int(match.group(2))
+                last = int(match.group(3)) if match.group(3) else first
+            else:
+                season, first = int(match.group(4)), int(match.group(5))
+                last = first
+            coverage.setdefault(season, set()).update(range(first, last + 1))
+        return coverage
+
+    @staticmethod
+    def _is_extra(path: str) -> bool:
+        return SAMPLE_PATTERN.search(path) is not None or EXTRAS_PATTERN.search(path) is not None
+
 
 class BaseUploaderProfile(BaseModel):
     """Base model for uploader profile (used for analysis)."""
@@ -47,3 +128,10 @@ class BaseTorrentSearchResponse(BaseModel):
     query: str
     results: list[BaseTorrentData]
     total_results: int
+
+
+class AggregatedSearchResponse(BaseTorrentSearchResponse):
+    """Model for a search merged from several indexers."""
+
+    partial: bool = False  # True when at least one queried indexer did not answer in time
+    indexers: dict[str, str] = {}  # indexer name -> "ok", "failed", "timeout" or "skipped"
@@ -22,3 +22,17 @@ class ScrapperType(Enum):
     STATIC = "STATIC"
     BROWSER = "BROWSER"
     API = "API"
+
+
+class CircuitState(Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class RequestPriority(Enum):
+    """Lower values are served first by the rate limiter."""
+
+    INTERACTIVE = 0  # user facing searches
+    DETAIL = 1  # hydrating results (torrent info, file lists)
+    BACKGROUND = 2  # analysis and health checks
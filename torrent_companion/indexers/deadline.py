@@ -0,0 +1,71 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Monotonic time by which the current search must have answered, None without a deadline.
+# Tasks copy the context they are created in, so a deadline follows the work it bounds.
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(Exception):
+    """Raised instead of sending a request once the caller's deadline has passed."""
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """Bound every request made in the block (and in tasks created in it) by a deadline.
+
+    Nested deadlines can only shorten the enclosing one.
+    """
+    if seconds is None:
+        yield
+        return
+
+    current = _deadline.get()
+    at = time.monotonic() + seconds
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """Run the block (and tasks created in it) without the current deadline, e.g. background refreshes."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline (negative once passed), None without a deadline."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def expiry() -> float | None:
+    """Monotonic time of the current deadline, None without a deadline."""
+    return _deadline.get()
+
+
+class SharedDeadline:
+    """Deadline of a request shared by several callers: the latest of theirs, None once one has none.
+
+    A request is only worth sending while some caller still waits for it.
+    """
+
+    def __init__(self, at: float | None):
+        self.at = at
+
+    def extend(self, at: float | None) -> None:
+        """Keep the request going for a caller joining it with deadline at."""
+        if self.at is not None:
+            self.at = None if at is None else max(self.at, at)
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline (negative once passed), None without a deadline."""
+        return None if self.at is None else self.at - time.monotonic()
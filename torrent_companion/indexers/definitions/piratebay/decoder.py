@@ -0,0 +1,103 @@
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, List
+
+from pydantic import TypeAdapter
+
+from torrent_companion.indexers.result_set import TorrentResultSet
+from torrent_companion.indexers.definitions.piratebay.models import PBTorrentData
+from torrent_companion.indexers.definitions.piratebay.types import PirateBayCategory, TV_CATEGORIES
+
+# Built once: validating a whole page through one adapter call is a single
+# pass in pydantic-core instead of one model validation per row.
+TORRENT_LIST_ADAPTER = TypeAdapter(List[PBTorrentData])
+
+
+
+# apibay answers a search without results with a single row of this id and info hash
+NO_RESULTS_ID = "0"
+NO_RESULTS_INFO_HASH = "0" * 40
+
+
+def is_placeholder(item: dict) -> bool:
+    """Whether a row is apibay's "No results returned" placeholder rather than a torrent."""
+    return str(item["id"]) == NO_RESULTS_ID or item["info_hash"] == NO_RESULTS_INFO_HASH
+
+
+@lru_cache(maxsize=65536)
+def format_timestamp(added: str | int) -> str:
+    """Format an apibay unix timestamp as an iso date (cached, the same torrents show up again and again)."""
+    return datetime.fromtimestamp(int(added)).isoformat()
+
+
+class ApibayDecoder:
+    """Decode raw apibay result rows into torrent models, validating every page in one pass."""
+
+    def __init__(self, magnet_url: str):
+        # "magnet:?xt=urn:btih:{hash}" -> plain concatenation instead of str.format per row
+        self.magnet_prefix, _, self.magnet_suffix = magnet_url.partition("{hash}")
+
+    def decode(self, rows: Iterable[dict], keywords: str) -> List[PBTorrentData]:
+        """Decode a list of apibay rows, dropping the "No results returned" placeholder."""
+        return TORRENT_LIST_ADAPTER.validate_python(
+            [self._fields(item, keywords) for item in rows if not is_placeholder(item)]
+        )
+
+    def decode_columns(
+        self, rows: Iterable[dict], keywords: str, into: TorrentResultSet | None = None
+    ) -> TorrentResultSet:
+        """Decode apibay rows into a compact result set, without building any model.
+
+        Rows are appended to `into` when given, so several pages can share one set.
+        """
+        results = into if into is not None else TorrentResultSet(
+            keywords, self.magnet_prefix, self.magnet_suffix
+        )
+        columns = results.columns
+        intern = sys.intern
+        for item in rows:
+            if is_placeholder(item):
+                continue
+            category = int(item.get("category", PirateBayCategory.ALL.value))
+            columns["seeders"].append(int(item["seeders"]))
+            columns["leechers"].append(int(item["leechers"]))
+            columns["size"].append(int(item["size"]))
+            columns["added"].append(int(item["added"]))
+            columns["category"].append(category)
+            columns["uploader"].append(intern(item["username"]))
+            columns["status"].append(intern(item.get("status", "unknown")))
+            columns["content_type"].append("episode" if category in TV_CATEGORIES else "movie")
+            columns["source"].append("PirateBay")
+            columns["quality"].append("Unknown")
+            columns["language"].append("Unknown")
+            columns["id"].append(str(item["id"]))
+            columns["name"].append(item["name"])
+            columns["info_hash"].append(item["info_hash"])
+            columns["imdb"].append(item.get("imdb", "") or "")
+            columns["season_number"].append(None)
+            columns["episode_number"].append(None)
+        return results
+
+    def to_models(self, results: TorrentResultSet) -> List[PBTorrentData]:
+        """Convert a result set decoded by this decoder back to models."""
+        return results.to_models(PBTorrentData, format_timestamp)
+
+    def _fields(self, item: dict, keywords: str) -> dict:
+        category = int(item.get("category", PirateBayCategory.ALL.value))
+        return {
+            "id": str(item["id"]),
+            "name": item["name"],
+            "info_hash": item["info_hash"],
+            "leechers": item["leechers"],
+            "seeders": item["seeders"],
+            "size": item["size"],
+            "uploader": item["username"],
+            "added_date": format_timestamp(item["added"]),
+            "status": item.get("status", "unknown"),
+            "category": category,
+            "imdb": item.get("imdb", "") or "",
+            "content_type": "episode" if category in TV_CATEGORIES else "movie",
+            "keywords": keywords,
+            "magnet_link": self.magnet_prefix + item["info_hash"] + self.magnet_suffix,
+        }
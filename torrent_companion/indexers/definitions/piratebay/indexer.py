@@ -1,25 +1,240 @@
+import asyncio
+import heapq
+from operator import attrgetter
+from typing import TYPE_CHECKING, Iterable, List, Set, Tuple
+
+from torrent_companion.analysis.common_models import ReleaseInfo, ScoredTorrent, SeasonResolution
+from torrent_companion.analysis.release_analyzer import ReleaseNameAnalyzer
+from torrent_companion.analysis.torrent_scorer import TorrentScorer
 from torrent_companion.indexers.base_indexer import BaseIndexer
+from torrent_companion.indexers.common_models import BaseTorrentData
 from torrent_companion.indexers.common_types import IndexerGenre, IndexerType
+from torrent_companion.indexers.definitions.piratebay.models import PBTorrentSearchResponse
 from torrent_companion.indexers.definitions.piratebay.scrapper import PirateBayScrapper
+from torrent_companion.indexers.definitions.piratebay.types import MOVIE_CATEGORIES, TV_CATEGORIES
+
+if TYPE_CHECKING:
+    from torrent_companion.database.async_database import AsyncDatabase
+
+by_score = attrgetter("score")
+
+GENRE_CATEGORIES = {
+    IndexerGenre.MOVIES: MOVIE_CATEGORIES,
+    IndexerGenre.TV_SHOWS: TV_CATEGORIES,
+}
 
 
 class PirateBayIndexer(BaseIndexer):
-    def __init__(self, _job_timer_override: int = 10):
+    def __init__(self, _job_timer_override: int = 10, database: "AsyncDatabase | None" = None):
         super().__init__(
             name="The Pirate Bay",
             description="A popular torrent indexer known for its vast collection of torrents.",
             idxtype=IndexerType.PUBLIC,
             language="en",
             genres=(IndexerGenre.MOVIES, IndexerGenre.TV_SHOWS),
-            scrapper=PirateBayScrapper(),
+            scrapper=PirateBayScrapper(database=database),
             _job_timer_override=_job_timer_override,
         )
 
+        self.analyzer = ReleaseNameAnalyzer()
+        self.scorer = TorrentScorer()
+
+    async def search(
+        self, query: str, genre: IndexerGenre | None = None
+    ) -> PBTorrentSearchResponse:
+        """Search the indexer, optionally restricted to one of its genres."""
+        # Always search every category so all genres share one cached upstream
+        # response, then narrow it down locally.
+        response = await self.scrapper.search(query)
+        if genre is None or not response.success:
+            return response
+
+        categories = GENRE_CATEGORIES.get(genre, frozenset())
+        results = [torrent for torrent in response.results if torrent.category in categories]
+        return response.model_copy(update={"results": results, "total_results": len(results)})
+
+    async def warm(
+        self,
+        query: str,
+        genre: IndexerGenre | None = None,
+        budget: int = 1,
+        refresh_within: float = 0,
+    ) -> int:
+        """Refresh the cached search and the details of its top results ahead of expiry."""
+        # Every genre is served from the same all-categories search
+        return await self.scrapper.warm(query, budget, refresh_within)
+
     async def get_best_movie_torrent(
         self,
+        query: str,
         analyze_torrent: bool = True, # Whether to analyze the torrent for quality (e.g., resolution, codec)
         analyze_files: bool = False, # Resource intensive
         analyze_uploader: bool = False, # Resource intensive (requires additional requests)
-    ):
+    ) -> ScoredTorrent | None:
         """Get the best movie torrent available."""
-        pass
+        best = await self.get_best_movie_torrents(
+            query,
+            k=1,
+            analyze_torrent=analyze_torrent,
+            analyze_files=analyze_files,
+            analyze_uploader=analyze_uploader,
+        )
+        return best[0] if best else None
+
+    async def get_best_movie_torrents(
+        self,
+        query: str,
+        k: int = 5,
+        analyze_torrent: bool = True,
+        analyze_files: bool = False,
+        analyze_uploader: bool = False,
+        shortlist_size: int = 5,
+    ) -> List[ScoredTorrent]:
+        """Get the k best movie torrents, best first.
+
+        Every candidate gets the cheap score (search data and parsed name); the
+        file list and uploader profile, which cost extra requests, are only
+        fetched for the shortlist that survives it.
+        """
+        response = await self.scrapper.search(query)
+        if not response.success:
+            return []
+
+        torrents = response.results
+        if analyze_torrent:
+            # The response is shared through the search cache: fill in copies, not its torrents
+            torrents = self.analyzer.analyze_many([torrent.model_copy() for torrent in torrents])
+
+        scored = []
+        for torrent in torrents:
+            if torrent.category not in MOVIE_CATEGORIES or torrent.seeders <= 0:
+                continue
+            release = self.analyzer.analyze(torrent.name) if analyze_torrent else None
+            if release is not None and release.is_episode:
+                continue
+            scored.append(self.scorer.score(torrent, release))
+
+        if not (analyze_files or analyze_uploader):
+            return heapq.nlargest(k, scored, key=by_score)
+
+        shortlist = heapq.nlargest(max(k, shortlist_size), scored, key=by_score)
+        file_lists, profiles = await asyncio.gather(
+            self._get_file_lists(shortlist) if analyze_files else self._nothing(),
+            self._get_uploader_profiles(shortlist) if analyze_uploader else self._nothing(),
+        )
+
+        rescored = [
+            self.scorer.score(
+                candidate.torrent,
+                candidate.release,
+                files=file_lists[index] if file_lists else None,
+                profile=profiles.get(candidate.torrent.uploader) if profiles else None,
+            )
+            for index, candidate in enumerate(shortlist)
+        ]
+        return heapq.nlargest(k, rescored, key=by_score)
+
+    async def resolve_season(
+        self,
+        show: str,
+        season: int,
+        episodes: Iterable[int] | None = None,
+        max_packs: int = 3,
+    ) -> SeasonResolution:
+        """Find the best source of every episode of a season with a few broad searches.
+
+        Season packs and multi-episode releases are recognized from their names,
+        and the file lists of the best few packs (one request each) tell which
+        episodes they hold. Episodes default to every one any candidate covers;
+        packs whose episodes stay unknown are then only listed as candidates.
+        """
+        queries = (show, f"{show} S{season:02d}", f"{show} Season {season}")
+        responses = await asyncio.gather(*(self.scrapper.search(query) for query in queries))
+        torrents = {}
+        for response in responses:
+            if response.success:
+                for torrent in response.results:
+                    torrents.setdefault(torrent.info_hash.upper(), torrent)
+
+        # (torrent, release, episodes covered or None when only the name claims the season)
+        candidates: List[Tuple[BaseTorrentData, ReleaseInfo, Set[int] | None]] = []
+        packs = []
+        for torrent in torrents.values():
+            if torrent.category not in TV_CATEGORIES or torrent.seeders <= 0:
+                continue
+            release = self.analyzer.analyze(torrent.name)
+            if release.season != season:
+                continue
+            if release.is_season_pack:
+                packs.append((torrent, release))
+            else:
+                last_episode = release.last_episode or release.episode
+                candidates.append((torrent, release, set(range(release.episode, last_episode + 1))))
+
+        # Only the best packs are worth a file list request
+        packs = heapq.nlargest(max_packs, packs, key=lambda pack: self.scorer.score(*pack).score)
+        file_lists = {
+            torrent_id: files
+            async for torrent_id, files in self.scrapper.get_file_lists(
+                torrent.id for torrent, _ in packs
+            )
+        }
+        for torrent, release in packs:
+            files = file_lists.get(torrent.id)
+            if files and files.has_suspicious_files():
+                continue
+            covered = files.episodes().get(season) if files else None
+            candidates.append((torrent, release, covered or None))
+
+        if episodes is None:
+            wanted = sorted(set().union(*(covered for *_, covered in candidates if covered)))
+        else:
+            wanted = sorted(set(episodes))
+
+        scored = []
+        coverage = {}
+        for torrent, release, covered in candidates:
+            if covered is None and not wanted:
+                # Neither its file list nor the episodes asked for tell what the pack
+                # holds: it is still listed as a candidate, without any coverage
+                scored.append(self.scorer.score(torrent, release))
+                continue
+            covered = sorted(covered) if covered is not None else wanted
+            if not covered:
+                continue
+            scored.append(self._score_episodes(torrent, release, len(covered)))
+            coverage[torrent.info_hash] = covered
+        scored.sort(key=by_score, reverse=True)
+
+        best = {episode: None for episode in wanted}
+        for candidate in scored:  # best first, so the first covering source wins
+            for episode in coverage.get(candidate.torrent.info_hash, ()):
+                if episode in best and best[episode] is None:
+                    best[episode] = candidate
+
+        return SeasonResolution(
+            show=show, season=season, episodes=best, coverage=coverage, candidates=scored
+        )
+
+    def _score_episodes(
+        self, torrent: BaseTorrentData, release: ReleaseInfo, episodes: int
+    ) -> ScoredTorrent:
+        """Score a release by its size per episode, so packs compare with single episodes."""
+        per_episode = torrent.model_copy(update={"size": torrent.size // max(1, episodes)})
+        return self.scorer.score(per_episode, release).model_copy(update={"torrent": torrent})
+
+    async def _get_file_lists(self, candidates: List[ScoredTorrent]):
+        ids = [candidate.torrent.id for candidate in candidates]
+        file_lists = {
+            torrent_id: files async for torrent_id, files in self.scrapper.get_file_lists(ids)
+        }
+        return [file_lists.get(torrent_id) for torrent_id in ids]
+
+    async def _get_uploader_profiles(self, candidates: List[ScoredTorrent]):
+        return await self.scrapper.get_uploader_profiles(
+            candidate.torrent.uploader for candidate in candidates
+        )
+
+    @staticmethod
+    async def _nothing():
+        return None
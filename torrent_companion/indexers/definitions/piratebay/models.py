@@ -10,6 +10,8 @@ from torrent_companion.indexers.definitions.piratebay.types import PirateBayCate
 
 class PBUploaderProfile(BaseUploaderProfile):
     plataform: str = "Pirate Bay"
+    total_uploads: int = 0  # uploads the totals and averages are computed over
+    counted_since: str | None = None  # oldest of the counted uploads, in iso format
 
 
 class DetailedPBTorrentData(BaseTorrentData):
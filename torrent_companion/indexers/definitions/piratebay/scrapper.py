@@ -1,10 +1,25 @@
-from datetime import datetime
-from typing import List
-import httpx
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, List, Tuple
 import logging
-from torrent_companion.indexers.common_types import ScrapperType
+from pydantic_core import from_json
+from torrent_companion.indexers.common_models import FileList, TorrentFile
+from torrent_companion.indexers.common_types import RequestPriority, ScrapperType
 from torrent_companion.indexers.base_scrapper import BaseScrapper
-from torrent_companion.indexers.definitions.piratebay.types import PirateBayCategory
+from torrent_companion.indexers.cache import ResultCache
+from torrent_companion.indexers.rate_limiter import RateLimitedError
+from torrent_companion.indexers.result_set import TorrentResultSet
+from torrent_companion.indexers.retry import RetryPolicy
+from torrent_companion.metrics import RESULT_ROWS, STAGE_SECONDS, metrics
+from torrent_companion.indexers.definitions.piratebay.decoder import (
+    TORRENT_LIST_ADAPTER,
+    ApibayDecoder,
+    format_timestamp,
+)
+from torrent_companion.indexers.definitions.piratebay.types import PirateBayCategory, TV_CATEGORIES
 from torrent_companion.indexers.definitions.piratebay.models import (
     DetailedPBTorrentData, 
     PBTorrentData,
@@ -12,23 +27,59 @@ from torrent_companion.indexers.definitions.piratebay.models import (
     PBUploaderProfile,
 )
 
+if TYPE_CHECKING:
+    from torrent_companion.database.async_database import AsyncDatabase
+
 logger = logging.getLogger(__name__)
 
 
+def is_successful(response: PBTorrentSearchResponse) -> bool:
+    return response.success
+
+
 class PirateBayScrapper(BaseScrapper):
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        search_cache: ResultCache | None = None,
+        database: "AsyncDatabase | None" = None,
+        local_min_results: int = 10,
+        local_max_age: timedelta = timedelta(hours=6),
+        profile_max_age: timedelta = timedelta(days=1),
+        detail_cache: ResultCache | None = None,
+        file_list_cache: ResultCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ):
         super().__init__(
             base_url="https://apibay.org",
             is_authenticated=False,
             scrapper_type=(ScrapperType.API),
+            max_concurrency=max_concurrency,
+            search_cache=search_cache,
+            database=database,
+            retry_policy=retry_policy,
+        )
+
+        # Searches are answered from the local index when it holds at least
+        # local_min_results torrents scraped within local_max_age
+        self.local_min_results = local_min_results
+        self.local_max_age = local_max_age
+        self.profile_max_age = profile_max_age  # stored uploader profiles are served while younger
+
+        # Details change with the seeders count; file lists never change
+        self.detail_cache = ResultCache(ttl=600) if detail_cache is None else detail_cache
+        self.file_list_cache = (
+            ResultCache(ttl=24 * 3600, stale_ttl=7 * 24 * 3600)
+            if file_list_cache is None
+            else file_list_cache
         )
 
-        self.request_client = httpx.AsyncClient()
         self.build_template_urls()
+        self.decoder = ApibayDecoder(self.magnet_url)
 
     async def aync_test_connection(self) -> bool:
         """Test the connection to the indexer."""
-        response = await self.request_client.get(self.base_url)
+        response = await self.fetch(self.base_url, RequestPriority.BACKGROUND)
         return response.status_code == 200
 
     def build_template_urls(self) -> None:
@@ -47,8 +98,126 @@ class PirateBayScrapper(BaseScrapper):
     ) -> PBTorrentSearchResponse:
         """Search for torrents using the provided query and category."""
         category = PirateBayCategory.ALL if category is None else category
-        url = self.build_url(self.search_url, query=query, category=category)
-        response = await self.request_client.get(url)
+        response = await self.cached_call(
+            self.search_cache,
+            self._search_key(query, category),
+            lambda: self._search_local_first(query, category),
+            cacheable=is_successful,
+        )
+
+        if response.query != query:
+            response = response.model_copy(update={"query": query})
+        return response
+
+    async def warm(
+        self,
+        query: str,
+        budget: int,
+        refresh_within: float = 0,
+        details: int = 3,
+        category: PirateBayCategory = PirateBayCategory.ALL,
+    ) -> int:
+        """Refresh a search and the details of its most seeded results ahead of expiry.
+
+        Only entries missing or going stale within `refresh_within` seconds are
+        loaded, at background priority and with at most `budget` requests.
+        Returns the number of requests spent.
+        """
+        spent = 0
+        key = self._search_key(query, category)
+        expires_in = self.search_cache.expires_in(key)
+        if expires_in is None or expires_in <= refresh_within:
+            if budget < 1:
+                return 0
+            response = await self.refresh_call(
+                self.search_cache,
+                key,
+                lambda: self._search_local_first(query, category, RequestPriority.BACKGROUND),
+                cacheable=is_successful,
+                priority=RequestPriority.BACKGROUND,
+            )
+            spent += 1
+        else:
+            response = self.search_cache.peek(key)
+
+        if response is None or not response.success:
+            return spent
+
+        candidates = heapq.nlargest(details, response.results, key=attrgetter("seeders"))
+        for torrent in candidates:
+            expires_in = self.detail_cache.expires_in(torrent.id)
+            if expires_in is not None and expires_in > refresh_within:
+                continue
+            if spent >= budget:
+                break
+            await self.refresh_call(
+                self.detail_cache,
+                torrent.id,
+                lambda: self._get_torrent_info(torrent.id, RequestPriority.BACKGROUND),
+                priority=RequestPriority.BACKGROUND,
+            )
+            spent += 1
+        return spent
+
+    @staticmethod
+    def _search_key(query: str, category: PirateBayCategory) -> Tuple[str, int]:
+        return " ".join(query.lower().split()), category.value
+
+    async def _search_local_first(
+        self,
+        query: str,
+        category: PirateBayCategory,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+    ) -> PBTorrentSearchResponse:
+        """Answer from the local index when it is fresh enough, otherwise search apibay and store the results."""
+        if self.database is None:
+            return await self._search(query, category, priority)
+
+        local = await self._search_local(query, category)
+        if local is not None:
+            return local
+
+        response = await self._search(query, category, priority)
+        if response.success and response.results:
+            # Queued for the database writer thread, the search does not wait on the disk
+            await self.database.save_torrents(response.results)
+        return response
+
+    async def _search_local(
+        self, query: str, category: PirateBayCategory
+    ) -> PBTorrentSearchResponse | None:
+        """Search the local index, or None when it has too few fresh results."""
+        rows = await self.database.search_torrents(
+            query, source="PirateBay", max_age=self.local_max_age
+        )
+        # Parsed as one JSON array and filtered before validating, so the stored
+        # rows are validated in a single adapter call and only the kept ones at all
+        stored = from_json("[" + ",".join(row["payload"] for row in rows if row["payload"]) + "]")
+        if category != PirateBayCategory.ALL:
+            stored = [item for item in stored if item["category"] == category.value]
+
+        if len(stored) < self.local_min_results:
+            return None
+        results = TORRENT_LIST_ADAPTER.validate_python(stored)
+
+        logger.debug(f"Answered search for {query} from the local index")
+        return PBTorrentSearchResponse(
+            success=True,
+            query=query,
+            results=results,
+            total_results=len(results),
+            category=category,
+        )
+
+    async def _search(
+        self,
+        query: str,
+        category: PirateBayCategory,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+    ) -> PBTorrentSearchResponse:
+        """Search apibay for torrents, bypassing the search cache."""
+        url = self.build_url(self.search_url, query=query, category=category.value)
+        response = await self.fetch(url, priority)
 
         if response.status_code != 200:
             logger.error(f"Failed to fetch search results for {query} from Pirate Bay")
@@ -60,24 +229,8 @@ class PirateBayScrapper(BaseScrapper):
                 category=category,
             )
 
-        data = response.json()
-        results = [
-            PBTorrentData(
-                id=str(item["id"]),
-                name=item["name"],
-                info_hash=item["info_hash"],
-                leechers=item["leechers"],
-                seeders=item["seeders"],
-                size=item["size"],
-                uploader=item["username"],
-                added_date=datetime.fromtimestamp(int(item["added"])).isoformat(),
-                status=item.get("status", "unknown"),
-                category=item.get("category", PirateBayCategory.ALL.value),
-                imdb=item.get("imdb", ""),
-                magnet_link=self.build_url(self.magnet_url, hash=item["info_hash"]),
-            )
-            for item in list(data)
-        ]
+        data = self.parse_json(response)
+        results = self.decode(data, query, "search")
 
         return PBTorrentSearchResponse(
             success=True,
@@ -87,10 +240,47 @@ class PirateBayScrapper(BaseScrapper):
             category=category,
         )
 
+    def decode(self, rows: List[dict], keywords: str, operation: str) -> List[PBTorrentData]:
+        """Decode apibay rows into models, timed as the decode stage."""
+        if not metrics.enabled:
+            return self.decoder.decode(rows, keywords)
+
+        start = time.perf_counter()
+        results = self.decoder.decode(rows, keywords)
+        STAGE_SECONDS.observe(time.perf_counter() - start, self.host, "decode")
+        RESULT_ROWS.observe(len(results), self.host, operation)
+        return results
+
+    def decode_columns(
+        self, rows: List[dict], keywords: str, operation: str, into: TorrentResultSet | None = None
+    ) -> TorrentResultSet:
+        """Decode apibay rows into a compact result set, timed as the decode stage."""
+        if not metrics.enabled:
+            return self.decoder.decode_columns(rows, keywords, into)
+
+        start = time.perf_counter()
+        results = self.decoder.decode_columns(rows, keywords, into)
+        STAGE_SECONDS.observe(time.perf_counter() - start, self.host, "decode")
+        RESULT_ROWS.observe(len(rows), self.host, operation)
+        return results
+
     async def get_torrent_info(self, torrent_id: str) -> DetailedPBTorrentData:
         """Get detailed information about a torrent by its ID."""
+        return await self.cached_call(
+            self.detail_cache, torrent_id, lambda: self._get_torrent_info(torrent_id)
+        )
+
+    def get_torrent_infos(
+        self, torrent_ids: Iterable[str]
+    ) -> AsyncIterator[Tuple[str, DetailedPBTorrentData | None]]:
+        """Get the details of many torrents concurrently, yielding (id, details) as each completes."""
+        return self.stream_completed(torrent_ids, self.get_torrent_info)
+
+    async def _get_torrent_info(
+        self, torrent_id: str, priority: RequestPriority = RequestPriority.DETAIL
+    ) -> DetailedPBTorrentData:
         url = self.build_url(self.torrent_info, id=torrent_id)
-        response = await self.request_client.get(url)
+        response = await self.fetch(url, priority)
 
         if response.status_code != 200:
             logger.error(
@@ -98,7 +288,8 @@ class PirateBayScrapper(BaseScrapper):
             )
             return None
 
-        data = response.json()
+        data = self.parse_json(response)
+        category = int(data.get("category", PirateBayCategory.ALL.value))
         return DetailedPBTorrentData(
             id=str(data["id"]),
             name=data["name"],
@@ -107,23 +298,84 @@ class PirateBayScrapper(BaseScrapper):
             seeders=data["seeders"],
             size=data["size"],
             uploader=data["username"],
-            added_date=datetime.fromtimestamp(int(data["added"])).isoformat(),
+            added_date=format_timestamp(data["added"]),
             status=data.get("status", "unknown"),
-            category=data.get("category", PirateBayCategory.ALL.value),
-            imdb=data.get("imdb", ""),
+            category=category,
+            content_type="episode" if category in TV_CATEGORIES else "movie",
+            keywords=f"id:{torrent_id}",
+            imdb=data.get("imdb", "") or "",
             num_files=data.get("num_files", 0),
             description=data.get("description", ""),
             language=data.get("language", 0),
             textlanguage=data.get("textlanguage", 0),
-            magnet_link=self.build_url(self.magnet_url, hash=data["info_hash"]),
+            magnet_link=self.decoder.magnet_prefix + data["info_hash"] + self.decoder.magnet_suffix,
+        )
+
+    async def get_file_list(self, torrent_id: str) -> FileList:
+        """Get the files contained in a torrent by its ID."""
+        return await self.cached_call(
+            self.file_list_cache, torrent_id, lambda: self._get_file_list(torrent_id)
         )
 
+    def get_file_lists(
+        self, torrent_ids: Iterable[str]
+    ) -> AsyncIterator[Tuple[str, FileList | None]]:
+        """Get the files of many torrents concurrently, yielding (id, files) as each completes."""
+        return self.stream_completed(torrent_ids, self.get_file_list)
+
+    async def _get_file_list(self, torrent_id: str) -> FileList:
+        url = self.build_url(self.file_info_url, id=torrent_id)
+        response = await self.fetch(url, RequestPriority.DETAIL)
+
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch file list for ID {torrent_id} from Pirate Bay")
+            return None
+
+        # apibay wraps every value in a single element list and answers unknown
+        # ids with a "Filelist not found" placeholder of size 0
+        files = FileList(
+            TorrentFile(path=item["name"][0], size=int(item["size"][0]))
+            for item in self.parse_json(response)
+            if int(item["size"][0]) > 0
+        )
+        if metrics.enabled:
+            RESULT_ROWS.observe(len(files), self.host, "file_list")
+        return files
+
     async def get_uploader_profile(
         self, username: str, read_pages: int = 5
     ) -> PBUploaderProfile:
-        """Get profile information about an uploader by their username. Used for analysis."""
+        """Get profile information about an uploader by their username. Used for analysis.
+
+        With a database, stored profiles are served while fresh and stale ones
+        are brought up to date from the pages newer than their recent activity.
+        """
+        stored = await self._stored_uploader_profile(username) if self.database else None
+        if stored is not None and self._is_fresh(stored):
+            return stored
+
+        if stored is not None and stored.total_uploads:
+            profile = await self._refresh_uploader_profile(stored, read_pages)
+        else:
+            profile = await self._crawl_uploader_profile(username, read_pages)
+
+        if profile is not None and profile is not stored and self.database is not None:
+            await self.database.save_uploader_profiles([profile])
+        return profile
+
+    async def _stored_uploader_profile(self, username: str) -> PBUploaderProfile | None:
+        row = (await self.database.uploader_profiles([username])).get(username)
+        return PBUploaderProfile.model_validate(row) if row is not None else None
+
+    def _is_fresh(self, profile: PBUploaderProfile) -> bool:
+        return datetime.fromisoformat(profile.fetched_at) >= datetime.now() - self.profile_max_age
+
+    async def _crawl_uploader_profile(
+        self, username: str, read_pages: int
+    ) -> PBUploaderProfile | None:
+        """Build a profile from scratch out of the first read_pages pages of the uploader."""
         url = self.build_url(self.uploader_pages_url, username=username)
-        response = await self.request_client.get(url)
+        response = await self.fetch(url, RequestPriority.BACKGROUND)
 
         if response.status_code != 200:
             logger.error(f"Failed to fetch uploader profile for {username}")
@@ -132,75 +384,142 @@ class PirateBayScrapper(BaseScrapper):
         max_pages = int(response.text)
         read_pages = min(read_pages, max_pages)
 
-        torrents_data = []
-        for page in range(read_pages):
-            url = self.build_url(
-                self.uploader_profile_url, username=f"{username}:{page}"
-            )
-            response = await self.request_client.get(url)
+        # The page count is the only dependency; every profile page and the
+        # oldest page are then requested together under the concurrency cap.
+        page_urls = [
+            self.build_url(self.uploader_profile_url, username=f"{username}:{page}")
+            for page in range(read_pages)
+        ]
+        last_page_url = self.build_url(
+            self.uploader_profile_url, username=f"{username}:{max_pages}"
+        )
+        *page_responses, last_page_response = await asyncio.gather(
+            *(self.fetch(url, RequestPriority.BACKGROUND) for url in page_urls),
+            self.fetch(last_page_url, RequestPriority.BACKGROUND),
+        )
 
+        keywords = f"user:{username}"
+        # Uploader crawls can span thousands of rows, only their totals are kept
+        torrents = TorrentResultSet(keywords, self.decoder.magnet_prefix, self.decoder.magnet_suffix)
+        for page, response in enumerate(page_responses):
             if response.status_code != 200:
                 logger.error(
                     f"Failed to fetch uploader profile for {username} on page {page}"
                 )
                 continue
 
-            data = response.json()
-
-            for item in data:
-                torrents_data.append(
-                    PBTorrentData(
-                        id=str(item["id"]),
-                        name=item["name"],
-                        info_hash=item["info_hash"],
-                        leechers=item["leechers"],
-                        seeders=item["seeders"],
-                        size=item["size"],
-                        uploader=item["username"],
-                        added_date=datetime.fromtimestamp(
-                            int(item["added"])
-                        ).isoformat(),
-                        status=item.get("status", "unknown"),
-                        category=item.get("category", PirateBayCategory.ALL.value),
-                        imdb=item.get("imdb", ""),
-                    )
-                )
+            data = self.parse_json(response)
+            self.decode_columns(data, keywords, "uploader_page", into=torrents)
 
-        if not torrents_data:
+        if not torrents:
             logger.warning(f"No torrents found for uploader {username}")
             return None
 
-        url = self.build_url(
-            self.uploader_profile_url, username=f"{username}:{max_pages}"
-        )
-        response = await self.request_client.get(url)
-
-        if response.status_code != 200:
+        if last_page_response.status_code != 200:
             logger.error(f"Failed to fetch uploader's last profile page for {username}")
             return None
 
-        last_page_data = response.json()
-        oldest_activity = datetime.fromtimestamp(
-            int(last_page_data[0]["added"])
-        ).isoformat()
+        last_page_data = self.parse_json(last_page_response)
+        oldest_activity = format_timestamp(last_page_data[0]["added"])
 
-        total_seeders = sum(torrent.seeders for torrent in torrents_data)
-        total_leechers = sum(torrent.leechers for torrent in torrents_data)
-        average_uploads_per_month = len(torrents_data) / (read_pages or 1)
-        average_seeders_per_upload = total_seeders / (len(torrents_data) or 1)
-        average_leechers_per_upload = total_leechers / (len(torrents_data) or 1)
-        recent_activity = max(torrent.added_date for torrent in torrents_data)
-        fetched_at = datetime.now().isoformat()
+        return self._build_uploader_profile(
+            username,
+            total_pages=read_pages,
+            total_uploads=len(torrents),
+            total_seeders=torrents.sum("seeders"),
+            total_leechers=torrents.sum("leechers"),
+            recent_activity=format_timestamp(torrents.max("added")),
+            counted_since=format_timestamp(torrents.min("added")),
+            oldest_activity=oldest_activity,
+        )
 
+    async def _refresh_uploader_profile(
+        self, stored: PBUploaderProfile, read_pages: int
+    ) -> PBUploaderProfile:
+        """Add the uploads newer than the stored recent activity to the stored totals.
+
+        Pages are newest first, so reading stops at the first page reaching the
+        watermark: usually the first one.
+        """
+        keywords = f"user:{stored.name}"
+        watermark = int(datetime.fromisoformat(stored.recent_activity).timestamp())
+        new_torrents = TorrentResultSet(keywords)
+        for page in range(read_pages):
+            url = self.build_url(self.uploader_profile_url, username=f"{stored.name}:{page}")
+            response = await self.fetch(url, RequestPriority.BACKGROUND)
+            if response.status_code != 200:
+                logger.error(f"Failed to refresh uploader profile for {stored.name} on page {page}")
+                return stored
+
+            torrents = self.decode_columns(self.parse_json(response), keywords, "uploader_page")
+            newer = torrents.where("added", lambda added: added > watermark)
+            new_torrents.extend(newer)
+            if len(newer) < len(torrents) or not torrents:
+                break
+
+        return self._build_uploader_profile(
+            stored.name,
+            total_pages=stored.total_pages,
+            total_uploads=stored.total_uploads + len(new_torrents),
+            total_seeders=stored.total_seeders + new_torrents.sum("seeders"),
+            total_leechers=stored.total_leechers + new_torrents.sum("leechers"),
+            recent_activity=format_timestamp(new_torrents.max("added", default=watermark)),
+            counted_since=stored.counted_since or stored.recent_activity,
+            oldest_activity=stored.oldest_activity,
+        )
+
+    @staticmethod
+    def _build_uploader_profile(
+        username: str,
+        total_pages: int,
+        total_uploads: int,
+        total_seeders: int,
+        total_leechers: int,
+        recent_activity: str,
+        counted_since: str,
+        oldest_activity: str,
+    ) -> PBUploaderProfile:
+        """Build a profile from running totals, deriving the averages."""
+        counted_days = (
+            datetime.fromisoformat(recent_activity) - datetime.fromisoformat(counted_since)
+        ).days
         return PBUploaderProfile(
             name=username,
-            total_pages=read_pages,
+            total_pages=total_pages,
+            total_uploads=total_uploads,
             total_seeders=total_seeders,
             total_leechers=total_leechers,
-            average_uploads_per_month=average_uploads_per_month,
-            average_seeders_per_upload=average_seeders_per_upload,
-            average_leechers_per_upload=average_leechers_per_upload,
+            average_uploads_per_month=total_uploads / max(1.0, counted_days / 30),
+            average_seeders_per_upload=total_seeders / (total_uploads or 1),
             recent_activity=recent_activity,
+            counted_since=counted_since,
             oldest_activity=oldest_activity,
-            fetched_at=fetched_at,
+            fetched_at=datetime.now().isoformat(),
         )
+
+    async def get_uploader_profiles(
+        self, usernames: Iterable[str], read_pages: int = 5
+    ) -> Dict[str, PBUploaderProfile]:
+        """Get the profiles of several uploaders at once, sharing the concurrency cap."""
+        unique_usernames = list(dict.fromkeys(usernames))
+        profiles = await asyncio.gather(
+            *(
+                self.get_uploader_profile(username, read_pages=read_pages)
+                for username in unique_usernames
+            ),
+            return_exceptions=True,
+        )
+
+        # Uploader analysis is background work: a profile that was shed or failed
+        # to load is simply missing rather than failing the whole call
+        for username, profile in zip(unique_usernames, profiles):
+            if isinstance(profile, RateLimitedError):
+                logger.info(f"Skipped uploader profile for {username}: {profile}")
+            elif isinstance(profile, Exception):
+                logger.warning(f"Failed to load uploader profile for {username}: {profile!r}")
+            elif isinstance(profile, BaseException):
+                raise profile
+        return {
+            username: None if isinstance(profile, BaseException) else profile
+            for username, profile in zip(unique_usernames, profiles)
+        }
@@ -7,4 +7,20 @@ class PirateBayCategory(Enum):
     UHD_MOVIES = 211
     TV_SHOWS = 205
     HD_TV_SHOWS = 208
-    UHD_TV_SHOWS = 212
\ No newline at end of file
+    UHD_TV_SHOWS = 212
+
+MOVIE_CATEGORIES = frozenset(
+    {
+        PirateBayCategory.MOVIES.value,
+        PirateBayCategory.HD_MOVIES.value,
+        PirateBayCategory.UHD_MOVIES.value,
+    }
+)
+
+TV_CATEGORIES = frozenset(
+    {
+        PirateBayCategory.TV_SHOWS.value,
+        PirateBayCategory.HD_TV_SHOWS.value,
+        PirateBayCategory.UHD_TV_SHOWS.value,
+    }
+)
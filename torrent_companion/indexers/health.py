@@ -0,0 +1,138 @@
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from .common_types import CircuitState, IndexerHealth
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit of an indexer is open."""
+
+
+class HealthTracker:
+    """Rolling window of real request outcomes driving a closed/open/half-open circuit breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 100,
+        window_seconds: float = 300,
+        min_requests: int = 5,
+        error_threshold: float = 0.5,
+        base_backoff: float = 5,
+        max_backoff: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests  # outcomes needed before the error rate can open the circuit
+        self.error_threshold = error_threshold
+        self.base_backoff = base_backoff  # in seconds, doubled after every failed probe
+        self.max_backoff = max_backoff
+        self.clock = clock
+
+        self._samples: deque = deque(maxlen=window_size)  # (timestamp, latency, ok)
+        self.state = CircuitState.CLOSED
+        self.observed = False
+        self.opened_count = 0  # consecutive openings, drives the probe backoff
+        self.retry_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def health(self) -> IndexerHealth:
+        if self.state == CircuitState.OPEN and self.clock() < self.retry_at:
+            return IndexerHealth.UNHEALTHY
+        # Once a probe is due, report UNKNOWN so real traffic can serve as the probe
+        if self.state != CircuitState.CLOSED or not self.observed:
+            return IndexerHealth.UNKNOWN
+        return IndexerHealth.HEALTHY
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now; lets a single probe through once the backoff elapsed."""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN and self.clock() >= self.retry_at:
+            logger.info(f"{self.name} circuit half-open, probing")
+            self.state = CircuitState.HALF_OPEN
+        if self.state == CircuitState.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record the outcome of a request."""
+        self.observed = True
+        self._samples.append((self.clock(), latency, ok))
+
+        if self.state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+            if ok:
+                self.reset()
+            else:
+                self.trip()
+        elif self.state == CircuitState.CLOSED:
+            self._expire()
+            if len(self._samples) >= self.min_requests and self.error_rate() >= self.error_threshold:
+                self.trip()
+
+    def abandon(self) -> None:
+        """Forget a request that ended without an outcome (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+    def trip(self) -> None:
+        """Open the circuit, backing off exponentially on consecutive openings."""
+        backoff = min(self.max_backoff, self.base_backoff * 2**self.opened_count)
+        self.opened_count += 1
+        self.state = CircuitState.OPEN
+        self.retry_at = self.clock() + backoff
+        self._probe_in_flight = False
+        logger.warning(f"{self.name} circuit opened, next probe in {backoff:.0f}s")
+
+    def reset(self) -> None:
+        """Close the circuit and forget the outcomes that opened it."""
+        if self.state != CircuitState.CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self.state = CircuitState.CLOSED
+        self.observed = True
+        self.opened_count = 0
+        self._probe_in_flight = False
+        self._samples.clear()
+
+    def error_rate(self) -> float:
+        self._expire()
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, _, ok in self._samples if not ok) / len(self._samples)
+
+    def sample_count(self) -> int:
+        """Number of request outcomes in the window."""
+        self._expire()
+        return len(self._samples)
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Latency (in seconds) at a percentile of the window, or None without samples."""
+        self._expire()
+        latencies = sorted(latency for _, latency, _ in self._samples)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def snapshot(self) -> Dict[str, object]:
+        """Health, circuit state, error rate and p50/p95 latency of the window."""
+        return {
+            "health": self.health.value,
+            "circuit": self.state.value,
+            "requests": len(self._samples),
+            "error_rate": self.error_rate(),
+            "p50": self.latency_percentile(50),
+            "p95": self.latency_percentile(95),
+        }
+
+    def _expire(self) -> None:
+        horizon = self.clock() - self.window_seconds
+        while self._samples and self._samples[0][0] < horizon:
+            self._samples.popleft()
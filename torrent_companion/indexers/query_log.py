@@ -0,0 +1,60 @@
+import logging
+from collections import Counter
+from datetime import timedelta
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    from torrent_companion.database.async_database import AsyncDatabase
+
+logger = logging.getLogger(__name__)
+
+# (normalized query, category, indexer name); the category is "" when none was given
+QueryKey = Tuple[str, str, str]
+
+
+class QueryLog:
+    """Search frequencies per (query, category, indexer), kept in memory and persisted in batches.
+
+    Counts recorded since the last `flush` are written to the database's
+    query log, and `load` restores the persisted counts after a restart.
+    """
+
+    def __init__(self, database: "AsyncDatabase | None" = None, max_entries: int = 10_000):
+        self.database = database
+        self.max_entries = max_entries
+        self.counts: Counter = Counter()
+        self._pending: Counter = Counter()  # recorded but not persisted yet
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def record(self, query: str, category: str | None, indexer: str) -> None:
+        key = (" ".join(query.lower().split()), category or "", indexer)
+        self.counts[key] += 1
+        self._pending[key] += 1
+        if len(self.counts) > 2 * self.max_entries:
+            # Forget the long tail, which would never be warmed anyway
+            self.counts = Counter(dict(self.counts.most_common(self.max_entries)))
+
+    def top(self, n: int) -> List[Tuple[QueryKey, int]]:
+        """The n most searched entries, most searched first."""
+        return self.counts.most_common(n)
+
+    async def load(self, limit: int | None = None, since: timedelta | None = None) -> int:
+        """Add the persisted counts of the most searched entries, returning how many were loaded."""
+        if self.database is None:
+            return 0
+
+        rows = await self.database.popular_queries(limit or self.max_entries, since)
+        for row in rows:
+            key = (row["query"], row["category"], row["indexer"])
+            self.counts[key] = max(self.counts[key], row["count"])
+        logger.debug(f"Loaded {len(rows)} entries of the query log")
+        return len(rows)
+
+    async def flush(self) -> None:
+        """Queue the counts recorded since the last flush to be persisted."""
+        if self.database is None or not self._pending:
+            return
+        pending, self._pending = self._pending, Counter()
+        await self.database.log_queries(pending)
@@ -0,0 +1,151 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, Dict, List, Tuple
+
+from .common_types import RequestPriority
+
+logger = logging.getLogger(__name__)
+
+# How long a request may queue for a token before it is shed (None waits forever)
+DEFAULT_MAX_WAIT: Dict[RequestPriority, float | None] = {
+    RequestPriority.INTERACTIVE: None,
+    RequestPriority.DETAIL: 30.0,
+    RequestPriority.BACKGROUND: 10.0,
+}
+
+
+class RateLimitedError(Exception):
+    """Raised when a request is shed because it would wait too long for the rate limit."""
+
+
+class RateLimiter:
+    """Token bucket shared by every request to a host, handing tokens out by priority.
+
+    Waiting requests are served highest priority first. Background requests
+    leave `reserve` tokens in the bucket for foreground traffic, and requests
+    whose expected wait exceeds the max wait of their priority are shed.
+    Without a rate the limiter only enforces pauses (e.g. after a 429).
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int = 1,
+        reserve: float = 1.0,
+        max_wait: Dict[RequestPriority, float | None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate  # tokens per second
+        self.burst = max(1, burst)
+        self.reserve = min(reserve, self.burst - 1)  # tokens background requests cannot take
+        self.max_wait = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self.clock = clock
+
+        self.tokens = float(self.burst)
+        self.paused_until = 0.0
+        self._updated = clock()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []  # heap of (priority, order, future)
+        self._order = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+        self.granted = {priority: 0 for priority in RequestPriority}
+        self.shed = {priority: 0 for priority in RequestPriority}
+
+    async def acquire(self, priority: RequestPriority = RequestPriority.INTERACTIVE) -> None:
+        """Wait for a token, or raise RateLimitedError when the wait would be too long."""
+        self._refill()
+        if not self._waiters and self._can_take(priority):
+            self._take(priority)
+            return
+
+        max_wait = self.max_wait.get(priority)
+        if max_wait is not None and self.expected_wait(priority) > max_wait:
+            self.shed[priority] += 1
+            raise RateLimitedError(f"Request shed by the rate limiter ({priority.name})")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (priority.value, next(self._order), future)
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens += 1  # granted just before the cancellation, give it back
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            self._dispatch()
+            raise
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for a while, e.g. when the host answered 429."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+        logger.warning(f"Rate limiter paused for {seconds:.1f}s")
+
+    def expected_wait(self, priority: RequestPriority) -> float:
+        """Seconds a new request of a priority would queue behind the ones already waiting."""
+        self._refill()
+        wait = max(0.0, self.paused_until - self.clock())
+        if self.rate is None:
+            return wait
+
+        ahead = sum(1 for waiter_priority, _, _ in self._waiters if waiter_priority <= priority.value)
+        needed = ahead + 1 + self._reserve_for(priority) - self.tokens
+        return wait + max(0.0, needed) / self.rate
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "tokens": self.tokens if self.rate is not None else None,
+            "waiting": len(self._waiters),
+            "granted": {priority.name: count for priority, count in self.granted.items()},
+            "shed": {priority.name: count for priority, count in self.shed.items()},
+        }
+
+    def _reserve_for(self, priority: RequestPriority) -> float:
+        return self.reserve if priority == RequestPriority.BACKGROUND else 0.0
+
+    def _can_take(self, priority: RequestPriority) -> bool:
+        if self.clock() < self.paused_until:
+            return False
+        return self.rate is None or self.tokens >= 1 + self._reserve_for(priority)
+
+    def _take(self, priority: RequestPriority) -> None:
+        if self.rate is not None:
+            self.tokens -= 1
+        self.granted[priority] += 1
+
+    def _refill(self) -> None:
+        now = self.clock()
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        """Grant tokens to waiters in priority order, then sleep until the next one can be served."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self._refill()
+        while self._waiters:
+            priority_value, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            priority = RequestPriority(priority_value)
+            if not self._can_take(priority):
+                break
+            heapq.heappop(self._waiters)
+            self._take(priority)
+            future.set_result(None)
+
+        if self._waiters:
+            priority = RequestPriority(self._waiters[0][0])
+            delay = max(0.0, self.paused_until - self.clock())
+            if self.rate is not None:
+                delay = max(delay, (1 + self._reserve_for(priority) - self.tokens) / self.rate)
+            self._timer = asyncio.get_running_loop().call_later(max(delay, 0.001), self._dispatch)
@@ -0,0 +1,133 @@
+import importlib
+import logging
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from .common_types import IndexerGenre, IndexerType
+
+if TYPE_CHECKING:
+    from torrent_companion.database.async_database import AsyncDatabase
+
+    from .base_indexer import BaseIndexer
+
+logger = logging.getLogger(__name__)
+
+DEFINITIONS_PATH = Path(__file__).parent / "definitions"
+DEFINITIONS_PACKAGE = "torrent_companion.indexers.definitions"
+METADATA_FILENAME = "indexer.toml"
+
+
+@dataclass(frozen=True)
+class IndexerDefinition:
+    """Metadata of an indexer definition, read from its indexer.toml."""
+
+    name: str
+    description: str
+    type: IndexerType
+    language: str
+    genres: Tuple[IndexerGenre, ...]
+    module: str  # e.g. torrent_companion.indexers.definitions.piratebay.indexer
+    class_name: str
+
+    @classmethod
+    def from_file(cls, path: Path, package: str = DEFINITIONS_PACKAGE) -> "IndexerDefinition":
+        with path.open("rb") as file:
+            metadata = tomllib.load(file)
+
+        module, _, class_name = metadata["entry_point"].partition(":")
+        return cls(
+            name=metadata["name"],
+            description=metadata.get("description", ""),
+            type=IndexerType(metadata["type"]),
+            language=metadata.get("language", "en"),
+            genres=tuple(IndexerGenre(genre) for genre in metadata["genres"]),
+            module=".".join(part for part in (package, path.parent.name, module) if part),
+            class_name=class_name,
+        )
+
+
+class IndexerRegistry:
+    """Indexer definitions discovered from their metadata, imported and instantiated on first use.
+
+    Discovery only reads the indexer.toml of every definition package, so
+    startup cost does not depend on the definitions (or their dependencies)
+    a deployment never searches. With a database, indexers are instantiated
+    with it as their `database` keyword, to store and search results locally.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFINITIONS_PATH,
+        package: str = DEFINITIONS_PACKAGE,
+        enabled: Iterable[str] | None = None,
+        database: "AsyncDatabase | None" = None,
+    ):
+        self.path = Path(path)
+        self.package = package
+        self.enabled = None if enabled is None else set(enabled)  # names, None for every definition
+        self.database = database
+        self.definitions: Dict[str, IndexerDefinition] = {}
+        self._indexers: Dict[str, "BaseIndexer"] = {}
+        self.discover()
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.definitions
+
+    def discover(self) -> None:
+        """Read the metadata of every definition, without importing any of them."""
+        definitions = {}
+        for metadata_path in sorted(self.path.glob(f"*/{METADATA_FILENAME}")):
+            try:
+                definition = IndexerDefinition.from_file(metadata_path, self.package)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Skipping invalid indexer definition {metadata_path}: {e!r}")
+                continue
+            if self.enabled is None or definition.name in self.enabled:
+                definitions[definition.name] = definition
+        self.definitions = definitions
+        logger.debug(f"Discovered {len(definitions)} indexer definitions")
+
+    def select(self, genre: IndexerGenre | None = None) -> List[IndexerDefinition]:
+        """The definitions serving a genre (all of them when None), from metadata only."""
+        return [
+            definition
+            for definition in self.definitions.values()
+            if genre is None or genre in definition.genres
+        ]
+
+    def get(self, name: str) -> "BaseIndexer | None":
+        """The indexer of a definition, imported and instantiated the first time it is asked for."""
+        indexer = self._indexers.get(name)
+        if indexer is not None:
+            return indexer
+
+        definition = self.definitions.get(name)
+        if definition is None:
+            return None
+
+        logger.info(f"Loading {name} indexer")
+        indexer_class = getattr(importlib.import_module(definition.module), definition.class_name)
+        indexer = self._indexers[name] = (
+            indexer_class() if self.database is None else indexer_class(database=self.database)
+        )
+        return indexer
+
+    def indexers(self, genre: IndexerGenre | None = None) -> List["BaseIndexer"]:
+        """The indexers serving a genre, loading the ones not used yet."""
+        return [self.get(definition.name) for definition in self.select(genre)]
+
+    @property
+    def loaded(self) -> List[str]:
+        """Names of the indexers instantiated so far."""
+        return list(self._indexers)
+
+    def close(self) -> None:
+        """Close every loaded indexer, they are instantiated again on next use."""
+        for indexer in self._indexers.values():
+            indexer.close()
+        self._indexers.clear()
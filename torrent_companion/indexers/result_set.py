@@ -0,0 +1,180 @@
+import heapq
+import sys
+from array import array
+from itertools import compress
+from operator import itemgetter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Type, TypeVar
+
+from .common_models import BaseTorrentData
+
+M = TypeVar("M", bound=BaseTorrentData)
+
+# Stored in typed arrays (8 bytes a value instead of a boxed int)
+INT_COLUMNS = ("seeders", "leechers", "size", "added", "category")
+# Few distinct values shared by many rows, interned so every row points at one string
+INTERNED_COLUMNS = ("uploader", "status", "content_type", "source", "quality", "language")
+TEXT_COLUMNS = ("id", "name", "info_hash", "imdb")
+OPTIONAL_COLUMNS = ("season_number", "episode_number")
+
+COLUMNS = INT_COLUMNS + INTERNED_COLUMNS + TEXT_COLUMNS + OPTIONAL_COLUMNS
+
+
+def gather(column: str, values: array | list, indices: List[int]) -> array | list:
+    """The values of a column at the given indices, in that order."""
+    # itemgetter gathers a whole column in C; a single index gives a bare value
+    if len(indices) > 1:
+        taken = itemgetter(*indices)(values)
+    else:
+        taken = [values[index] for index in indices]
+    return array("q", taken) if column in INT_COLUMNS else list(taken)
+
+
+class SelectedColumns(dict):
+    """The columns of a selection of rows, each gathered from its source the first time it is read."""
+
+    __slots__ = ("source", "indices")
+
+    def __init__(self, source: Dict[str, array | list], indices: List[int]):
+        super().__init__()
+        self.source = source
+        self.indices = indices
+
+    def __missing__(self, column: str) -> array | list:
+        values = self[column] = gather(column, self.source[column], self.indices)
+        return values
+
+
+class TorrentResultSet:
+    """Column oriented store for large sets of search rows.
+
+    Numbers live in typed arrays and repeated strings are interned; the
+    keywords and magnet template are shared by the whole set. Filtering,
+    sorting and aggregating work on the columns, and rows only become
+    pydantic models through `to_models` at the API boundary. A filtered or
+    sorted set only keeps the indices of its rows, and gathers a column the
+    first time it is read.
+    """
+
+    __slots__ = ("columns", "keywords", "magnet_prefix", "magnet_suffix")
+
+    def __init__(
+        self, keywords: str = "", magnet_prefix: str = "magnet:?xt=urn:btih:", magnet_suffix: str = ""
+    ):
+        self.columns: Dict[str, array | list] = {
+            **{column: array("q") for column in INT_COLUMNS},
+            **{column: [] for column in INTERNED_COLUMNS + TEXT_COLUMNS + OPTIONAL_COLUMNS},
+        }
+        self.keywords = keywords
+        self.magnet_prefix = magnet_prefix
+        self.magnet_suffix = magnet_suffix
+
+    def __len__(self) -> int:
+        return len(self.columns["info_hash"])
+
+    def __getitem__(self, column: str) -> array | list:
+        return self.columns[column]
+
+    def append(self, **values) -> None:
+        """Add a row; `added` is a unix timestamp."""
+        columns = self.columns
+        for column in INT_COLUMNS:
+            columns[column].append(int(values.get(column) or 0))
+        for column in INTERNED_COLUMNS:
+            columns[column].append(sys.intern(values.get(column) or "Unknown"))
+        for column in TEXT_COLUMNS:
+            columns[column].append(values.get(column) or "")
+        for column in OPTIONAL_COLUMNS:
+            columns[column].append(values.get(column))
+
+    def extend(self, other: "TorrentResultSet") -> None:
+        for column in COLUMNS:
+            self.columns[column].extend(other.columns[column])
+
+    @classmethod
+    def from_models(
+        cls, torrents: Iterable[BaseTorrentData], keywords: str = ""
+    ) -> "TorrentResultSet":
+        """Build a set from models (the magnet links are rebuilt from the info hashes)."""
+        results = cls(keywords)
+        for torrent in torrents:
+            results.append(
+                **{**torrent.__dict__, "added": datetime.fromisoformat(torrent.added_date).timestamp()}
+            )
+        return results
+
+    def take(self, indices: Iterable[int]) -> "TorrentResultSet":
+        """A new set holding the rows at the given indices, in that order."""
+        results = TorrentResultSet(self.keywords, self.magnet_prefix, self.magnet_suffix)
+        results.columns = SelectedColumns(self.columns, list(indices))
+        return results
+
+    def where(self, column: str, predicate: Callable[[object], bool]) -> "TorrentResultSet":
+        """The rows whose value in a column satisfies a predicate."""
+        return self._select(column, map(predicate, self.columns[column]))
+
+    # The comparisons are inlined rather than passed as predicates, so no Python
+    # function is called per row
+    def where_eq(self, column: str, value) -> "TorrentResultSet":
+        """The rows whose value in a column equals `value`."""
+        return self.take([index for index, item in enumerate(self.columns[column]) if item == value])
+
+    def where_ge(self, column: str, minimum) -> "TorrentResultSet":
+        """The rows whose value in a column is at least `minimum`."""
+        return self.take([index for index, value in enumerate(self.columns[column]) if value >= minimum])
+
+    def where_le(self, column: str, maximum) -> "TorrentResultSet":
+        """The rows whose value in a column is at most `maximum`."""
+        return self.take([index for index, value in enumerate(self.columns[column]) if value <= maximum])
+
+    def _select(self, column: str, mask: Iterable[bool]) -> "TorrentResultSet":
+        return self.take(compress(range(len(self.columns[column])), mask))
+
+    def sort_by(self, column: str, reverse: bool = False) -> "TorrentResultSet":
+        values = self.columns[column]
+        return self.take(sorted(range(len(values)), key=values.__getitem__, reverse=reverse))
+
+    def top(self, column: str, k: int) -> "TorrentResultSet":
+        """The k rows with the largest values in a column."""
+        values = self.columns[column]
+        return self.take(heapq.nlargest(k, range(len(values)), key=values.__getitem__))
+
+    def sum(self, column: str) -> int:
+        return sum(self.columns[column])
+
+    def max(self, column: str, default=None):
+        return max(self.columns[column], default=default)
+
+    def min(self, column: str, default=None):
+        return min(self.columns[column], default=default)
+
+    def mean(self, column: str) -> float:
+        return self.sum(column) / (len(self) or 1)
+
+    def counts(self, column: str) -> Dict[object, int]:
+        """Number of rows per distinct value of a column."""
+        counts: Dict[object, int] = {}
+        for value in self.columns[column]:
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def magnet_links(self) -> Iterator[str]:
+        prefix, suffix = self.magnet_prefix, self.magnet_suffix
+        return (prefix + info_hash + suffix for info_hash in self.columns["info_hash"])
+
+    def to_models(self, model: Type[M], added_format: Callable[[int], str] | None = None) -> List[M]:
+        """Convert the rows to pydantic models, for the API boundary."""
+        added_format = added_format or (lambda added: datetime.fromtimestamp(added).isoformat())
+        names = [column for column in COLUMNS if column in model.model_fields]
+        columns: Sequence = [self.columns[column] for column in names]
+        return [
+            model(
+                **dict(zip(names, row)),
+                keywords=self.keywords,
+                magnet_link=magnet_link,
+                added_date=added_format(added),
+            )
+            for row, magnet_link, added in zip(
+                zip(*columns), self.magnet_links(), self.columns["added"]
+            )
+        ]
@@ -0,0 +1,53 @@
+import random
+from dataclasses import dataclass
+
+# Upstream answers worth another attempt: the host or a proxy in front of it was unavailable
+RETRY_STATUSES = frozenset((502, 503, 504))
+
+
+@dataclass
+class RetryPolicy:
+    """Timeouts, hedging and retries of the idempotent GETs of a scrapper."""
+
+    timeout: float | None = None  # per attempt in seconds (client timeouts only when None), capped by the latest caller deadline
+    hedge_percentile: float | None = 95  # latency percentile after which a second attempt is sent
+    hedge_min_delay: float = 0.05  # in seconds, never hedge sooner than this
+    hedge_min_samples: int = 20  # observed latencies needed before hedging
+    max_attempts: int = 3  # including the first one
+    base_backoff: float = 0.1  # in seconds, doubled after every failed attempt
+    max_backoff: float = 2.0
+    retry_ratio: float = 0.1  # retries and hedges earned per request
+    min_retries: float = 10  # retries and hedges available before any request
+
+
+class RetryBudget:
+    """Token bucket bounding retries and hedges to a share of the requests.
+
+    Every request deposits `ratio` tokens and every retry or hedge spends
+    one, so extra attempts stay around `ratio` of the traffic and cannot
+    multiply the load on a host that is already failing.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_retries: float = 10):
+        self.ratio = ratio
+        self.capacity = max(min_retries, 1.0)
+        self.tokens = self.capacity
+        self.spent = 0
+        self.denied = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend a token for a retry or hedge, False when the budget is exhausted."""
+        if self.tokens < 1:
+            self.denied += 1
+            return False
+        self.tokens -= 1
+        self.spent += 1
+        return True
+
+
+def backoff(policy: RetryPolicy, attempt: int, rng: random.Random = random) -> float:
+    """Seconds to wait after a failed attempt, with full jitter."""
+    return rng.uniform(0, min(policy.max_backoff, policy.base_backoff * 2 ** (attempt - 1)))
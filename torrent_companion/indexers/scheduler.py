@@ -0,0 +1,31 @@
+import logging
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+logger = logging.getLogger(__name__)
+
+_scheduler: AsyncIOScheduler | None = None
+
+
+def get_scheduler() -> AsyncIOScheduler:
+    """Get the process-wide scheduler every indexer registers its jobs on."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AsyncIOScheduler()
+    return _scheduler
+
+
+def start_scheduler() -> None:
+    """Start the shared scheduler; must be called from within the running event loop."""
+    scheduler = get_scheduler()
+    if not scheduler.running:
+        logger.info("Starting shared scheduler")
+        scheduler.start()
+
+
+def shutdown_scheduler() -> None:
+    """Stop the shared scheduler, keeping its job store so it can be started again."""
+    scheduler = get_scheduler()
+    if scheduler.running:
+        logger.info("Shutting down shared scheduler")
+        scheduler.shutdown(wait=False)
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing a key into a single in-flight call.
+
+    The call runs in its own task so a caller being cancelled does not cancel
+    it for the others; it is only cancelled once every caller has gone.
+    Errors are raised to every caller.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0  # calls actually run
+        self.coalesced = 0  # calls that joined one already in flight
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """Run function for key, or wait for the identical call already in flight."""
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(function()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a call for key is in flight."""
+        return key in self._calls
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,110 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable
+
+from .base_indexer import BaseIndexer
+from .common_types import IndexerGenre, IndexerHealth
+from .health import CircuitOpenError
+from .query_log import QueryLog
+from .rate_limiter import RateLimitedError
+from .registry import IndexerRegistry
+from .scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer:
+    """Scheduled job refreshing the caches of the most popular searches before they expire.
+
+    Every `interval` minutes the top `top_n` entries of the query log are
+    warmed on their indexer, spending at most `budget` upstream requests per
+    run. The first run loads the persisted query log, so a fresh deployment
+    warms what was popular before it restarted.
+    """
+
+    def __init__(
+        self,
+        indexers: Iterable[BaseIndexer] | IndexerRegistry,
+        query_log: QueryLog,
+        top_n: int = 20,
+        budget: int = 50,
+        interval: int = 5,
+        refresh_within: float = 120,
+    ):
+        # Looked up by name; a registry loads the indexers of the logged searches on demand
+        self.indexers: Dict[str, BaseIndexer] | IndexerRegistry = (
+            indexers
+            if isinstance(indexers, IndexerRegistry)
+            else {indexer.name: indexer for indexer in indexers}
+        )
+        self.query_log = query_log
+        self.top_n = top_n
+        self.budget = budget  # upstream requests per run
+        self.interval = interval  # in minutes
+        self.refresh_within = refresh_within  # seconds before expiry an entry is refreshed
+
+        self.loaded = False
+        self.runs = 0
+        self.warmed = 0
+        self.requests = 0
+        self._job = None
+
+    def start(self) -> None:
+        """Register the warm-up job on the shared scheduler, running once right away."""
+        scheduler = get_scheduler()
+        if scheduler.get_job("cache-warmup") is not None:
+            scheduler.remove_job("cache-warmup")
+        self._job = scheduler.add_job(
+            self.warm,
+            name="cache_warmup",
+            trigger="interval",
+            minutes=self.interval,
+            next_run_time=datetime.now(),
+            id="cache-warmup",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+    def stop(self) -> None:
+        """Remove the warm-up job from the shared scheduler."""
+        job, self._job = self._job, None
+        if job is not None and get_scheduler().get_job(job.id) is not None:
+            get_scheduler().remove_job(job.id)
+
+    async def warm(self) -> int:
+        """Warm the most popular searches within the request budget, returning the requests spent."""
+        if not self.loaded:
+            await self.query_log.load()
+            self.loaded = True
+        await self.query_log.flush()
+
+        spent = 0
+        skipped = set()  # indexers shedding background work or with an open circuit
+        for (query, category, name), _ in self.query_log.top(self.top_n):
+            if spent >= self.budget:
+                break
+            indexer = self.indexers.get(name)
+            if indexer is None or name in skipped or indexer.health == IndexerHealth.UNHEALTHY:
+                continue
+
+            genre = IndexerGenre(category) if category else None
+            try:
+                used = await indexer.warm(query, genre, self.budget - spent, self.refresh_within)
+            except (RateLimitedError, CircuitOpenError):
+                logger.debug(f"Stopped warming {name} indexer, it is busy or unhealthy")
+                skipped.add(name)
+                continue
+            except Exception as e:
+                logger.warning(f"Failed to warm {query} on {name} indexer: {e!r}")
+                continue
+            spent += used
+            self.warmed += used > 0
+
+        self.runs += 1
+        self.requests += spent
+        logger.debug(f"Cache warm-up spent {spent} of {self.budget} requests")
+        return spent
+
+    def stats(self) -> Dict[str, int]:
+        return {"runs": self.runs, "warmed": self.warmed, "requests": self.requests}
@@ -0,0 +1,28 @@
+import logging
+from contextlib import asynccontextmanager
+
+from torrent_companion.indexers.client_registry import clients
+from torrent_companion.indexers.scheduler import shutdown_scheduler, start_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+async def startup() -> None:
+    """Start the process-wide resources shared by every indexer."""
+    start_scheduler()
+
+
+async def shutdown() -> None:
+    """Stop the shared scheduler and close every pooled HTTP client."""
+    shutdown_scheduler()
+    await clients.aclose()
+
+
+@asynccontextmanager
+async def lifespan(app=None):
+    """Lifespan handler for the FastAPI app (``FastAPI(lifespan=lifespan)``)."""
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
@@ -0,0 +1,162 @@
+import bisect
+import os
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Seconds, from a cached decode (tens of microseconds) to a slow indexer
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+ROWS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1_000, 5_000)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def _labels(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{escape(str(value))}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{self._labels(labels)} {value}" for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts, sum, count]
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                bucket_labels = self._labels(labels, 'le="' + str(bound) + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {total}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Counters and histograms rendered in the Prometheus text format.
+
+    Call sites check `enabled` before timing or observing anything, so a
+    disabled registry costs one attribute lookup per call.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metrics = MetricsRegistry(
+    enabled=os.environ.get("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+)
+
+STAGE_SECONDS = metrics.histogram(
+    "indexer_stage_seconds",
+    "Time spent per stage of an indexer call (network, json, decode).",
+    ("indexer", "stage"),
+)
+RESPONSES = metrics.counter(
+    "indexer_responses_total", "Upstream responses by status code.", ("indexer", "endpoint", "status")
+)
+EXTRA_ATTEMPTS = metrics.counter(
+    "indexer_extra_attempts_total", "Hedged and retried upstream requests.", ("indexer", "kind")
+)
+RESPONSE_BYTES = metrics.histogram(
+    "indexer_response_bytes", "Size of upstream response bodies.", ("indexer", "endpoint"), BYTES_BUCKETS
+)
+RESULT_ROWS = metrics.histogram(
+    "indexer_result_rows", "Rows decoded per upstream response.", ("indexer", "operation"), ROWS_BUCKETS
+)
+DB_SECONDS = metrics.histogram(
+    "db_statement_seconds", "Time spent in SQLite per operation.", ("operation", "table")
+)
+DB_ROWS = metrics.counter(
+    "db_rows_total", "Rows written or read by SQLite per operation.", ("operation", "table")
+)
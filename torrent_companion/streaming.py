@@ -0,0 +1,74 @@
+import json
+import time
+from typing import AsyncIterator, Dict, Tuple
+
+from torrent_companion.analysis.release_analyzer import ReleaseNameAnalyzer
+from torrent_companion.analysis.torrent_scorer import TorrentScorer
+from torrent_companion.indexers.aggregator import SearchAggregator, merge_results
+from torrent_companion.indexers.common_models import BaseTorrentData
+from torrent_companion.indexers.common_types import IndexerGenre
+
+
+async def search_events(
+    aggregator: SearchAggregator,
+    query: str,
+    genre: IndexerGenre | None = None,
+    deadline: float | None = None,
+    analyzer: ReleaseNameAnalyzer | None = None,
+    scorer: TorrentScorer | None = None,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """Search events, emitted as each stage finishes.
+
+    Every indexer answer yields its new results at once, followed by their
+    analysis when an analyzer and scorer are given; a summary comes last.
+    """
+    start = time.perf_counter()
+    merged: Dict[str, BaseTorrentData] = {}
+    statuses: Dict[str, str] = {}
+
+    async for indexer, status, response in aggregator.responses(query, genre, deadline):
+        statuses[indexer.name] = status
+        elapsed = time.perf_counter() - start
+        if response is None:
+            yield "indexer", {"indexer": indexer.name, "status": status, "elapsed": elapsed}
+            continue
+
+        added = merge_results(merged, response.results)
+        yield "results", {
+            "indexer": indexer.name,
+            "status": status,
+            "elapsed": elapsed,
+            "results": [torrent.model_dump(mode="json") for torrent in added],
+        }
+
+        if analyzer is not None and scorer is not None and added:
+            scored = [scorer.score(torrent, analyzer.analyze(torrent.name)) for torrent in added]
+            yield "analysis", {
+                "indexer": indexer.name,
+                "elapsed": time.perf_counter() - start,
+                "results": [
+                    {
+                        "info_hash": candidate.torrent.info_hash,
+                        "score": candidate.score,
+                        "breakdown": candidate.breakdown,
+                        "release": candidate.release.model_dump(mode="json"),
+                    }
+                    for candidate in scored
+                ],
+            }
+
+    yield "done", {
+        "query": query,
+        "total_results": len(merged),
+        "partial": "timeout" in statuses.values(),
+        "indexers": statuses,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def ndjson_line(event: str, data: dict) -> str:
+    return json.dumps({"event": event, **data}) + "\n"
+
+
+def sse_message(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"